@@ -33,8 +33,13 @@ class CustomUserAdmin(UserAdmin):
 class MovieAdmin(admin.ModelAdmin):
     """Register Movie for admin."""
 
-    list_display = ('id', 'title')
-    search_fields = ('title',)
+    list_display = ('id', 'title', 'rating_count', 'average_rating', 'poster_status')
+    list_filter = ('poster_status',)
+    # Prefix search is served by the title prefix index on PostgreSQL.
+    search_fields = ('^title',)
+    list_per_page = 50
+    show_full_result_count = False
+    readonly_fields = Movie.AGGREGATE_FIELDS + Movie.POSTER_FIELDS
 
 
 @admin.register(Rating)
@@ -42,4 +47,7 @@ class RatingAdmin(admin.ModelAdmin):
     """Register ratings for a movies."""
 
     list_display = ('id', 'stars', 'movie', 'user')
+    list_select_related = ('movie', 'user')
     search_fields = ('movie',)
+    list_per_page = 50
+    show_full_result_count = False
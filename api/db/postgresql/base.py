@@ -0,0 +1,34 @@
+from django.db.backends.postgresql.base import DatabaseWrapper as PostgresDatabaseWrapper
+
+
+class DatabaseWrapper(PostgresDatabaseWrapper):
+    """PostgreSQL backend checking persistent connections before reuse.
+
+    With CONN_HEALTH_CHECKS a connection kept from an earlier request is
+    tested on its first use in a new request and replaced if the server
+    closed it, instead of failing the request.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.health_check_done = True
+
+    @property
+    def health_check_enabled(self):
+        return self.settings_dict.get('CONN_HEALTH_CHECKS', False)
+
+    def connect(self):
+        super().connect()
+        self.health_check_done = True
+
+    def ensure_connection(self):
+        if self.connection is not None and not self.health_check_done:
+            self.health_check_done = True
+            if not self.in_atomic_block and not self.is_usable():
+                self.close()
+        super().ensure_connection()
+
+    def close_if_unusable_or_obsolete(self):
+        super().close_if_unusable_or_obsolete()
+        if self.connection is not None and self.health_check_enabled:
+            self.health_check_done = False
@@ -0,0 +1,25 @@
+from django.db import connections
+
+
+def keyset_rows(queryset, chunk_size):
+    """Yield rows of a values queryset starting with id, one query per chunk."""
+    last_id = None
+    while True:
+        chunk = queryset if last_id is None else queryset.filter(id__gt=last_id)
+        chunk = list(chunk[:chunk_size])
+        yield from chunk
+        if len(chunk) < chunk_size:
+            return
+        last_id = chunk[-1][0]
+
+
+def stream_rows(queryset, chunk_size):
+    """Return iterator over rows of a values queryset starting with id and ordered by id.
+
+    Rows are read with a server-side cursor in chunks, so memory use
+    doesn't depend on number of rows. Behind an external pooler server-side
+    cursors are disabled and rows are read by id ranges instead.
+    """
+    if connections[queryset.db].settings_dict.get('DISABLE_SERVER_SIDE_CURSORS'):
+        return keyset_rows(queryset, chunk_size)
+    return queryset.iterator(chunk_size=chunk_size)
@@ -0,0 +1,41 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from api.models import Movie
+
+
+class Command(BaseCommand):
+    """Rebuild or check denormalized movie rating aggregates."""
+
+    help = 'Recalculate rating count, sum and histogram of movies from the ratings table.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'movie_ids', nargs='*', type=int,
+            help='Movies to rebuild, all movies by default.',
+        )
+        parser.add_argument(
+            '--check', action='store_true',
+            help='Only report movies with stale aggregates and fail if there are any.',
+        )
+        parser.add_argument(
+            '--chunk-size', type=int, default=1000,
+            help='Number of movies processed per query.',
+        )
+
+    def handle(self, *args, **options):
+        stale = Movie.objects.rebuild_rating_aggregates(
+            movie_ids=options['movie_ids'] or None,
+            dry_run=options['check'],
+            chunk_size=options['chunk_size'],
+        )
+
+        if options['check']:
+            if stale:
+                raise CommandError(
+                    f'Stale rating aggregates for {len(stale)} movies: '
+                    + ', '.join(map(str, stale[:20])),
+                )
+            self.stdout.write(self.style.SUCCESS('Rating aggregates are up to date.'))
+            return
+
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt rating aggregates for {len(stale)} movies.'))
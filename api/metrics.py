@@ -0,0 +1,148 @@
+import bisect
+import sys
+import threading
+import time
+from collections import Counter
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100, 200)
+
+
+class Histogram:
+    """Cumulative histogram of observed values, as exported to Prometheus."""
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+
+
+class Registry:
+    """In-process histograms of request metrics labelled by view, method and status.
+
+    Every process keeps its own numbers, Prometheus sums them over scraped
+    instances.
+    """
+
+    metrics = {
+        'http_request_duration_seconds': ('Total request latency.', LATENCY_BUCKETS),
+        'http_request_db_queries': ('Number of SQL queries per request.', QUERY_BUCKETS),
+        'http_request_db_seconds': ('Time spent in SQL queries per request.', LATENCY_BUCKETS),
+        'http_request_render_seconds': (
+            'Time spent serializing the response body.', LATENCY_BUCKETS,
+        ),
+    }
+
+    def __init__(self):
+        self.histograms = {}
+        self.lock = threading.Lock()
+
+    def observe(self, labels, **values):
+        """Record values of metrics for a request with labels."""
+        labels = tuple(sorted(labels.items()))
+        with self.lock:
+            for name, value in values.items():
+                key = (name, labels)
+                if key not in self.histograms:
+                    self.histograms[key] = Histogram(self.metrics[name][1])
+                self.histograms[key].observe(value)
+
+    def clear(self):
+        with self.lock:
+            self.histograms.clear()
+
+    def render(self):
+        """Return all histograms in Prometheus text exposition format."""
+        with self.lock:
+            snapshot = {
+                key: (list(histogram.counts), histogram.sum)
+                for key, histogram in self.histograms.items()
+            }
+
+        lines = []
+        for name, (description, buckets) in self.metrics.items():
+            lines.append(f'# HELP {name} {description}')
+            lines.append(f'# TYPE {name} histogram')
+            for (metric, labels), (counts, total) in sorted(snapshot.items()):
+                if metric != name:
+                    continue
+                label_text = ','.join(f'{key}="{escape(value)}"' for key, value in labels)
+                cumulative = 0
+                for bound, count in zip((*buckets, '+Inf'), counts):
+                    cumulative += count
+                    lines.append(f'{name}_bucket{{{label_text},le="{bound}"}} {cumulative}')
+                lines.append(f'{name}_sum{{{label_text}}} {total}')
+                lines.append(f'{name}_count{{{label_text}}} {cumulative}')
+        return '\n'.join(lines) + '\n'
+
+
+def escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+registry = Registry()
+
+
+class QueryRecorder:
+    """Database execute wrapper counting queries and their time.
+
+    Statements are kept only when collect_sql is set, for the slow request log.
+    """
+
+    def __init__(self, collect_sql=False):
+        self.count = 0
+        self.seconds = 0.0
+        self.collect_sql = collect_sql
+        self.statements = []
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration = time.perf_counter() - start
+            self.count += 1
+            self.seconds += duration
+            if self.collect_sql:
+                self.statements.append((duration, sql))
+
+
+class SamplingProfiler:
+    """Sample stacks of one thread from a background thread.
+
+    Output is in collapsed stack format, which flame graph tools read.
+    """
+
+    def __init__(self, thread_id, interval=0.001):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self.running = threading.Event()
+        self.thread = threading.Thread(target=self.sample, daemon=True)
+
+    def start(self):
+        self.running.set()
+        self.thread.start()
+
+    def stop(self):
+        self.running.clear()
+        self.thread.join()
+
+    def sample(self):
+        while self.running.is_set():
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f'{code.co_filename}:{code.co_name}')
+                frame = frame.f_back
+            if stack:
+                self.stacks[';'.join(reversed(stack))] += 1
+            time.sleep(self.interval)
+
+    def render(self):
+        return ''.join(f'{stack} {count}\n' for stack, count in self.stacks.most_common())
@@ -0,0 +1,276 @@
+import asyncio
+import logging
+import threading
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+from django.http import HttpResponse
+from django.utils.cache import patch_vary_headers
+from django.utils.text import compress_sequence, compress_string
+from rest_framework.exceptions import APIException
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+
+from api.metrics import QueryRecorder, SamplingProfiler, registry
+from api.routers import use_replicas
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+logger = logging.getLogger(__name__)
+
+
+def accepted_encodings(header):
+    """Return content codings of an Accept-Encoding header with a non-zero quality."""
+    encodings = set()
+    for part in header.split(','):
+        name, _, params = part.partition(';')
+        name, params = name.strip().lower(), params.strip().replace(' ', '')
+        try:
+            quality = float(params[2:]) if params.startswith('q=') else 1.0
+        except ValueError:
+            quality = 0.0
+        if name and quality > 0:
+            encodings.add(name)
+    return encodings
+
+
+def brotli_sequence(sequence, quality):
+    compressor = brotli.Compressor(quality=quality)
+    for item in sequence:
+        data = compressor.process(item) + compressor.flush()
+        if data:
+            yield data
+    yield compressor.finish()
+
+
+def is_staff(request):
+    """Return whether a staff user makes the request, authenticated as API views do."""
+    user = getattr(request, 'user', None)
+    if user is not None and user.is_authenticated:
+        return user.is_staff
+    authenticators = [
+        authenticator() for authenticator in api_settings.DEFAULT_AUTHENTICATION_CLASSES
+    ]
+    try:
+        return Request(request, authenticators=authenticators).user.is_staff
+    except APIException:
+        return False
+
+
+def request_labels(request, response):
+    match = request.resolver_match
+    return {
+        'view': match.view_name if match is not None else 'unresolved',
+        'method': request.method,
+        'status': f'{response.status_code // 100}xx',
+    }
+
+
+class MetricsMiddleware:
+    """Record latency, SQL and rendering cost of every request.
+
+    Staff users can add ?profile=1 to a request to get sampled stacks of
+    the request instead of its response, when PROFILING_ENABLED is set.
+    Async views query the database from worker threads, so only their
+    latency and rendering are recorded.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if asyncio.iscoroutinefunction(self.get_response):
+            self._is_coroutine = asyncio.coroutines._is_coroutine
+
+    def __call__(self, request):
+        if asyncio.iscoroutinefunction(self.get_response):
+            return self.__acall__(request)
+        if not settings.METRICS_ENABLED:
+            return self.get_response(request)
+
+        slow_seconds = settings.SLOW_REQUEST_SECONDS
+        recorder = QueryRecorder(collect_sql=slow_seconds > 0)
+        request.profiler = None
+        request.render_seconds = 0.0
+        start = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(recorder))
+                response = self.get_response(request)
+        finally:
+            if request.profiler is not None:
+                request.profiler.stop()
+        duration = time.perf_counter() - start
+
+        registry.observe(
+            request_labels(request, response),
+            http_request_duration_seconds=duration,
+            http_request_db_queries=recorder.count,
+            http_request_db_seconds=recorder.seconds,
+            http_request_render_seconds=request.render_seconds,
+        )
+
+        if slow_seconds > 0 and duration >= slow_seconds:
+            logger.warning(
+                'Slow request %s %s took %.3fs, %d queries in %.3fs:\n%s',
+                request.method, request.get_full_path(), duration,
+                recorder.count, recorder.seconds,
+                '\n'.join(f'{seconds:.4f}s {sql}' for seconds, sql in recorder.statements),
+            )
+
+        if request.profiler is not None:
+            return HttpResponse(request.profiler.render(), content_type='text/plain')
+        return response
+
+    async def __acall__(self, request):
+        if not settings.METRICS_ENABLED:
+            return await self.get_response(request)
+
+        request.render_seconds = 0.0
+        start = time.perf_counter()
+        response = await self.get_response(request)
+        duration = time.perf_counter() - start
+
+        registry.observe(
+            request_labels(request, response),
+            http_request_duration_seconds=duration,
+            http_request_render_seconds=request.render_seconds,
+        )
+        if 0 < settings.SLOW_REQUEST_SECONDS <= duration:
+            logger.warning(
+                'Slow request %s %s took %.3fs',
+                request.method, request.get_full_path(), duration,
+            )
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        """Start the profiler once the request is known to come from a staff user."""
+        # Only sync requests set request.profiler, async ones aren't profiled.
+        if (
+            not settings.PROFILING_ENABLED or 'profile' not in request.GET
+            or not hasattr(request, 'profiler') or not is_staff(request)
+        ):
+            return None
+        request.profiler = SamplingProfiler(
+            threading.get_ident(), interval=settings.PROFILING_INTERVAL,
+        )
+        request.profiler.start()
+        return None
+
+    def process_template_response(self, request, response):
+        """Time rendering of DRF and template responses."""
+        start = time.perf_counter()
+
+        def rendered(response):
+            request.render_seconds = time.perf_counter() - start
+
+        response.add_post_render_callback(rendered)
+        return response
+
+
+class ReplicaMiddleware:
+    """Allow reads of GET, HEAD and OPTIONS requests to go to read replicas.
+
+    Other requests read from the primary, so they see rows they are about
+    to change.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if asyncio.iscoroutinefunction(self.get_response):
+            self._is_coroutine = asyncio.coroutines._is_coroutine
+
+    def __call__(self, request):
+        if asyncio.iscoroutinefunction(self.get_response):
+            return self.__acall__(request)
+        with use_replicas(request.method in SAFE_METHODS):
+            return self.get_response(request)
+
+    async def __acall__(self, request):
+        with use_replicas(request.method in SAFE_METHODS):
+            return await self.get_response(request)
+
+
+class CompressionMiddleware:
+    """Compress responses with brotli or gzip, whichever the client accepts.
+
+    Brotli is preferred when the brotli package is installed. Responses
+    smaller than COMPRESSION_MIN_SIZE bytes are sent as they are, they
+    would cost more CPU than they save on the wire. Streamed exports are
+    compressed chunk by chunk.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if asyncio.iscoroutinefunction(self.get_response):
+            self._is_coroutine = asyncio.coroutines._is_coroutine
+
+    def __call__(self, request):
+        if asyncio.iscoroutinefunction(self.get_response):
+            return self.__acall__(request)
+        return self.compress(request, self.get_response(request))
+
+    async def __acall__(self, request):
+        return self.compress(request, await self.get_response(request))
+
+    def get_encoding(self, request):
+        """Return the content coding to compress the response of a request with."""
+        accepted = accepted_encodings(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+        if brotli is not None and 'br' in accepted:
+            return 'br'
+        if 'gzip' in accepted:
+            return 'gzip'
+        return None
+
+    def compress(self, request, response):
+        if not settings.COMPRESSION_ENABLED or response.has_header('Content-Encoding'):
+            return response
+        if not response.streaming and len(response.content) < settings.COMPRESSION_MIN_SIZE:
+            return response
+
+        patch_vary_headers(response, ('Accept-Encoding',))
+        encoding = self.get_encoding(request)
+        if encoding is None:
+            return response
+
+        if response.streaming:
+            if encoding == 'br':
+                response.streaming_content = brotli_sequence(
+                    response.streaming_content, settings.COMPRESSION_BROTLI_QUALITY,
+                )
+            else:
+                response.streaming_content = compress_sequence(response.streaming_content)
+            del response['Content-Length']
+        else:
+            if encoding == 'br':
+                content = brotli.compress(
+                    response.content, quality=settings.COMPRESSION_BROTLI_QUALITY,
+                )
+            else:
+                content = compress_string(response.content)
+            if len(content) >= len(response.content):
+                return response
+            response.content = content
+            response['Content-Length'] = str(len(content))
+
+        # The compressed body differs byte for byte, as in GZipMiddleware.
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response['ETag'] = f'W/{etag}'
+        response['Content-Encoding'] = encoding
+        return response
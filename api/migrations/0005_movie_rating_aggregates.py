@@ -0,0 +1,63 @@
+from django.db import migrations, models
+from django.db.models import Count, Q, Sum
+
+STARS = range(1, 6)
+
+
+def fill_rating_aggregates(apps, schema_editor):
+    """Calculate aggregates for ratings created before the fields existed."""
+    Movie = apps.get_model('api', 'Movie')
+    Rating = apps.get_model('api', 'Rating')
+    rows = Rating.objects.order_by().values('movie').annotate(
+        rating_count=Count('id'),
+        rating_sum=Sum('stars'),
+        **{f'stars_{stars}_count': Count('id', filter=Q(stars=stars)) for stars in STARS},
+    )
+    for row in rows.iterator():
+        Movie.objects.filter(pk=row.pop('movie')).update(**row)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0004_movie_poster'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='movie',
+            name='rating_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Rating Count'),
+        ),
+        migrations.AddField(
+            model_name='movie',
+            name='rating_sum',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Rating Sum'),
+        ),
+        migrations.AddField(
+            model_name='movie',
+            name='stars_1_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='1 Star Ratings'),
+        ),
+        migrations.AddField(
+            model_name='movie',
+            name='stars_2_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='2 Star Ratings'),
+        ),
+        migrations.AddField(
+            model_name='movie',
+            name='stars_3_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='3 Star Ratings'),
+        ),
+        migrations.AddField(
+            model_name='movie',
+            name='stars_4_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='4 Star Ratings'),
+        ),
+        migrations.AddField(
+            model_name='movie',
+            name='stars_5_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='5 Star Ratings'),
+        ),
+        migrations.RunPython(fill_rating_aggregates, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,26 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0006_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='movie',
+            name='poster_error',
+            field=models.TextField(blank=True, editable=False, verbose_name='Poster Error'),
+        ),
+        migrations.AddField(
+            model_name='movie',
+            name='poster_status',
+            field=models.CharField(blank=True, choices=[('pending', 'Pending'), ('ready', 'Ready'), ('failed', 'Failed')], editable=False, max_length=10, verbose_name='Poster Status'),
+        ),
+        migrations.AddField(
+            model_name='movie',
+            name='poster_variants',
+            field=models.JSONField(default=dict, editable=False, verbose_name='Poster Variants'),
+        ),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 3.1.5 on 2026-10-18 13:07
+
+import api.models
+from django.db import migrations, models
+from django.db.models import F
+
+
+def fill_rating_scores(apps, schema_editor):
+    """Calculate scores of movies rated before the fields existed."""
+    Movie = apps.get_model('api', 'Movie')
+    average, bayesian = api.models.rating_score_expressions(F('rating_count'), F('rating_sum'))
+    Movie.objects.update(rating_average=average, bayesian_score=bayesian)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0007_movie_poster_variants'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='movie',
+            name='bayesian_score',
+            field=models.FloatField(default=api.models.unrated_bayesian_score, editable=False, verbose_name='Bayesian Score'),
+        ),
+        migrations.AddField(
+            model_name='movie',
+            name='rating_average',
+            field=models.FloatField(editable=False, null=True, verbose_name='Average Rating'),
+        ),
+        migrations.RunPython(fill_rating_scores, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='movie',
+            index=models.Index(fields=['-rating_average', 'id'], name='movie_rating_average_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='movie',
+            index=models.Index(fields=['-bayesian_score', 'id'], name='movie_bayesian_score_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='movie',
+            index=models.Index(fields=['-rating_count', 'id'], name='movie_rating_count_idx'),
+        ),
+    ]
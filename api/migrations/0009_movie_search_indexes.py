@@ -0,0 +1,44 @@
+from django.db import migrations
+
+CREATE_SQL = [
+    """
+    ALTER TABLE api_movie ADD COLUMN search_vector tsvector GENERATED ALWAYS AS (
+        setweight(to_tsvector('english', coalesce(title, '')), 'A')
+        || setweight(to_tsvector('english', coalesce(description, '')), 'B')
+    ) STORED
+    """,
+    'CREATE INDEX movie_search_vector_idx ON api_movie USING gin (search_vector)',
+    'CREATE INDEX movie_title_prefix_idx ON api_movie (UPPER(title) text_pattern_ops)',
+]
+
+DROP_SQL = [
+    'DROP INDEX IF EXISTS movie_title_prefix_idx',
+    'DROP INDEX IF EXISTS movie_search_vector_idx',
+    'ALTER TABLE api_movie DROP COLUMN IF EXISTS search_vector',
+]
+
+
+def create_search_indexes(apps, schema_editor):
+    """Create full-text and prefix indexes, other databases use the in-process index."""
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for sql in CREATE_SQL:
+        schema_editor.execute(sql)
+
+
+def drop_search_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for sql in DROP_SQL:
+        schema_editor.execute(sql)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0008_movie_ranking'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_indexes, drop_search_indexes),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 3.1.5 on 2026-10-18 13:10
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0009_movie_search_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MovieSimilarity',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('score', models.FloatField(verbose_name='Score')),
+                ('movie', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='similarities', to='api.movie', verbose_name='Movie')),
+                ('similar_movie', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='similar_to', to='api.movie', verbose_name='Similar Movie')),
+            ],
+            options={
+                'verbose_name': 'Movie Similarity',
+                'verbose_name_plural': 'Movie Similarities',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='moviesimilarity',
+            index=models.Index(fields=['movie', '-score'], name='movie_similarity_score_idx'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='moviesimilarity',
+            unique_together={('movie', 'similar_movie')},
+        ),
+    ]
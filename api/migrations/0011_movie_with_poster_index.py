@@ -0,0 +1,17 @@
+# Generated by Django 3.1.5 on 2026-10-18 13:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0010_moviesimilarity'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='movie',
+            index=models.Index(condition=models.Q(_negated=True, poster=''), fields=['id'], name='movie_with_poster_idx'),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 3.1.5 on 2026-10-18 13:25
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0011_movie_with_poster_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='rating',
+            index=models.Index(fields=['user', 'movie'], name='rating_user_movie_idx'),
+        ),
+        migrations.AlterField(
+            model_name='rating',
+            name='movie',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='ratings', to='api.movie', verbose_name='Rating'),
+        ),
+        migrations.AlterField(
+            model_name='rating',
+            name='user',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='ratings', to=settings.AUTH_USER_MODEL, verbose_name='User'),
+        ),
+        migrations.AlterIndexTogether(
+            name='rating',
+            index_together=set(),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 3.1.5 on 2026-10-18 14:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0012_rating_user_movie_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='movie',
+            index=models.Index(condition=models.Q(poster=''), fields=['id'], name='movie_without_poster_idx'),
+        ),
+    ]
@@ -1,9 +1,18 @@
+import math
+from collections import Counter, defaultdict
+
 from django.conf import settings
 from django.contrib.auth.models import (AbstractBaseUser, BaseUserManager,
                                         PermissionsMixin)
 from django.core.validators import MaxValueValidator, MinValueValidator
-from django.db import models
-from django.db.models import Avg
+from django.db import connections, models, router, transaction
+from django.db.models import Count, F, FloatField, Q, Sum, Value
+from django.db.models.functions import Cast, Now, NullIf
+from django.utils import timezone
+
+MIN_STARS = 1
+MAX_STARS = 5
+STARS = range(MIN_STARS, MAX_STARS + 1)
 
 
 class UserManager(BaseUserManager):
@@ -45,9 +54,168 @@ class User(AbstractBaseUser, PermissionsMixin):
         return self.name
 
 
+def stars_field(stars):
+    """Return the name of the histogram field counting ratings with given stars."""
+    return f'stars_{stars}_count'
+
+
+def rating_scores(count, total):
+    """Return (average, bayesian score) of ratings with a given count and sum.
+
+    The bayesian score pulls averages of movies with few ratings towards
+    RANKING_PRIOR_MEAN as if they had RANKING_PRIOR_WEIGHT more ratings.
+    """
+    weight = settings.RANKING_PRIOR_WEIGHT
+    average = total / count if count else None
+    bayesian = (weight * settings.RANKING_PRIOR_MEAN + total) / (weight + count)
+    return average, bayesian
+
+
+def unrated_bayesian_score():
+    return rating_scores(0, 0)[1]
+
+
+def rating_score_expressions(count, total):
+    """Return (average, bayesian score) SQL expressions of count and sum expressions."""
+    weight = settings.RANKING_PRIOR_WEIGHT
+    total = Cast(total, FloatField())
+    average = total / Cast(NullIf(count, Value(0)), FloatField())
+    bayesian = (Value(weight * settings.RANKING_PRIOR_MEAN) + total) / (
+        Value(float(weight)) + Cast(count, FloatField())
+    )
+    return average, bayesian
+
+
+def same_value(first, second):
+    if isinstance(first, float) and isinstance(second, float):
+        return math.isclose(first, second)
+    return first == second
+
+
+class MovieManager(models.Manager):
+    """Manager keeping denormalized rating aggregates of movies."""
+
+    def lock(self, movie_ids):
+        """Lock movies until the end of the transaction and return ids of existing ones.
+
+        Every rating writer locks the movies it changes in pk order first,
+        so F() updates of aggregates run one after another and never deadlock.
+        """
+        return list(
+            self.select_for_update().filter(pk__in=movie_ids)
+            .order_by('pk').values_list('pk', flat=True)
+        )
+
+    def apply_rating_change(self, previous=None, current=None):
+        """Move aggregates from a previous (movie_id, stars) rating state to a current one.
+
+        Either state may be None for a created or deleted rating.
+        """
+        self.apply_rating_changes([(previous, current)])
+
+    def apply_rating_changes(self, changes):
+        """Apply many (previous, current) rating state changes to movie aggregates.
+
+        Changes are summed up per movie and every movie gets a single UPDATE
+        with F() expressions, so concurrent writers never overwrite each
+        other's counters.
+        """
+        deltas = defaultdict(Counter)
+        for previous, current in changes:
+            if previous == current:
+                continue
+            if previous:
+                movie_id, stars = previous
+                deltas[movie_id].update({'rating_count': -1, stars_field(stars): -1})
+                deltas[movie_id]['rating_sum'] -= stars
+            if current:
+                movie_id, stars = current
+                deltas[movie_id].update({'rating_count': 1, stars_field(stars): 1})
+                deltas[movie_id]['rating_sum'] += stars
+
+        for movie_id, delta in deltas.items():
+            updates = {field: F(field) + value for field, value in delta.items() if value}
+            if not updates:
+                continue
+            updates['rating_average'], updates['bayesian_score'] = rating_score_expressions(
+                F('rating_count') + delta['rating_count'],
+                F('rating_sum') + delta['rating_sum'],
+            )
+            self.filter(pk=movie_id).update(updated_at=Now(), **updates)
+
+    def rebuild_rating_aggregates(self, movie_ids=None, dry_run=False, chunk_size=1000):
+        """Recalculate rating aggregates from the Rating table.
+
+        Return ids of movies whose stored aggregates were out of date. With
+        dry_run the stale rows are only reported, not fixed.
+        """
+        movies = self.order_by('pk')
+        if movie_ids is not None:
+            movies = movies.filter(pk__in=movie_ids)
+        fields = ['rating_count', 'rating_sum'] + [stars_field(stars) for stars in STARS]
+        scores = ['rating_average', 'bayesian_score']
+
+        stale = []
+        last_pk = 0
+        while True:
+            chunk = list(
+                movies.filter(pk__gt=last_pk).only('pk', *fields, *scores)[:chunk_size],
+            )
+            if not chunk:
+                break
+            last_pk = chunk[-1].pk
+            actual = {
+                row.pop('movie'): row
+                for row in Rating.objects.filter(
+                    movie__in=[movie.pk for movie in chunk],
+                ).order_by().values('movie').annotate(
+                    rating_count=Count('id'),
+                    rating_sum=Sum('stars'),
+                    **{
+                        stars_field(stars): Count('id', filter=Q(stars=stars))
+                        for stars in STARS
+                    },
+                )
+            }
+
+            changed = []
+            now = timezone.now()
+            for movie in chunk:
+                values = actual.get(movie.pk, dict.fromkeys(fields, 0))
+                values.update(zip(
+                    scores, rating_scores(values['rating_count'], values['rating_sum']),
+                ))
+                if any(not same_value(getattr(movie, field), values[field]) for field in values):
+                    for field, value in values.items():
+                        setattr(movie, field, value)
+                    movie.updated_at = now
+                    changed.append(movie)
+            stale.extend(movie.pk for movie in changed)
+            if changed and not dry_run:
+                with transaction.atomic(using=self.db):
+                    self.bulk_update(changed, fields + scores + ['updated_at'])
+
+        return stale
+
+
 class Movie(models.Model):
     """Model to represent movie oblect."""
 
+    AGGREGATE_FIELDS = (
+        ('rating_count', 'rating_sum', 'rating_average', 'bayesian_score')
+        + tuple(stars_field(stars) for stars in STARS)
+    )
+    POSTER_FIELDS = ('poster_status', 'poster_variants', 'poster_error')
+
+    POSTER_PENDING = 'pending'
+    POSTER_READY = 'ready'
+    POSTER_FAILED = 'failed'
+    POSTER_STATUSES = (
+        (POSTER_PENDING, 'Pending'),
+        (POSTER_READY, 'Ready'),
+        (POSTER_FAILED, 'Failed'),
+    )
+
     title = models.CharField('Movie Title', max_length=100, unique=True, db_index=True)
     description = models.TextField('Movie Description', max_length=500, blank=True)
     poster = models.ImageField(
@@ -55,19 +223,125 @@ class Movie(models.Model):
         upload_to='uploads/%Y/%m/%d/',
         blank=True,
     )
+    poster_status = models.CharField(
+        'Poster Status',
+        max_length=10,
+        choices=POSTER_STATUSES,
+        blank=True,
+        editable=False,
+    )
+    poster_variants = models.JSONField('Poster Variants', default=dict, editable=False)
+    poster_error = models.TextField('Poster Error', blank=True, editable=False)
+    rating_count = models.PositiveIntegerField('Rating Count', default=0, editable=False)
+    rating_sum = models.PositiveIntegerField('Rating Sum', default=0, editable=False)
+    stars_1_count = models.PositiveIntegerField('1 Star Ratings', default=0, editable=False)
+    stars_2_count = models.PositiveIntegerField('2 Star Ratings', default=0, editable=False)
+    stars_3_count = models.PositiveIntegerField('3 Star Ratings', default=0, editable=False)
+    stars_4_count = models.PositiveIntegerField('4 Star Ratings', default=0, editable=False)
+    stars_5_count = models.PositiveIntegerField('5 Star Ratings', default=0, editable=False)
+    rating_average = models.FloatField('Average Rating', null=True, editable=False)
+    bayesian_score = models.FloatField(
+        'Bayesian Score',
+        default=unrated_bayesian_score,
+        editable=False,
+    )
+    updated_at = models.DateTimeField('Updated At', auto_now=True, db_index=True)
+
+    objects = MovieManager()
 
     class Meta:
         verbose_name = 'Movie'
         verbose_name_plural = 'Movies'
+        indexes = [
+            models.Index(fields=['-rating_average', 'id'], name='movie_rating_average_idx'),
+            models.Index(fields=['-bayesian_score', 'id'], name='movie_bayesian_score_idx'),
+            models.Index(fields=['-rating_count', 'id'], name='movie_rating_count_idx'),
+            models.Index(fields=['id'], condition=~Q(poster=''), name='movie_with_poster_idx'),
+            models.Index(fields=['id'], condition=Q(poster=''), name='movie_without_poster_idx'),
+        ]
 
     def __str__(self):
         return self.title
 
+    def save(self, *args, **kwargs):
+        """Save a movie without overwriting fields maintained in the background.
+
+        Rating aggregates and poster variants of an existing row are only
+        changed with UPDATE queries, a stale instance mustn't save them back.
+        """
+        if not self._state.adding and kwargs.get('update_fields') is None \
+                and not kwargs.get('force_insert'):
+            maintained = self.AGGREGATE_FIELDS + self.POSTER_FIELDS
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in maintained
+            ]
+        super().save(*args, **kwargs)
+
     def average_rating(self):
-        """Calculate average rating for a movie."""
-        return Movie.objects.filter(
-            id=self.id,
-        ).aggregate(average_rating=Avg('ratings__stars'))['average_rating']
+        """Return average rating for a movie from stored aggregates."""
+        return rating_scores(self.rating_count, self.rating_sum)[0]
+
+    @property
+    def rating_histogram(self):
+        """Return number of ratings per stars."""
+        return {stars: getattr(self, stars_field(stars)) for stars in STARS}
+
+
+class RatingManager(models.Manager):
+    """Manager for ratings supporting batched upserts."""
+
+    def upsert(self, rows):
+        """Create or update (movie_id, user_id, stars) rows and update movie aggregates.
+
+        Rows are written with INSERT ... ON CONFLICT against the (movie,
+        user) unique constraint, one statement per batch. Rated movies are
+        locked first, so aggregates stay consistent with concurrent writers.
+        A (movie, user) pair must appear only once in rows.
+        """
+        rows = list(rows)
+        if not rows:
+            return 0
+
+        db = router.db_for_write(self.model)
+        connection = connections[db]
+        movie_ids = sorted({movie_id for movie_id, _, _ in rows})
+        user_ids = {user_id for _, user_id, _ in rows}
+
+        with transaction.atomic(using=db):
+            Movie.objects.db_manager(db).lock(movie_ids)
+            existing = {
+                (movie_id, user_id): stars
+                for movie_id, user_id, stars in self.using(db).filter(
+                    movie__in=movie_ids, user__in=user_ids,
+                ).values_list('movie', 'user', 'stars').iterator()
+            }
+
+            table = connection.ops.quote_name(self.model._meta.db_table)
+            now = connection.ops.adapt_datetimefield_value(timezone.now())
+            fields = ['movie', 'user', 'stars', 'updated_at']
+            batch_size = connection.ops.bulk_batch_size(fields, rows)
+            with connection.cursor() as cursor:
+                for start in range(0, len(rows), batch_size):
+                    batch = rows[start:start + batch_size]
+                    cursor.execute(
+                        f'INSERT INTO {table} (movie_id, user_id, stars, updated_at) '
+                        f'VALUES {", ".join(["(%s, %s, %s, %s)"] * len(batch))} '
+                        'ON CONFLICT (movie_id, user_id) DO UPDATE '
+                        'SET stars = EXCLUDED.stars, updated_at = EXCLUDED.updated_at',
+                        [value for row in batch for value in (*row, now)],
+                    )
+
+            Movie.objects.db_manager(db).apply_rating_changes(
+                (
+                    (movie_id, existing[movie_id, user_id]) if (movie_id, user_id) in existing
+                    else None,
+                    (movie_id, stars),
+                )
+                for movie_id, user_id, stars in rows
+            )
+
+        return len(rows)
 
 
 class Rating(models.Model):
@@ -75,26 +349,115 @@ class Rating(models.Model):
 
     stars = models.PositiveIntegerField(
         'Stars',
-        validators=[MinValueValidator(1), MaxValueValidator(5)],
+        validators=[MinValueValidator(MIN_STARS), MaxValueValidator(MAX_STARS)],
     )
+    # Lookups by movie use the unique (movie, user) index and lookups by
+    # user the (user, movie) one, so the foreign keys need no own indexes.
     movie = models.ForeignKey(
         'api.Movie',
         verbose_name='Rating',
         on_delete=models.CASCADE,
         related_name='ratings',
+        db_index=False,
     )
     user = models.ForeignKey(
         settings.AUTH_USER_MODEL,
         verbose_name='User',
         on_delete=models.CASCADE,
         related_name='ratings',
+        db_index=False,
     )
+    updated_at = models.DateTimeField('Updated At', auto_now=True, db_index=True)
+
+    objects = RatingManager()
 
     class Meta:
         verbose_name = 'Rating'
         verbose_name_plural = 'Ratings'
         unique_together = ['movie', 'user']
-        index_together = ['movie', 'user']
+        indexes = [
+            models.Index(fields=['user', 'movie'], name='rating_user_movie_idx'),
+        ]
+
+    # (movie_id, stars) as stored in the database, used to update aggregates.
+    _loaded_values = None
 
     def __str__(self):
         return f'Rating {self.pk} for {self.movie}'
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        """Remember loaded values to calculate aggregate changes on save."""
+        instance = super().from_db(db, field_names, values)
+        if 'movie_id' in field_names and 'stars' in field_names:
+            instance._loaded_values = (instance.movie_id, instance.stars)
+        return instance
+
+    def lock_movies(self, db):
+        """Lock rated movies like RatingManager.upsert and reload the stored rating.
+
+        Stored values may have been changed by an upsert since the rating
+        was loaded, aggregates are updated from the ones read under the lock.
+        """
+        movie_ids = {self.movie_id}
+        if self._loaded_values is not None:
+            movie_ids.add(self._loaded_values[0])
+        Movie.objects.db_manager(db).lock(movie_ids)
+
+        stored = None
+        if self.pk is not None:
+            stored = type(self).objects.using(db).filter(pk=self.pk).values_list(
+                'movie', 'stars',
+            ).first()
+        if stored is not None and stored[0] not in movie_ids:
+            Movie.objects.db_manager(db).lock([stored[0]])
+        self._loaded_values = stored
+
+    def save(self, *args, **kwargs):
+        """Save a rating and update movie aggregates in one transaction."""
+        db = kwargs.get('using') or router.db_for_write(type(self), instance=self)
+        with transaction.atomic(using=db):
+            self.lock_movies(db)
+            super().save(*args, **kwargs)
+
+    def delete(self, *args, **kwargs):
+        """Delete a rating and update movie aggregates in one transaction.
+
+        A rating already deleted by another writer is left alone, its
+        aggregates were removed by that writer.
+        """
+        db = kwargs.get('using') or router.db_for_write(type(self), instance=self)
+        with transaction.atomic(using=db):
+            self.lock_movies(db)
+            if self._loaded_values is None:
+                return 0, {}
+            return super().delete(*args, **kwargs)
+
+
+class MovieSimilarity(models.Model):
+    """Precomputed similarity of a movie to one of its nearest neighbours."""
+
+    movie = models.ForeignKey(
+        'api.Movie',
+        verbose_name='Movie',
+        on_delete=models.CASCADE,
+        related_name='similarities',
+    )
+    similar_movie = models.ForeignKey(
+        'api.Movie',
+        verbose_name='Similar Movie',
+        on_delete=models.CASCADE,
+        related_name='similar_to',
+    )
+    score = models.FloatField('Score')
+
+    class Meta:
+        verbose_name = 'Movie Similarity'
+        verbose_name_plural = 'Movie Similarities'
+        unique_together = ['movie', 'similar_movie']
+        indexes = [
+            models.Index(fields=['movie', '-score'], name='movie_similarity_score_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.movie_id} is similar to {self.similar_movie_id}'
@@ -0,0 +1,28 @@
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+class FastJSONRenderer(JSONRenderer):
+    """Render JSON with orjson, falling back to the stdlib json module.
+
+    Output matches JSONRenderer: compact UTF-8, with types orjson doesn't
+    know, like decimals and lazy strings, encoded by DRF's encoder.
+    Indented output for browsers is left to JSONRenderer.
+    """
+
+    options = orjson.OPT_NON_STR_KEYS if orjson is not None else 0
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None or self.get_indent(accepted_media_type, renderer_context or {}):
+            return super().render(data, accepted_media_type, renderer_context)
+        if data is None:
+            return b''
+
+        rendered = orjson.dumps(data, default=JSONEncoder().default, option=self.options)
+        # Like JSONRenderer, escape line separators which aren't valid in JavaScript.
+        return rendered.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
@@ -0,0 +1,59 @@
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+
+# Set by ReplicaMiddleware for safe requests and cleared by the first
+# write, so reads after a write in the same request see it. Commands and
+# tasks never read from replicas.
+replicas_allowed = ContextVar('replicas_allowed', default=False)
+
+
+@contextmanager
+def use_replicas(allowed=True):
+    """Let reads in the block go to replicas, or keep them on the primary."""
+    token = replicas_allowed.set(allowed)
+    try:
+        yield
+    finally:
+        replicas_allowed.reset(token)
+
+
+def keep_routing(iterator):
+    """Wrap an iterator so its reads are routed like reads of the current block.
+
+    Streamed responses are consumed after ReplicaMiddleware has returned,
+    the routing is restored around every step instead.
+    """
+    allowed = replicas_allowed.get()
+
+    def steps(iterator):
+        while True:
+            with use_replicas(allowed):
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    return
+            yield item
+
+    return steps(iter(iterator))
+
+
+class ReplicaRouter:
+    """Send reads of safe requests to read replicas and everything else to the primary."""
+
+    def db_for_read(self, model, **hints):
+        if settings.DATABASE_REPLICAS and replicas_allowed.get():
+            return random.choice(settings.DATABASE_REPLICAS)
+        return 'default'
+
+    def db_for_write(self, model, **hints):
+        replicas_allowed.set(False)
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == 'default'
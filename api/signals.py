@@ -0,0 +1,22 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from api.models import Movie, Rating
+
+
+@receiver(post_save, sender=Rating)
+def add_rating_to_aggregates(sender, instance, raw, **kwargs):
+    """Update movie aggregates after a rating is created or changed."""
+    if raw:
+        return
+    current = (instance.movie_id, instance.stars)
+    Movie.objects.apply_rating_change(instance._loaded_values, current)
+    instance._loaded_values = current
+
+
+@receiver(post_delete, sender=Rating)
+def remove_rating_from_aggregates(sender, instance, **kwargs):
+    """Update movie aggregates after a rating is deleted."""
+    previous = instance._loaded_values or (instance.movie_id, instance.stars)
+    Movie.objects.apply_rating_change(previous, None)
+    instance._loaded_values = None
@@ -0,0 +1,158 @@
+import functools
+import logging
+import reprlib
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.core.signals import setting_changed
+from django.db import close_old_connections, connections
+from django.dispatch import receiver
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+
+class Task:
+    """Function run by a task backend outside of the request, with retries."""
+
+    def __init__(self, func, max_retries, on_failure=None):
+        self.func = func
+        self.max_retries = max_retries
+        self.on_failure = on_failure
+        self.path = f'{func.__module__}.{func.__name__}'
+        functools.update_wrapper(self, func)
+
+    def __call__(self, *args):
+        return self.func(*args)
+
+    def delay(self, *args):
+        """Queue the task with the configured backend."""
+        get_backend().enqueue(self, args)
+
+    def retry_delay(self, attempt):
+        """Return seconds to wait before retrying a failed attempt, growing exponentially."""
+        return settings.TASK_RETRY_DELAY * 2 ** attempt
+
+    def run_once(self, args, attempt):
+        """Run one attempt of the task, return True when it failed and should be retried.
+
+        After the last attempt fails on_failure is called with the error,
+        so it stays visible after the worker moves on.
+        """
+        try:
+            self.func(*args)
+        except Exception as error:
+            logger.exception(
+                'Task %s%s failed, attempt %d', self.path, reprlib.repr(args), attempt + 1,
+            )
+            if attempt < self.max_retries:
+                return True
+            if self.on_failure is not None:
+                self.on_failure(error, *args)
+        return False
+
+    def run(self, *args):
+        """Run the task in the calling thread, retrying failures with exponential backoff."""
+        for attempt in range(self.max_retries + 1):
+            if not self.run_once(args, attempt):
+                return
+            time.sleep(self.retry_delay(attempt))
+
+
+def task(max_retries=3, on_failure=None):
+    """Turn a function into a task which can be queued with delay()."""
+    def decorator(func):
+        return Task(func, max_retries, on_failure=on_failure)
+    return decorator
+
+
+class ImmediateBackend:
+    """Run tasks right away in the calling thread, used in tests."""
+
+    def enqueue(self, task, args):
+        task.run(*args)
+
+
+class ThreadPoolBackend:
+    """Run tasks in an in-process pool of worker threads.
+
+    Failed attempts are resubmitted by a timer, so workers don't sleep
+    between retries and stay free for other tasks.
+    """
+
+    def __init__(self):
+        self.executor = ThreadPoolExecutor(
+            max_workers=settings.TASK_WORKERS,
+            thread_name_prefix='task',
+        )
+
+    def enqueue(self, task, args, attempt=0):
+        self.executor.submit(self.run, task, args, attempt)
+
+    def run(self, task, args, attempt):
+        close_old_connections()
+        try:
+            retry = task.run_once(args, attempt)
+        finally:
+            connections.close_all()
+        if retry:
+            timer = threading.Timer(
+                task.retry_delay(attempt), self.enqueue, (task, args, attempt + 1),
+            )
+            timer.daemon = True
+            timer.start()
+
+
+class RetryTask(Exception):
+    """Raised in rq jobs to have a failed attempt rescheduled by rq."""
+
+
+def run_task(path, *args):
+    """Entry point for tasks run by rq workers."""
+    from rq import get_current_job
+
+    task = import_string(path)
+    retries_left = get_current_job().retries_left or 0
+    if task.run_once(args, task.max_retries - retries_left):
+        raise RetryTask(f'Task {path} failed, {retries_left} retries left')
+
+
+class RQBackend:
+    """Queue tasks in Redis for rq workers, started with `rq worker --with-scheduler`.
+
+    Failed attempts are retried by rq, its scheduler queues them again
+    after the backoff delay.
+    """
+
+    def __init__(self):
+        try:
+            from redis import Redis
+            from rq import Queue, Retry
+        except ImportError:
+            raise ImproperlyConfigured('RQBackend requires the rq package.')
+        self.queue = Queue(settings.TASK_QUEUE, connection=Redis.from_url(settings.REDIS_URL))
+        self.retry_class = Retry
+
+    def enqueue(self, task, args):
+        retry = None
+        if task.max_retries:
+            retry = self.retry_class(
+                max=task.max_retries,
+                interval=[task.retry_delay(attempt) for attempt in range(task.max_retries)],
+            )
+        self.queue.enqueue(run_task, task.path, *args, retry=retry)
+
+
+@functools.lru_cache(maxsize=None)
+def get_backend():
+    """Return the task backend instance configured in TASK_BACKEND."""
+    return import_string(settings.TASK_BACKEND)()
+
+
+@receiver(setting_changed)
+def reset_backend(setting, **kwargs):
+    if setting == 'TASK_BACKEND':
+        get_backend.cache_clear()
@@ -0,0 +1,36 @@
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.management import CommandError, call_command
+
+from api.models import Movie, Rating
+
+
+@pytest.fixture
+def movie():
+    movie = Movie.objects.create(title='Movie')
+    user = get_user_model().objects.create_user('test@gmail.com')
+    Rating.objects.create(stars=4, movie=movie, user=user)
+    return movie
+
+
+@pytest.mark.django_db
+def test_check_rating_aggregates_passes(movie):
+    """Test checking aggregates succeeds when they are up to date."""
+    call_command('rebuild_rating_aggregates', '--check')
+
+
+@pytest.mark.django_db
+def test_rebuild_rating_aggregates(movie):
+    """Test rebuilding fixes aggregates changed bypassing signals."""
+    Rating.objects.update(stars=2)
+
+    with pytest.raises(CommandError):
+        call_command('rebuild_rating_aggregates', '--check')
+
+    call_command('rebuild_rating_aggregates')
+    movie.refresh_from_db()
+
+    assert movie.rating_sum == 2
+    assert movie.rating_average == 2
+    assert movie.rating_histogram == {1: 0, 2: 1, 3: 0, 4: 0, 5: 0}
+    call_command('rebuild_rating_aggregates', '--check')
@@ -0,0 +1,91 @@
+import gzip
+import json
+
+import brotli
+import pytest
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from api import middleware
+from api.middleware import accepted_encodings
+from api.models import Movie
+
+MOVIES_URL = reverse('movie:movie-list')
+
+
+@pytest.fixture
+def client():
+    client = APIClient()
+    yield client
+
+
+@pytest.fixture
+def movies():
+    return [
+        Movie.objects.create(title=f'Movie {number}', description='A long plot. ' * 10)
+        for number in range(20)
+    ]
+
+
+@pytest.mark.parametrize('header, expected', [
+    ('gzip, deflate, br', {'gzip', 'deflate', 'br'}),
+    ('br;q=0, gzip;q=0.5', {'gzip'}),
+    ('GZIP; q=1.0, br;q=bad', {'gzip'}),
+    ('', set()),
+])
+def test_accepted_encodings(header, expected):
+    assert accepted_encodings(header) == expected
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('accept, encoding, decompress', [
+    ('gzip, br', 'br', brotli.decompress),
+    ('gzip', 'gzip', gzip.decompress),
+])
+def test_compress_list(client: APIClient, movies, accept, encoding, decompress):
+    """Test large responses are compressed with the best accepted coding."""
+    response = client.get(MOVIES_URL, HTTP_ACCEPT_ENCODING=accept)
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response['Content-Encoding'] == encoding
+    assert response['Vary'].endswith('Accept-Encoding')
+    assert int(response['Content-Length']) == len(response.content)
+    assert len(json.loads(decompress(response.content))['results']) == 20
+
+
+@pytest.mark.django_db
+def test_gzip_without_brotli(client: APIClient, movies, monkeypatch):
+    """Test gzip is used when the brotli package isn't installed."""
+    monkeypatch.setattr(middleware, 'brotli', None)
+    response = client.get(MOVIES_URL, HTTP_ACCEPT_ENCODING='br, gzip')
+
+    assert response['Content-Encoding'] == 'gzip'
+
+
+@pytest.mark.django_db
+def test_small_and_unaccepted_responses_not_compressed(client: APIClient, movies, settings):
+    """Test responses under the threshold or without accepted codings are sent as they are."""
+    assert not client.get(MOVIES_URL).has_header('Content-Encoding')
+
+    settings.COMPRESSION_MIN_SIZE = 10 ** 6
+    response = client.get(MOVIES_URL, HTTP_ACCEPT_ENCODING='gzip, br')
+
+    assert not response.has_header('Content-Encoding')
+    assert len(response.data['results']) == 20
+
+
+@pytest.mark.django_db
+def test_compressed_etag_is_weak(client: APIClient, movies, settings):
+    """Test conditional GET keeps working on compressed responses."""
+    settings.COMPRESSION_MIN_SIZE = 0
+    response = client.get(reverse('movie:movie-detail', args=[movies[0].pk]),
+                          HTTP_ACCEPT_ENCODING='gzip')
+
+    assert response['Content-Encoding'] == 'gzip'
+    assert response['ETag'].startswith('W/"')
+    response = client.get(
+        reverse('movie:movie-detail', args=[movies[0].pk]),
+        HTTP_ACCEPT_ENCODING='gzip', HTTP_IF_NONE_MATCH=response['ETag'],
+    )
+    assert response.status_code == status.HTTP_304_NOT_MODIFIED
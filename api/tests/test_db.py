@@ -0,0 +1,67 @@
+import pytest
+
+from api.db.postgresql.base import DatabaseWrapper
+
+
+class FakeConnection:
+    """Connection whose server side may have gone away."""
+
+    def __init__(self, usable=True):
+        self.usable = usable
+        self.closed = False
+
+    def cursor(self):
+        return self
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        pass
+
+    def execute(self, sql):
+        if not self.usable:
+            raise DatabaseWrapper.Database.OperationalError('server closed the connection')
+
+    def close(self):
+        self.closed = True
+
+
+@pytest.fixture
+def wrapper():
+    wrapper = DatabaseWrapper({
+        'NAME': 'movies', 'USER': '', 'PASSWORD': '', 'HOST': '', 'PORT': '',
+        'OPTIONS': {}, 'AUTOCOMMIT': True, 'CONN_MAX_AGE': 60, 'CONN_HEALTH_CHECKS': True,
+        'TIME_ZONE': None,
+    })
+    wrapper.get_autocommit = lambda: True
+    wrapper.connect = lambda: setattr(wrapper, 'connection', FakeConnection())
+    return wrapper
+
+
+@pytest.mark.django_db
+def test_broken_connection_is_replaced(wrapper):
+    """Test a persistent connection closed by the server is replaced on first use."""
+    broken = FakeConnection(usable=False)
+    wrapper.connection = broken
+
+    wrapper.close_if_unusable_or_obsolete()
+    wrapper.ensure_connection()
+
+    assert broken.closed
+    assert wrapper.connection is not broken
+
+
+@pytest.mark.django_db
+def test_healthy_connection_is_checked_once(wrapper):
+    """Test a working persistent connection is checked once per request and kept."""
+    healthy = FakeConnection()
+    wrapper.connection = healthy
+    wrapper.close_if_unusable_or_obsolete()
+
+    wrapper.ensure_connection()
+    healthy.usable = False
+    wrapper.ensure_connection()
+
+    assert wrapper.connection is healthy
+    assert not healthy.closed
@@ -0,0 +1,130 @@
+import logging
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from api.metrics import Registry, SamplingProfiler, registry
+from api.models import Movie
+
+METRICS_URL = reverse('metrics')
+MOVIES_URL = reverse('movie:movie-list')
+
+
+@pytest.fixture
+def client():
+    client = APIClient()
+    yield client
+
+
+@pytest.fixture(autouse=True)
+def clear_registry():
+    registry.clear()
+    yield
+
+
+@pytest.fixture
+def staff():
+    return get_user_model().objects.create_user('staff@gmail.com', 'password', is_staff=True)
+
+
+def sample(text, line_start):
+    """Return value of the metric sample line starting with line_start."""
+    for line in text.splitlines():
+        if line.startswith(line_start):
+            return float(line.rsplit(' ', 1)[1])
+    raise AssertionError(f'No sample {line_start} in metrics')
+
+
+def test_histogram_buckets_are_cumulative():
+    """Test histograms are exported with cumulative buckets, sum and count."""
+    metrics = Registry()
+    labels = {'view': 'movies', 'method': 'GET', 'status': '2xx'}
+    for queries in (1, 3, 300):
+        metrics.observe(labels, http_request_db_queries=queries)
+
+    text = metrics.render()
+
+    prefix = 'http_request_db_queries_bucket{method="GET",status="2xx",view="movies",'
+    assert sample(text, prefix + 'le="1"}') == 1
+    assert sample(text, prefix + 'le="3"}') == 2
+    assert sample(text, prefix + 'le="+Inf"}') == 3
+    assert sample(text, 'http_request_db_queries_sum{') == 304
+
+
+@pytest.mark.django_db
+def test_requests_are_measured(client: APIClient, staff):
+    """Test requests are recorded per view with their query count."""
+    Movie.objects.create(title='Movie')
+    client.get(MOVIES_URL)
+    client.force_login(staff)
+
+    response = client.get(METRICS_URL)
+
+    assert response.status_code == status.HTTP_200_OK
+    text = response.content.decode()
+    labels = '{method="GET",status="2xx",view="movie:movie-list"}'
+    assert sample(text, f'http_request_duration_seconds_count{labels}') == 1
+    assert sample(text, f'http_request_db_queries_sum{labels}') == 2
+    assert sample(text, f'http_request_render_seconds_sum{labels}') > 0
+
+
+@pytest.mark.django_db
+def test_metrics_need_staff_or_token(client: APIClient, settings):
+    """Test metrics are hidden from the public but open to the scraper token."""
+    settings.METRICS_TOKEN = 'secret'
+
+    assert client.get(METRICS_URL).status_code == status.HTTP_403_FORBIDDEN
+    response = client.get(METRICS_URL, HTTP_AUTHORIZATION='Bearer secret')
+    assert response.status_code == status.HTTP_200_OK
+
+
+@pytest.mark.django_db
+def test_metrics_open_to_staff_tokens(client: APIClient, staff):
+    """Test staff users authenticated with an API token can read metrics."""
+    token = Token.objects.create(user=staff)
+
+    response = client.get(METRICS_URL, HTTP_AUTHORIZATION=f'Token {token.key}')
+
+    assert response.status_code == status.HTTP_200_OK
+
+
+@pytest.mark.django_db
+def test_slow_requests_are_logged(client: APIClient, settings, caplog):
+    """Test slow requests are logged with their SQL."""
+    settings.SLOW_REQUEST_SECONDS = 1e-9
+
+    with caplog.at_level(logging.WARNING, logger='api.middleware'):
+        client.get(MOVIES_URL)
+
+    assert 'Slow request GET /api/movies/' in caplog.text
+    assert 'api_movie' in caplog.text
+
+
+@pytest.mark.django_db
+def test_staff_can_profile_requests(client: APIClient, settings, staff):
+    """Test staff users get sampled stacks instead of the response."""
+    settings.PROFILING_ENABLED = True
+    client.force_authenticate(staff)
+
+    response = client.get(MOVIES_URL, {'profile': 1})
+
+    assert response['Content-Type'] == 'text/plain'
+    assert 'get_response' in response.content.decode()
+
+
+@pytest.mark.django_db
+def test_profiling_is_staff_only(client: APIClient, settings, monkeypatch):
+    """Test other users get the normal response without starting the profiler."""
+    settings.PROFILING_ENABLED = True
+    started = []
+    monkeypatch.setattr(SamplingProfiler, 'start', lambda profiler: started.append(profiler))
+
+    response = client.get(MOVIES_URL, {'profile': 1})
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response['Content-Type'] == 'application/json'
+    assert not started
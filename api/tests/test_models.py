@@ -63,3 +63,88 @@ def test_rating_str():
     )
 
     assert str(rating) == f'Rating {rating.pk} for {movie}'
+
+
+@pytest.fixture
+def movie():
+    return models.Movie.objects.create(title='Rated Movie')
+
+
+@pytest.fixture
+def users():
+    return [
+        get_user_model().objects.create_user(f'user{number}@gmail.com')
+        for number in range(3)
+    ]
+
+
+@pytest.mark.django_db
+def test_movie_without_ratings_has_no_average(movie):
+    """Test movie without ratings has empty aggregates."""
+    assert movie.average_rating() is None
+    assert movie.rating_count == 0
+    assert movie.rating_histogram == {1: 0, 2: 0, 3: 0, 4: 0, 5: 0}
+
+
+@pytest.mark.django_db
+def test_rating_aggregates_follow_changes(movie, users):
+    """Test aggregates are updated on rating create, update and delete."""
+    first = models.Rating.objects.create(stars=5, movie=movie, user=users[0])
+    models.Rating.objects.create(stars=2, movie=movie, user=users[1])
+    movie.refresh_from_db()
+    assert movie.rating_count == 2
+    assert movie.rating_sum == 7
+    assert movie.average_rating() == 3.5
+
+    first = models.Rating.objects.get(pk=first.pk)
+    first.stars = 4
+    first.save()
+    movie.refresh_from_db()
+    assert movie.rating_sum == 6
+    assert movie.rating_histogram == {1: 0, 2: 1, 3: 0, 4: 1, 5: 0}
+
+    first.delete()
+    movie.refresh_from_db()
+    assert movie.rating_count == 1
+    assert movie.average_rating() == 2
+    assert movie.rating_histogram == {1: 0, 2: 1, 3: 0, 4: 0, 5: 0}
+
+
+@pytest.mark.django_db
+def test_rating_deleted_twice(movie, users):
+    """Test deleting a rating already deleted through another instance keeps aggregates."""
+    rating = models.Rating.objects.create(stars=5, movie=movie, user=users[0])
+    models.Rating.objects.create(stars=2, movie=movie, user=users[1])
+    first, second = models.Rating.objects.get(pk=rating.pk), models.Rating.objects.get(pk=rating.pk)
+
+    first.delete()
+    assert second.delete() == (0, {})
+    movie.refresh_from_db()
+
+    assert movie.rating_count == 1
+    assert movie.rating_sum == 2
+    assert movie.rating_histogram == {1: 0, 2: 1, 3: 0, 4: 0, 5: 0}
+
+
+@pytest.mark.django_db
+def test_rating_aggregates_on_user_delete(movie, users):
+    """Test aggregates are updated when ratings are deleted by cascade."""
+    for user in users:
+        models.Rating.objects.create(stars=3, movie=movie, user=user)
+    users[0].delete()
+    movie.refresh_from_db()
+
+    assert movie.rating_count == 2
+    assert movie.rating_sum == 6
+
+
+@pytest.mark.django_db
+def test_movie_save_keeps_aggregates(movie, users):
+    """Test saving a stale movie instance doesn't overwrite aggregates."""
+    models.Rating.objects.create(stars=4, movie=movie, user=users[0])
+    movie.title = 'Renamed Movie'
+    movie.save()
+    movie.refresh_from_db()
+
+    assert movie.title == 'Renamed Movie'
+    assert movie.rating_count == 1
@@ -0,0 +1,53 @@
+import io
+import json
+from decimal import Decimal
+
+import pytest
+from rest_framework.exceptions import ParseError
+from rest_framework.renderers import JSONRenderer
+
+from api import parsers, renderers
+from api.parsers import FastJSONParser
+from api.renderers import FastJSONRenderer
+
+DATA = {
+    'id': 1,
+    'title': 'Amélie',
+    'average_rating': Decimal('4.5'),
+    'ratings': [1, 2],
+    'note': 'line\u2028separator',
+    7: None,
+}
+
+
+@pytest.mark.parametrize('fast', [True, False])
+def test_render_matches_json_renderer(monkeypatch, fast):
+    """Test orjson and stdlib rendering give the same output as JSONRenderer."""
+    if not fast:
+        monkeypatch.setattr(renderers, 'orjson', None)
+
+    rendered = FastJSONRenderer().render(DATA, 'application/json')
+
+    assert json.loads(rendered) == json.loads(JSONRenderer().render(DATA, 'application/json'))
+    assert b'\\u2028' in rendered
+    assert FastJSONRenderer().render(None) == b''
+
+
+def test_render_indent():
+    """Test indented output is still rendered when asked for."""
+    rendered = FastJSONRenderer().render({'id': 1}, 'application/json; indent=2')
+
+    assert rendered == b'{\n  "id": 1\n}'
+
+
+@pytest.mark.parametrize('fast', [True, False])
+def test_parse(monkeypatch, fast):
+    """Test JSON bodies are parsed and invalid ones rejected."""
+    if not fast:
+        monkeypatch.setattr(parsers, 'orjson', None)
+
+    parsed = FastJSONParser().parse(io.BytesIO('{"title": "Amélie"}'.encode()))
+
+    assert parsed == {'title': 'Amélie'}
+    with pytest.raises(ParseError):
+        FastJSONParser().parse(io.BytesIO(b'{"title":'))
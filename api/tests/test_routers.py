@@ -0,0 +1,79 @@
+import pytest
+from django.db import router
+from django.http import HttpResponse, StreamingHttpResponse
+from django.test import RequestFactory
+
+from api.middleware import ReplicaMiddleware
+from api.models import Movie, Rating
+from api.routers import keep_routing
+
+
+@pytest.fixture(autouse=True)
+def replicas(settings):
+    settings.DATABASE_REPLICAS = ['replica_1']
+
+
+def route(method, write=False):
+    """Return databases of reads made by a view before and after it writes."""
+    databases = []
+
+    def view(request):
+        databases.append(router.db_for_read(Movie))
+        if write:
+            databases.append(router.db_for_write(Rating))
+            databases.append(router.db_for_read(Movie))
+        return HttpResponse()
+
+    ReplicaMiddleware(view)(getattr(RequestFactory(), method)('/api/movies/'))
+    return databases
+
+
+def test_safe_requests_read_from_replicas():
+    """Test reads of GET requests go to a replica."""
+    assert route('get') == ['replica_1']
+
+
+def test_writing_requests_read_from_primary():
+    """Test POST requests read from the primary they write to."""
+    assert route('post', write=True) == ['default', 'default', 'default']
+
+
+def test_reads_after_write_stay_on_primary():
+    """Test reads after a write in the same request see it on the primary."""
+    assert route('get', write=True) == ['replica_1', 'default', 'default']
+
+
+def test_reads_outside_requests_use_primary():
+    """Test commands and tasks don't read from replicas."""
+    route('get')
+
+    assert router.db_for_read(Movie) == 'default'
+
+
+def test_without_replicas(settings):
+    """Test everything goes to the primary when no replicas are configured."""
+    settings.DATABASE_REPLICAS = []
+
+    assert route('get') == ['default']
+
+
+def test_streamed_reads_keep_routing():
+    """Test reads of a streamed response read from replicas after the request returns."""
+    def rows():
+        yield router.db_for_read(Movie)
+        yield router.db_for_read(Movie)
+
+    def view(request):
+        return StreamingHttpResponse(keep_routing(rows()))
+
+    response = ReplicaMiddleware(view)(RequestFactory().get('/api/movies/export/'))
+
+    assert router.db_for_read(Movie) == 'default'
+    assert list(response.streaming_content) == [b'replica_1', b'replica_1']
+    assert router.db_for_read(Movie) == 'default'
+
+
+def test_migrations_run_on_primary_only():
+    """Test replicas are never migrated."""
+    assert router.allow_migrate('default', 'api')
+    assert not router.allow_migrate('replica_1', 'api')
@@ -0,0 +1,25 @@
+import threading
+
+from api.tasks import ThreadPoolBackend, task
+
+
+def test_thread_pool_schedules_retries(settings, monkeypatch):
+    """Test failed tasks are retried later without sleeping in pool workers."""
+    settings.TASK_WORKERS = 1
+    settings.TASK_RETRY_DELAY = 0.01
+    monkeypatch.setattr('api.tasks.time.sleep', lambda seconds: 1 / 0)
+    attempts = []
+    done = threading.Event()
+
+    @task(max_retries=2)
+    def flaky():
+        attempts.append(threading.current_thread().name)
+        if len(attempts) < 3:
+            raise OSError('try again')
+        done.set()
+
+    ThreadPoolBackend().enqueue(flaky, ())
+
+    assert done.wait(5)
+    assert len(attempts) == 3
+    assert all(name.startswith('task') for name in attempts)
@@ -0,0 +1,144 @@
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from api.models import Movie
+from api.throttling import SlidingWindowThrottle
+
+TOKEN_URL = reverse('user:token')
+CREATE_USER_URL = reverse('user:create')
+
+
+def rate_url(movie_id):
+    return reverse('movie:movie-rate-movie', args=[movie_id])
+
+
+@pytest.fixture
+def client():
+    client = APIClient()
+    yield client
+
+
+@pytest.fixture
+def rates(settings):
+    settings.REST_FRAMEWORK = {
+        **settings.REST_FRAMEWORK,
+        'DEFAULT_THROTTLE_RATES': {
+            'login': '2/min', 'user_create': '1/hour', 'rating_write': '3/min',
+        },
+    }
+
+
+class BrokenCache:
+    """Cache failing like an unreachable Redis server."""
+
+    def __getattr__(self, name):
+        raise ConnectionError('cache is down')
+
+
+class TenPerMinuteThrottle(SlidingWindowThrottle):
+    scope = 'test'
+    timer = staticmethod(lambda: 90.0)
+
+    def __init__(self):
+        super().__init__()
+        self.num_requests, self.duration = 10, 60
+
+    def get_cache_key(self, request, view):
+        return 'client'
+
+
+@pytest.mark.parametrize('previous, current, allowed', [
+    (0, 9, True),
+    (0, 10, False),
+    (10, 4, True),
+    (10, 5, False),
+])
+def test_sliding_window_weights_previous_window(previous, current, allowed):
+    """Test the previous window counts by how much of it the sliding window covers.
+
+    The timer is half way through the window, so half of the previous count is used.
+    """
+    cache.set_many({
+        'throttle:test:client:0': previous,
+        'throttle:test:client:1': current,
+    })
+    throttle = TenPerMinuteThrottle()
+
+    assert throttle.allow_request(None, None) is allowed
+    if allowed:
+        assert cache.get('throttle:test:client:1') == current + 1
+    else:
+        assert 0 < throttle.wait() <= 30
+
+
+@pytest.mark.django_db
+def test_login_is_throttled_before_checking_password(
+    client: APIClient, rates, django_assert_num_queries,
+):
+    """Test rejected login attempts don't reach password hashing or the database."""
+    get_user_model().objects.create_user('rater@gmail.com', 'password')
+    payload = {'email': 'rater@gmail.com', 'password': 'wrong'}
+    for _ in range(2):
+        client.post(TOKEN_URL, payload)
+
+    with django_assert_num_queries(0):
+        response = client.post(TOKEN_URL, payload)
+
+    assert response.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+    assert int(response['Retry-After']) > 0
+
+
+@pytest.mark.django_db
+def test_login_throttle_ignores_forwarded_for(client: APIClient, rates):
+    """Test clients can't get around the throttle with a new X-Forwarded-For every time."""
+    payload = {'email': 'rater@gmail.com', 'password': 'wrong'}
+
+    codes = [
+        client.post(TOKEN_URL, payload, HTTP_X_FORWARDED_FOR=f'10.0.0.{number}').status_code
+        for number in range(3)
+    ]
+
+    assert codes[-1] == status.HTTP_429_TOO_MANY_REQUESTS
+
+
+@pytest.mark.django_db
+def test_user_create_is_throttled(client: APIClient, rates):
+    """Test one client can't create many users."""
+    payload = {'email': 'first@gmail.com', 'password': 'password', 'name': 'First'}
+    assert client.post(CREATE_USER_URL, payload).status_code == status.HTTP_201_CREATED
+
+    payload['email'] = 'second@gmail.com'
+    response = client.post(CREATE_USER_URL, payload)
+
+    assert response.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+    assert not get_user_model().objects.filter(email='second@gmail.com').exists()
+
+
+@pytest.mark.django_db
+def test_rating_writes_are_throttled_per_user(client: APIClient, rates):
+    """Test rating writes are limited per user while reads are not."""
+    movie = Movie.objects.create(title='Movie')
+    rater = get_user_model().objects.create_user('rater@gmail.com')
+    other = get_user_model().objects.create_user('other@gmail.com')
+    client.force_authenticate(rater)
+    codes = [client.post(rate_url(movie.pk), {'stars': 4}).status_code for _ in range(4)]
+
+    assert codes == [status.HTTP_200_OK] * 3 + [status.HTTP_429_TOO_MANY_REQUESTS]
+    assert client.get(reverse('movie:rating-list')).status_code == status.HTTP_200_OK
+    client.force_authenticate(other)
+    assert client.post(rate_url(movie.pk), {'stars': 4}).status_code == status.HTTP_200_OK
+
+
+@pytest.mark.django_db
+def test_counts_in_process_when_cache_fails(client: APIClient, rates, monkeypatch):
+    """Test throttling keeps working with process counters when the cache is down."""
+    monkeypatch.setattr('api.throttling.caches', {'default': BrokenCache()})
+    payload = {'email': 'rater@gmail.com', 'password': 'wrong'}
+
+    codes = [client.post(TOKEN_URL, payload).status_code for _ in range(3)]
+
+    assert codes[-1] == status.HTTP_429_TOO_MANY_REQUESTS
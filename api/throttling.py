@@ -0,0 +1,158 @@
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework.settings import api_settings
+from rest_framework.throttling import BaseThrottle
+
+logger = logging.getLogger(__name__)
+
+DURATIONS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+
+def parse_rate(rate):
+    """Return (number of requests, window seconds) of a rate like '10/min'."""
+    if not rate:
+        return None, None
+    number, period = rate.split('/')
+    return int(number), DURATIONS[period[0]]
+
+
+class LocalCounters:
+    """Expiring counters in process memory, used when the shared cache fails."""
+
+    def __init__(self):
+        self.counters = {}
+        self.lock = threading.Lock()
+
+    def get_many(self, keys):
+        now = time.monotonic()
+        with self.lock:
+            return {
+                key: self.counters[key][0] for key in keys
+                if key in self.counters and self.counters[key][1] > now
+            }
+
+    def incr(self, key, timeout):
+        now = time.monotonic()
+        with self.lock:
+            if len(self.counters) > 10000:
+                self.counters = {
+                    key: value for key, value in self.counters.items() if value[1] > now
+                }
+            count, expires = self.counters.get(key, (0, now + timeout))
+            if expires <= now:
+                count, expires = 0, now + timeout
+            self.counters[key] = (count + 1, expires)
+
+    def clear(self):
+        with self.lock:
+            self.counters.clear()
+
+
+local_counters = LocalCounters()
+
+
+class SlidingWindowThrottle(BaseThrottle):
+    """Throttle by a sliding window counter kept in the cache.
+
+    Counts of the current and the previous fixed window are combined,
+    weighting the previous one by how much of it the sliding window still
+    covers. A rejected request costs a single cache read, so bursts never
+    reach the view. If the shared cache fails, counters of this process
+    are used instead.
+    """
+
+    scope = None
+    timer = time.time
+
+    def __init__(self):
+        self.num_requests, self.duration = parse_rate(
+            api_settings.DEFAULT_THROTTLE_RATES.get(self.scope),
+        )
+        self.wait_seconds = None
+
+    def get_cache_key(self, request, view):
+        """Return key identifying who is throttled, None to not throttle the request."""
+        raise NotImplementedError('.get_cache_key() must be overridden')
+
+    def allow_request(self, request, view):
+        if self.num_requests is None:
+            return True
+        ident = self.get_cache_key(request, view)
+        if ident is None:
+            return True
+
+        now = self.timer()
+        window = int(now // self.duration)
+        elapsed = now / self.duration - window
+        current_key = f'throttle:{self.scope}:{ident}:{window}'
+        previous_key = f'throttle:{self.scope}:{ident}:{window - 1}'
+
+        try:
+            counters = caches[settings.THROTTLE_CACHE_ALIAS]
+            counts = counters.get_many([previous_key, current_key])
+        except Exception:
+            logger.exception('Throttle cache failed, counting in process')
+            counters = None
+            counts = local_counters.get_many([previous_key, current_key])
+
+        previous = counts.get(previous_key, 0)
+        current = counts.get(current_key, 0)
+        if previous * (1 - elapsed) + current >= self.num_requests:
+            self.wait_seconds = self.get_wait(previous, current, elapsed)
+            return False
+
+        timeout = self.duration * 2
+        if counters is not None:
+            try:
+                if not counters.add(current_key, 1, timeout=timeout):
+                    counters.incr(current_key)
+                return True
+            except ValueError:
+                # The counter expired between add and incr, the request is let through.
+                return True
+            except Exception:
+                logger.exception('Throttle cache failed, counting in process')
+        local_counters.incr(current_key, timeout)
+        return True
+
+    def get_wait(self, previous, current, elapsed):
+        """Return seconds until the sliding window count drops under the limit."""
+        if current >= self.num_requests or not previous:
+            return (1 - elapsed) * self.duration
+        needed = 1 - (self.num_requests - current) / previous
+        return max((needed - elapsed) * self.duration, 1)
+
+    def wait(self):
+        return self.wait_seconds
+
+
+class AnonymousIPThrottle(SlidingWindowThrottle):
+    """Throttle requests by client IP address."""
+
+    def get_cache_key(self, request, view):
+        return self.get_ident(request)
+
+
+class UserThrottle(SlidingWindowThrottle):
+    """Throttle requests by authenticated user, or by IP address for anonymous users."""
+
+    def get_cache_key(self, request, view):
+        if request.user and request.user.is_authenticated:
+            return f'user:{request.user.pk}'
+        return f'ip:{self.get_ident(request)}'
+
+
+class LoginThrottle(AnonymousIPThrottle):
+    scope = 'login'
+
+
+class UserCreateThrottle(AnonymousIPThrottle):
+    scope = 'user_create'
+
+
+class RatingWriteThrottle(UserThrottle):
+    scope = 'rating_write'
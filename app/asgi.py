@@ -2,6 +2,8 @@
 ASGI config for app project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
+Async views under ``/api/async/`` run on the event loop here, run it with
+an ASGI server such as ``uvicorn app.asgi:application``.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/3.0/howto/deployment/asgi/
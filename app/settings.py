@@ -50,6 +50,9 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'api.middleware.MetricsMiddleware',
+    'api.middleware.ReplicaMiddleware',
+    'api.middleware.CompressionMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -83,17 +86,70 @@ WSGI_APPLICATION = 'app.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/3.0/ref/settings/#databases
 
+# Connections are kept for DB_CONN_MAX_AGE seconds, 0 closes them after
+# every request, and checked before reuse with DB_CONN_HEALTH_CHECKS.
+# DB_EXTERNAL_POOLER is for PgBouncer in transaction mode, which can't keep
+# server-side cursors between transactions.
+
+DB_EXTERNAL_POOLER = os.getenv('DB_EXTERNAL_POOLER', 'false').lower() in ('1', 'yes', 'true')
+
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.postgresql',
+        'ENGINE': 'api.db.postgresql',
         'NAME': os.getenv('POSTGRES_DB'),
         'USER': os.getenv('POSTGRES_USER'),
         'PASSWORD': os.getenv('POSTGRES_PASSWORD'),
         'HOST': os.getenv('POSTGRES_HOST'),
         'PORT': '54320',
+        'CONN_MAX_AGE': int(os.getenv('DB_CONN_MAX_AGE', '60')),
+        'CONN_HEALTH_CHECKS': os.getenv('DB_CONN_HEALTH_CHECKS', 'true').lower() in (
+            '1', 'yes', 'true',
+        ),
+        'DISABLE_SERVER_SIDE_CURSORS': DB_EXTERNAL_POOLER,
     }
 }
 
+# Read replicas as comma separated host or host:port, using the credentials
+# of the primary. Reads of GET requests are spread over them.
+
+DATABASE_REPLICAS = []
+for number, address in enumerate(
+    filter(None, os.getenv('POSTGRES_REPLICA_HOSTS', '').split(',')), start=1,
+):
+    host, _, port = address.strip().partition(':')
+    DATABASES[f'replica_{number}'] = {
+        **DATABASES['default'],
+        'HOST': host,
+        'PORT': port or DATABASES['default']['PORT'],
+        'TEST': {'MIRROR': 'default'},
+    }
+    DATABASE_REPLICAS.append(f'replica_{number}')
+
+DATABASE_ROUTERS = ['api.routers.ReplicaRouter']
+
+
+# Cache
+# https://docs.djangoproject.com/en/3.0/topics/cache/
+
+REDIS_URL = os.getenv('REDIS_URL')
+
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django_redis.cache.RedisCache',
+            'LOCATION': REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
+MOVIE_CACHE_ALIAS = 'default'
+MOVIE_CACHE_TIMEOUT = int(os.getenv('MOVIE_CACHE_TIMEOUT', '300'))
+
 
 # Password validation
 # https://docs.djangoproject.com/en/3.0/ref/settings/#auth-password-validators
@@ -142,3 +198,101 @@ MEDIA_ROOT = 'media'
 # Custom user model
 
 AUTH_USER_MODEL = 'api.User'
+
+# Django REST framework, API_NUM_PROXIES is the number of trusted proxies
+# in front of the app, X-Forwarded-For is ignored without any
+
+REST_FRAMEWORK = {
+    'DEFAULT_AUTHENTICATION_CLASSES': (
+        'user.authentication.CachedTokenAuthentication',
+    ),
+    'DEFAULT_RENDERER_CLASSES': (
+        'api.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ),
+    'DEFAULT_PARSER_CLASSES': (
+        'api.parsers.FastJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ),
+    'DEFAULT_PAGINATION_CLASS': 'movie.pagination.IdCursorPagination',
+    'PAGE_SIZE': int(os.getenv('API_PAGE_SIZE', '50')),
+    'NUM_PROXIES': int(os.getenv('API_NUM_PROXIES', '0')),
+    'DEFAULT_THROTTLE_RATES': {
+        'login': os.getenv('THROTTLE_LOGIN_RATE', '10/min') or None,
+        'user_create': os.getenv('THROTTLE_USER_CREATE_RATE', '5/hour') or None,
+        'rating_write': os.getenv('THROTTLE_RATING_WRITE_RATE', '60/min') or None,
+    },
+}
+
+# Responses of at least COMPRESSION_MIN_SIZE bytes are compressed with brotli,
+# when the brotli package is installed, or gzip, as accepted by the client
+
+COMPRESSION_ENABLED = os.getenv('COMPRESSION_ENABLED', 'true').lower() in ('1', 'yes', 'true')
+COMPRESSION_MIN_SIZE = int(os.getenv('COMPRESSION_MIN_SIZE', '1024'))
+COMPRESSION_BROTLI_QUALITY = int(os.getenv('COMPRESSION_BROTLI_QUALITY', '4'))
+
+# Cache holding throttle counters, shared by all processes when it's Redis
+
+THROTTLE_CACHE_ALIAS = os.getenv('THROTTLE_CACHE_ALIAS', 'default')
+
+# Valid tokens are cached in every process for at most TTL seconds
+
+TOKEN_AUTH_CACHE_TTL = int(os.getenv('TOKEN_AUTH_CACHE_TTL', '60'))
+TOKEN_AUTH_CACHE_SIZE = int(os.getenv('TOKEN_AUTH_CACHE_SIZE', '10000'))
+
+# Bayesian movie ranking treats every movie as having PRIOR_WEIGHT more
+# ratings of PRIOR_MEAN stars, run rebuild_rating_aggregates after changes
+
+RANKING_PRIOR_MEAN = float(os.getenv('RANKING_PRIOR_MEAN', '3.0'))
+RANKING_PRIOR_WEIGHT = int(os.getenv('RANKING_PRIOR_WEIGHT', '10'))
+
+# Maximum number of movies found by a search
+
+SEARCH_MAX_RESULTS = int(os.getenv('SEARCH_MAX_RESULTS', '1000'))
+
+# Number of latest ratings embedded into a movie detail
+
+MOVIE_DETAIL_RATINGS_LIMIT = int(os.getenv('MOVIE_DETAIL_RATINGS_LIMIT', '20'))
+
+# Number of similar movies stored and served for every movie
+
+SIMILAR_MOVIES_TOP_K = int(os.getenv('SIMILAR_MOVIES_TOP_K', '20'))
+
+# Directory of movie factors trained by the train_recommender command
+
+RECOMMENDER_MODEL_DIR = os.getenv('RECOMMENDER_MODEL_DIR', os.path.join(BASE_DIR, 'recommender'))
+
+# Number of rows fetched from a server-side cursor at once by exports, the
+# search index and process_posters
+
+EXPORT_CHUNK_SIZE = int(os.getenv('EXPORT_CHUNK_SIZE', '2000'))
+
+# Number of ratings upserted in one transaction by bulk imports
+
+BULK_RATINGS_CHUNK_SIZE = int(os.getenv('BULK_RATINGS_CHUNK_SIZE', '1000'))
+
+# Background tasks, api.tasks.RQBackend queues them in REDIS_URL for rq workers
+
+TASK_BACKEND = os.getenv('TASK_BACKEND', 'api.tasks.ThreadPoolBackend')
+TASK_WORKERS = int(os.getenv('TASK_WORKERS', '2'))
+TASK_RETRY_DELAY = float(os.getenv('TASK_RETRY_DELAY', '1'))
+TASK_QUEUE = os.getenv('TASK_QUEUE', 'default')
+
+# Maximum number of concurrent database calls of async views per event loop
+
+ASYNC_DB_CONCURRENCY = int(os.getenv('ASYNC_DB_CONCURRENCY', '10'))
+
+# Request metrics exported at /metrics/ to staff users or with the METRICS_TOKEN bearer token
+
+METRICS_ENABLED = os.getenv('METRICS_ENABLED', 'true').lower() in ('1', 'yes', 'true')
+METRICS_TOKEN = os.getenv('METRICS_TOKEN', '')
+
+# Requests slower than this number of seconds are logged with their SQL, 0 turns it off
+
+SLOW_REQUEST_SECONDS = float(os.getenv('SLOW_REQUEST_SECONDS', '1'))
+
+# Sampling profiler staff users can run on a request with ?profile=1
+
+PROFILING_ENABLED = os.getenv('PROFILING_ENABLED', 'false').lower() in ('1', 'yes', 'true')
+PROFILING_INTERVAL = float(os.getenv('PROFILING_INTERVAL', '0.001'))
@@ -18,10 +18,13 @@ from django.conf.urls.static import static
 from django.contrib import admin
 from django.urls import include, path
 
+from api.views import metrics
+
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('api/', include('movie.urls')),
     path('user/', include('user.urls')),
+    path('metrics/', metrics, name='metrics'),
 ]
 
 if settings.DEBUG:
@@ -0,0 +1,181 @@
+"""Benchmark movie, rating and token endpoints and compare with a baseline.
+
+Generate a catalogue first, then run the suite against the same database:
+
+    python manage.py generate_catalogue --movies 10000 --users 1000 --ratings 100000
+    python benchmarks/api_endpoints.py --output results.json
+    python benchmarks/api_endpoints.py --baseline results.json
+
+Requests are made in process with the Django test client, so the numbers
+cover the application and the database without network and server noise.
+Each scenario reports throughput, latency percentiles and SQL queries per
+request. Given a baseline, regressions over the tolerance are printed and
+the script exits with status 1.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'app.settings')
+# Every request comes from one client, throttling would reject most of them.
+for rate in ('THROTTLE_LOGIN_RATE', 'THROTTLE_USER_CREATE_RATE', 'THROTTLE_RATING_WRITE_RATE'):
+    os.environ.setdefault(rate, '')
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.contrib.auth import get_user_model  # noqa: E402
+from django.core.cache import caches  # noqa: E402
+from django.db import connection  # noqa: E402
+from django.test import Client  # noqa: E402
+from django.test.utils import setup_test_environment  # noqa: E402
+from rest_framework.authtoken.models import Token  # noqa: E402
+
+from api.metrics import QueryRecorder  # noqa: E402
+from api.models import Movie, Rating  # noqa: E402
+from movie.management.commands.generate_catalogue import PASSWORD  # noqa: E402
+
+PERCENTILES = (50, 90, 95, 99)
+
+
+def percentile(values, percent):
+    return values[min(len(values) - 1, int(len(values) * percent / 100))]
+
+
+def scenarios(prefix, rng):
+    """Return benchmark name and a function returning the next request of it."""
+    movie_ids = list(Movie.objects.values_list('pk', flat=True))
+    rating_ids = list(Rating.objects.values_list('pk', flat=True)[:100000])
+    user = get_user_model().objects.filter(email__startswith=prefix).order_by('pk').first()
+    if not movie_ids or not rating_ids or user is None:
+        raise SystemExit('Generate a catalogue with manage.py generate_catalogue first.')
+    token, _ = Token.objects.get_or_create(user=user)
+    auth = {'HTTP_AUTHORIZATION': f'Token {token.key}'}
+
+    return {
+        'movies-list': lambda: ('get', '/api/movies/', {}, {}),
+        'movies-detail': lambda: ('get', f'/api/movies/{rng.choice(movie_ids)}/', {}, {}),
+        'ratings-list': lambda: ('get', '/api/ratings/', {}, {}),
+        'ratings-detail': lambda: ('get', f'/api/ratings/{rng.choice(rating_ids)}/', {}, {}),
+        'rate-movie': lambda: (
+            'post', f'/api/movies/{rng.choice(movie_ids)}/rate-movie/',
+            {'stars': rng.randint(1, 5)}, auth,
+        ),
+        'token': lambda: ('post', '/user/token/', {'email': user.email, 'password': PASSWORD}, {}),
+    }
+
+
+def measure(client, next_request, requests, warmup, cold):
+    """Run requests of a scenario and summarize latency and SQL queries."""
+    timings, queries, errors = [], [], 0
+    for number in range(warmup + requests):
+        method, path, data, extra = next_request()
+        if cold:
+            for cache in caches.all():
+                cache.clear()
+        recorder = QueryRecorder()
+        start = time.perf_counter()
+        with connection.execute_wrapper(recorder):
+            response = getattr(client, method)(path, data, **extra)
+        duration = time.perf_counter() - start
+        if number < warmup:
+            continue
+        timings.append(duration * 1000)
+        queries.append(recorder.count)
+        errors += response.status_code >= 400
+
+    timings.sort()
+    result = {
+        'requests': requests,
+        'errors': errors,
+        'throughput_rps': round(requests / (sum(timings) / 1000), 1),
+        'mean_ms': round(statistics.mean(timings), 3),
+        'queries_median': statistics.median(queries),
+        'queries_max': max(queries),
+    }
+    for percent in PERCENTILES:
+        result[f'p{percent}_ms'] = round(percentile(timings, percent), 3)
+    return result
+
+
+def compare(results, baseline, tolerance):
+    """Return descriptions of scenarios slower or running more queries than the baseline."""
+    regressions = []
+    for name, current in results['scenarios'].items():
+        previous = baseline['scenarios'].get(name)
+        if previous is None:
+            continue
+        for key in ('p50_ms', 'p95_ms'):
+            if current[key] > previous[key] * (1 + tolerance):
+                regressions.append(f'{name}: {key} {previous[key]} -> {current[key]}')
+        if current['throughput_rps'] < previous['throughput_rps'] * (1 - tolerance):
+            regressions.append(
+                f'{name}: throughput_rps {previous["throughput_rps"]} '
+                f'-> {current["throughput_rps"]}',
+            )
+        if current['queries_max'] > previous['queries_max']:
+            regressions.append(
+                f'{name}: queries_max {previous["queries_max"]} -> {current["queries_max"]}',
+            )
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--requests', type=int, default=200)
+    parser.add_argument('--warmup', type=int, default=20)
+    parser.add_argument('--only', nargs='*', help='Names of scenarios to run.')
+    parser.add_argument('--cold', action='store_true', help='Clear caches before every request.')
+    parser.add_argument('--prefix', default='bench', help='Email prefix of generated users.')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help='Write results as JSON to this file.')
+    parser.add_argument('--baseline', help='JSON results to compare with.')
+    parser.add_argument(
+        '--tolerance', type=float, default=0.2,
+        help='Allowed relative slowdown before a scenario is a regression.',
+    )
+    args = parser.parse_args()
+
+    setup_test_environment()
+    rng = random.Random(args.seed)
+    client = Client()
+    results = {
+        'python': platform.python_version(),
+        'django': django.get_version(),
+        'database': connection.vendor,
+        'movies': Movie.objects.count(),
+        'ratings': Rating.objects.count(),
+        'cold': args.cold,
+        'scenarios': {},
+    }
+    for name, next_request in scenarios(args.prefix, rng).items():
+        if args.only and name not in args.only:
+            continue
+        results['scenarios'][name] = measure(
+            client, next_request, args.requests, args.warmup, args.cold,
+        )
+
+    text = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as file:
+            file.write(text + '\n')
+    print(text)
+
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as file:
+            regressions = compare(results, json.load(file), args.tolerance)
+        for regression in regressions:
+            print(f'REGRESSION {regression}', file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
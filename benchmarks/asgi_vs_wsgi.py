@@ -0,0 +1,117 @@
+"""Compare throughput and latency of the WSGI and ASGI deployments.
+
+Start both servers against the same database, for example:
+
+    gunicorn app.wsgi:application --workers 4 --bind 127.0.0.1:8000
+    uvicorn app.asgi:application --workers 4 --port 8001
+
+and run:
+
+    python benchmarks/asgi_vs_wsgi.py \\
+        --wsgi http://127.0.0.1:8000/api/movies/ \\
+        --asgi http://127.0.0.1:8001/api/async/movies/ \\
+        --concurrency 200 --duration 30
+
+Requests are sent by keep-alive connections on one event loop, so the
+client itself isn't limited by threads. Results are printed as JSON.
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import time
+from urllib.parse import urlsplit
+
+
+async def fetch(reader, writer, host, path):
+    """Send a GET request over an open connection and read the response."""
+    writer.write(
+        f'GET {path} HTTP/1.1\r\nHost: {host}\r\nConnection: keep-alive\r\n\r\n'.encode()
+    )
+    await writer.drain()
+
+    status_line = await reader.readline()
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b''):
+            break
+        name, _, value = line.decode().partition(':')
+        if name.lower() == 'content-length':
+            length = int(value)
+    await reader.readexactly(length)
+    return int(status_line.split()[1])
+
+
+async def worker(url, deadline, latencies, errors):
+    """Send requests one after another until the deadline."""
+    parts = urlsplit(url)
+    path = parts.path + (f'?{parts.query}' if parts.query else '')
+    reader, writer = await asyncio.open_connection(parts.hostname, parts.port or 80)
+    try:
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            try:
+                status = await fetch(reader, writer, parts.netloc, path)
+            except (OSError, asyncio.IncompleteReadError):
+                errors.append('connection')
+                writer.close()
+                reader, writer = await asyncio.open_connection(parts.hostname, parts.port or 80)
+                continue
+            if status == 200:
+                latencies.append(time.perf_counter() - start)
+            else:
+                errors.append(status)
+    finally:
+        writer.close()
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+async def run(url, concurrency, duration):
+    """Load a URL and return throughput and latency percentiles."""
+    latencies = []
+    errors = []
+    deadline = time.perf_counter() + duration
+    await asyncio.gather(*[
+        worker(url, deadline, latencies, errors) for _ in range(concurrency)
+    ])
+
+    if not latencies:
+        return {'url': url, 'requests': 0, 'errors': len(errors)}
+    return {
+        'url': url,
+        'requests': len(latencies),
+        'errors': len(errors),
+        'throughput': round(len(latencies) / duration, 1),
+        'latency_ms': {
+            'mean': round(statistics.mean(latencies) * 1000, 2),
+            'p50': round(percentile(latencies, 0.50) * 1000, 2),
+            'p90': round(percentile(latencies, 0.90) * 1000, 2),
+            'p99': round(percentile(latencies, 0.99) * 1000, 2),
+        },
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--wsgi', required=True, help='URL served by app.wsgi')
+    parser.add_argument('--asgi', required=True, help='URL served by app.asgi')
+    parser.add_argument('--concurrency', type=int, default=100)
+    parser.add_argument('--duration', type=float, default=10)
+    parser.add_argument('--warmup', type=float, default=2)
+    args = parser.parse_args()
+
+    results = {}
+    for name, url in (('wsgi', args.wsgi), ('asgi', args.asgi)):
+        asyncio.run(run(url, args.concurrency, args.warmup))
+        results[name] = asyncio.run(run(url, args.concurrency, args.duration))
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
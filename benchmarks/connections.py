@@ -0,0 +1,80 @@
+"""Measure the database connection setup cost removed by persistent connections.
+
+Simulates requests which each run one small query, with connections
+closed after every request (CONN_MAX_AGE=0), kept open, and kept open with
+health checks. Run it against the configured database:
+
+    DJANGO_SETTINGS_MODULE=app.settings python benchmarks/connections.py --requests 1000
+
+Request start and end are signalled like the WSGI and ASGI handlers do,
+so connections are opened and closed exactly as when serving requests.
+Results are printed as JSON.
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'app.settings')
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.core.signals import request_finished, request_started  # noqa: E402
+from django.db import connection  # noqa: E402
+
+MODES = {
+    'new_connection_per_request': {'CONN_MAX_AGE': 0, 'CONN_HEALTH_CHECKS': False},
+    'persistent': {'CONN_MAX_AGE': 600, 'CONN_HEALTH_CHECKS': False},
+    'persistent_with_health_checks': {'CONN_MAX_AGE': 600, 'CONN_HEALTH_CHECKS': True},
+}
+
+
+def run(requests):
+    """Return per-request timings in milliseconds of the current connection settings."""
+    connection.close()
+    timings = []
+    for _ in range(requests):
+        start = time.perf_counter()
+        request_started.send(sender=None)
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT 1')
+            cursor.fetchone()
+        request_finished.send(sender=None)
+        timings.append((time.perf_counter() - start) * 1000)
+    connection.close()
+    return sorted(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--requests', type=int, default=1000)
+    args = parser.parse_args()
+
+    original = dict(connection.settings_dict)
+    results = {'database': connection.vendor, 'host': original.get('HOST') or 'local'}
+    try:
+        for mode, options in MODES.items():
+            connection.settings_dict.update(options)
+            timings = run(args.requests)
+            results[mode] = {
+                'mean_ms': round(statistics.mean(timings), 3),
+                'median_ms': round(statistics.median(timings), 3),
+                'p99_ms': round(timings[min(len(timings) - 1, int(len(timings) * 0.99))], 3),
+            }
+    finally:
+        connection.settings_dict.clear()
+        connection.settings_dict.update(original)
+
+    baseline = results['new_connection_per_request']['mean_ms']
+    for mode in MODES:
+        results[mode]['saved_ms'] = round(baseline - results[mode]['mean_ms'], 3)
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
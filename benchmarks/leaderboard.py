@@ -0,0 +1,144 @@
+"""Benchmark top movie rankings on a synthetic catalogue.
+
+Creates movies whose stored aggregates stand for a given number of ratings
+spread over them with a Zipf-like popularity, then times ranked queries
+served by the score indexes against sorting the whole catalogue, and the
+cost of an incremental aggregate update. Everything runs in a transaction
+which is rolled back, so the database is left as it was:
+
+    DJANGO_SETTINGS_MODULE=app.settings python benchmarks/leaderboard.py \\
+        --movies 100000 --ratings 10000000
+
+Ratings rows themselves aren't inserted, rankings never read them.
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'app.settings')
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.db import transaction  # noqa: E402
+
+from api.models import STARS, Movie, rating_scores, stars_field  # noqa: E402
+from movie.views import RANKINGS  # noqa: E402
+
+
+class Rollback(Exception):
+    pass
+
+
+def synthetic_movies(movies, ratings, prefix):
+    """Yield unsaved movies with aggregates of about the given number of ratings."""
+    weights = [1 / rank for rank in range(1, movies + 1)]
+    scale = ratings / sum(weights)
+    random.shuffle(weights)
+    for number, weight in enumerate(weights):
+        count = int(weight * scale)
+        quality = random.random()
+        histogram = dict.fromkeys(STARS, 0)
+        for stars in random.choices(
+            list(STARS),
+            weights=[(1 - quality) ** 2, 1 - quality, 0.5, quality, quality ** 2],
+            k=min(count, 50),
+        ):
+            histogram[stars] += 1
+        sample = sum(histogram.values()) or 1
+        histogram = {stars: value * count // sample for stars, value in histogram.items()}
+        count = sum(histogram.values())
+        total = sum(stars * value for stars, value in histogram.items())
+        average, bayesian = rating_scores(count, total)
+        yield Movie(
+            title=f'{prefix} {number}',
+            rating_count=count,
+            rating_sum=total,
+            rating_average=average,
+            bayesian_score=bayesian,
+            **{stars_field(stars): value for stars, value in histogram.items()},
+        )
+
+
+def timed(func, repeat):
+    """Return median and p99 run time of a function in milliseconds."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    return {
+        'median_ms': round(statistics.median(timings), 3),
+        'p99_ms': round(timings[min(len(timings) - 1, int(len(timings) * 0.99))], 3),
+    }
+
+
+def run(args):
+    movies = synthetic_movies(args.movies, args.ratings, args.prefix)
+    batch = []
+    for movie in movies:
+        batch.append(movie)
+        if len(batch) == 5000:
+            Movie.objects.bulk_create(batch)
+            batch = []
+    Movie.objects.bulk_create(batch)
+    catalogue = Movie.objects.filter(title__startswith=args.prefix)
+    ids = list(catalogue.values_list('pk', flat=True))
+
+    results = {'movies': len(ids), 'ratings': sum(catalogue.values_list('rating_count', flat=True))}
+    for by, ordering in RANKINGS.items():
+        def indexed():
+            movies = Movie.objects.filter(rating_count__gte=args.min_votes)
+            if by == 'average':
+                movies = movies.filter(rating_average__isnull=False)
+            list(movies.order_by(*ordering).values_list('pk', flat=True)[:args.limit])
+
+        field = ordering[0].lstrip('-')
+
+        def full_sort():
+            rows = Movie.objects.filter(rating_count__gte=args.min_votes).values_list('pk', field)
+            sorted(rows, key=lambda row: (row[1] is None, -(row[1] or 0), row[0]))[:args.limit]
+
+        results[by] = {
+            'indexed': timed(indexed, args.repeat),
+            'full_sort': timed(full_sort, max(1, args.repeat // 10)),
+        }
+
+    def rate():
+        movie_id = random.choice(ids)
+        Movie.objects.apply_rating_change(None, (movie_id, random.choice(STARS)))
+
+    results['incremental_update'] = timed(rate, args.repeat)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--movies', type=int, default=100000)
+    parser.add_argument('--ratings', type=int, default=10000000)
+    parser.add_argument('--limit', type=int, default=10)
+    parser.add_argument('--min-votes', type=int, default=0)
+    parser.add_argument('--repeat', type=int, default=50)
+    parser.add_argument('--prefix', default='Leaderboard benchmark')
+    args = parser.parse_args()
+
+    results = {}
+    try:
+        with transaction.atomic():
+            results = run(args)
+            raise Rollback
+    except Rollback:
+        pass
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
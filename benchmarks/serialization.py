@@ -0,0 +1,94 @@
+"""Measure JSON rendering time and bytes on the wire of movie list pages.
+
+Generate a catalogue first, then run it against the same database:
+
+    python manage.py generate_catalogue --movies 10000 --users 1000 --ratings 100000
+    python benchmarks/serialization.py --sizes 100 1000
+
+Pages are serialized once with MovieSerializer, then rendered with DRF's
+stdlib JSONRenderer and with FastJSONRenderer, and the rendered page is
+compressed with gzip and brotli as CompressionMiddleware does. Results are
+printed as JSON.
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'app.settings')
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.conf import settings  # noqa: E402
+from django.utils.text import compress_string  # noqa: E402
+from rest_framework.renderers import JSONRenderer  # noqa: E402
+
+from api import renderers  # noqa: E402
+from api.middleware import brotli  # noqa: E402
+from api.models import Movie  # noqa: E402
+from movie.serializers import MovieSerializer  # noqa: E402
+
+
+def timed(func, repeat):
+    """Return the result of func and its median duration in milliseconds."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        timings.append((time.perf_counter() - start) * 1000)
+    return result, round(statistics.median(timings), 3)
+
+
+def page(size):
+    """Return serialized data of the first movie list page of a size."""
+    movies = Movie.objects.order_by('id')[:size]
+    if len(movies) < size:
+        raise SystemExit(f'Generate at least {size} movies with manage.py generate_catalogue.')
+    return {'next': None, 'previous': None, 'results': MovieSerializer(movies, many=True).data}
+
+
+def measure(data, repeat):
+    """Return rendering and compression timings and sizes of page data."""
+    result = {}
+    stdlib, result['render_stdlib_ms'] = timed(lambda: JSONRenderer().render(data), repeat)
+    if renderers.orjson is not None:
+        fast, result['render_fast_ms'] = timed(
+            lambda: renderers.FastJSONRenderer().render(data), repeat,
+        )
+        assert json.loads(fast) == json.loads(stdlib)
+    result['identity_bytes'] = len(stdlib)
+
+    gzipped, result['gzip_ms'] = timed(lambda: compress_string(stdlib), repeat)
+    result['gzip_bytes'] = len(gzipped)
+    if brotli is not None:
+        compressed, result['brotli_ms'] = timed(
+            lambda: brotli.compress(stdlib, quality=settings.COMPRESSION_BROTLI_QUALITY), repeat,
+        )
+        result['brotli_bytes'] = len(compressed)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--sizes', type=int, nargs='*', default=[100, 1000])
+    parser.add_argument('--repeat', type=int, default=50)
+    args = parser.parse_args()
+
+    results = {
+        'orjson': renderers.orjson is not None,
+        'brotli': brotli is not None,
+        'brotli_quality': settings.COMPRESSION_BROTLI_QUALITY,
+        'pages': {},
+    }
+    for size in args.sizes:
+        results['pages'][size] = measure(page(size), args.repeat)
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
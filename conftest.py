@@ -0,0 +1,15 @@
+import pytest
+from django.core.cache import caches
+
+from api.throttling import local_counters
+from user.authentication import token_cache
+
+
+@pytest.fixture(autouse=True)
+def clear_caches():
+    """Start every test with empty caches."""
+    for cache in caches.all():
+        cache.clear()
+    token_cache.clear()
+    local_counters.clear()
+    yield
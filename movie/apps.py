@@ -3,3 +3,7 @@ from django.apps import AppConfig
 
 class MovieConfig(AppConfig):
     name = 'movie'
+
+    def ready(self):
+        """Connect signal handlers."""
+        import movie.signals  # noqa: F401
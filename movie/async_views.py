@@ -0,0 +1,126 @@
+import asyncio
+import functools
+import weakref
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections
+from django.http import HttpResponseNotAllowed, JsonResponse
+from rest_framework.request import Request
+from rest_framework.utils.encoders import JSONEncoder
+
+from api.models import Movie
+from api.routers import use_replicas
+from movie.cache import get_aggregates, get_cache, get_versions, record, response_key
+from movie.pagination import IdCursorPagination
+from movie.serializers import MovieDetailSerializer, MovieSerializer
+
+# Semaphores keep a reference to their loop once used, so entries of
+# closed loops are also dropped explicitly.
+_semaphores = weakref.WeakKeyDictionary()
+
+
+def get_semaphore():
+    """Return semaphore limiting concurrent database calls of the running event loop."""
+    loop = asyncio.get_running_loop()
+    if loop not in _semaphores:
+        for closed in [other for other in list(_semaphores) if other.is_closed()]:
+            _semaphores.pop(closed, None)
+        _semaphores[loop] = asyncio.Semaphore(settings.ASYNC_DB_CONCURRENCY)
+    return _semaphores[loop]
+
+
+async def run_in_db_thread(func, *args):
+    """Run blocking database work in a worker thread, keeping the event loop free.
+
+    At most ASYNC_DB_CONCURRENCY calls run at once, so slow queries can't
+    take more connections than the database is sized for.
+    """
+    @functools.wraps(func)
+    def run(*args):
+        close_old_connections()
+        try:
+            return func(*args)
+        finally:
+            close_old_connections()
+
+    async with get_semaphore():
+        return await sync_to_async(run, thread_sensitive=False)(*args)
+
+
+def cached(key, build):
+    """Return cached (status, data) for a key or build and cache it."""
+    cache = get_cache()
+    result = cache.get(key)
+    if result is not None:
+        record('hits')
+        return result
+
+    record('misses')
+    with use_replicas(False):
+        result = build()
+    if result[0] == 200:
+        cache.set(key, result, timeout=settings.MOVIE_CACHE_TIMEOUT)
+    return result
+
+
+def build_movie_list(request):
+    """Return (status, data) of a movie list page."""
+    version, _ = get_versions()
+    request = Request(request)
+
+    def build():
+        paginator = IdCursorPagination()
+        page = paginator.paginate_queryset(Movie.objects.all(), request)
+        data = MovieSerializer(page, many=True, context={'request': request}).data
+        return 200, paginator.get_paginated_response(data).data
+
+    return cached(response_key('async-list', version, request), build)
+
+
+def build_movie_detail(request, pk):
+    """Return (status, data) of a movie detail."""
+    _, versions = get_versions([pk])
+    request = Request(request)
+
+    def build():
+        movie = Movie.objects.filter(pk=pk).first()
+        if movie is None:
+            return 404, {'detail': 'Not found.'}
+        return 200, MovieDetailSerializer(movie, context={'request': request}).data
+
+    return cached(response_key(f'async-detail:{pk}', versions[pk], request), build)
+
+
+def build_movie_aggregates(pk):
+    """Return (status, data) of movie rating aggregates."""
+    aggregates = get_aggregates([pk])
+    if pk not in aggregates:
+        return 404, {'detail': 'Not found.'}
+    return 200, aggregates[pk]
+
+
+def json_response(result):
+    status, data = result
+    return JsonResponse(data, status=status, encoder=JSONEncoder)
+
+
+async def movie_list(request):
+    """List movies on the async read path."""
+    if request.method != 'GET':
+        return HttpResponseNotAllowed(['GET'])
+    return json_response(await run_in_db_thread(build_movie_list, request))
+
+
+async def movie_detail(request, pk):
+    """Retrieve a movie on the async read path."""
+    if request.method != 'GET':
+        return HttpResponseNotAllowed(['GET'])
+    return json_response(await run_in_db_thread(build_movie_detail, request, pk))
+
+
+async def movie_aggregates(request, pk):
+    """Retrieve rating aggregates of a movie on the async read path."""
+    if request.method != 'GET':
+        return HttpResponseNotAllowed(['GET'])
+    return json_response(await run_in_db_thread(build_movie_aggregates, pk))
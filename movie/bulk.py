@@ -0,0 +1,112 @@
+from itertools import islice
+
+from django.db import IntegrityError, router, transaction
+
+from api.models import MAX_STARS, MIN_STARS, Movie, Rating, User
+from movie.cache import invalidate_movies
+
+REQUIRED_MESSAGE = 'This field is required.'
+INTEGER_MESSAGE = 'A valid integer is required.'
+STARS_MESSAGE = f'Ensure this value is between {MIN_STARS} and {MAX_STARS}.'
+MISSING_MESSAGE = 'Invalid pk "{pk}" - object does not exist.'
+
+
+def validate_row(row):
+    """Return errors of a (movie, user, stars) row and its cleaned values."""
+    if not isinstance(row, dict):
+        return {'non_field_errors': ['Expected an object with movie, user and stars.']}, None
+
+    errors = {}
+    values = []
+    for field in ('movie', 'user', 'stars'):
+        value = row.get(field)
+        if value is None:
+            errors[field] = [REQUIRED_MESSAGE]
+        elif isinstance(value, bool) or not isinstance(value, (int, str)):
+            errors[field] = [INTEGER_MESSAGE]
+        else:
+            try:
+                values.append(int(value))
+            except ValueError:
+                errors[field] = [INTEGER_MESSAGE]
+
+    if 'stars' not in errors and not MIN_STARS <= values[-1] <= MAX_STARS:
+        errors['stars'] = [STARS_MESSAGE]
+
+    return errors, None if errors else tuple(values)
+
+
+def upsert_existing(rows):
+    """Upsert (movie, user, stars) rows by index whose movie and user exist.
+
+    Movies are checked under the lock taken for the upsert, in the same
+    transaction, so they can't be deleted before ratings are written.
+    Return the number of upserted rows, errors of the others and rated movie ids.
+    """
+    db = router.db_for_write(Rating)
+    errors = []
+    with transaction.atomic(using=db):
+        movie_ids = set(Movie.objects.db_manager(db).lock(
+            {movie_id for movie_id, _, _ in rows.values()},
+        ))
+        user_ids = set(User.objects.using(db).filter(
+            pk__in={user_id for _, user_id, _ in rows.values()},
+        ).values_list('pk', flat=True))
+
+        # The last row for a (movie, user) pair wins, like sequential submissions would.
+        latest = {}
+        for index, (movie_id, user_id, stars) in rows.items():
+            row_errors = {}
+            if movie_id not in movie_ids:
+                row_errors['movie'] = [MISSING_MESSAGE.format(pk=movie_id)]
+            if user_id not in user_ids:
+                row_errors['user'] = [MISSING_MESSAGE.format(pk=user_id)]
+            if row_errors:
+                errors.append({'row': index, 'errors': row_errors})
+            else:
+                latest[movie_id, user_id] = stars
+
+        upserted = Rating.objects.upsert(
+            (movie_id, user_id, stars) for (movie_id, user_id), stars in latest.items()
+        )
+    return upserted, errors, {movie_id for movie_id, _ in latest}
+
+
+def import_chunk(chunk):
+    """Validate a chunk of (index, row) pairs and upsert its valid rows."""
+    errors = []
+    rows = {}
+    for index, row in chunk:
+        row_errors, values = validate_row(row)
+        if row_errors:
+            errors.append({'row': index, 'errors': row_errors})
+        else:
+            rows[index] = values
+
+    try:
+        upserted, row_errors, movie_ids = upsert_existing(rows)
+    except IntegrityError:
+        # A user was deleted after it was checked, checking again reports its rows.
+        upserted, row_errors, movie_ids = upsert_existing(rows)
+    invalidate_movies(movie_ids)
+    errors.extend(row_errors)
+    return upserted, sorted(errors, key=lambda error: error['row'])
+
+
+def import_ratings(rows, chunk_size=1000):
+    """Upsert ratings from an iterable of row dicts chunk by chunk.
+
+    Every chunk is written in its own transaction. Invalid rows are
+    reported with their index instead of failing the whole batch.
+    """
+    result = {'upserted': 0, 'errors': []}
+    rows = enumerate(rows)
+    while True:
+        chunk = list(islice(rows, chunk_size))
+        if not chunk:
+            break
+        upserted, errors = import_chunk(chunk)
+        result['upserted'] += upserted
+        result['errors'].extend(errors)
+
+    return result
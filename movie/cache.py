@@ -0,0 +1,167 @@
+import hashlib
+import uuid
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from rest_framework import status
+from rest_framework.response import Response
+
+from api.models import Movie
+from api.routers import use_replicas
+
+COLLECTION_VERSION_KEY = 'movies:version'
+MOVIE_VERSION_KEY = 'movies:version:{}'
+STATS_KEYS = {'hits': 'movies:cache:hits', 'misses': 'movies:cache:misses'}
+
+
+def get_cache():
+    """Return cache used for movie responses."""
+    return caches[settings.MOVIE_CACHE_ALIAS]
+
+
+def new_version():
+    return uuid.uuid4().hex
+
+
+def get_versions(movie_ids=()):
+    """Return collection version and versions of given movies.
+
+    Versions are random tokens replaced on every write, so entries built
+    from an older version are never read again and simply expire. Entries
+    are built from the primary, a lagging replica could still return data
+    of the previous version.
+    """
+    cache = get_cache()
+    keys = [COLLECTION_VERSION_KEY] + [MOVIE_VERSION_KEY.format(pk) for pk in movie_ids]
+    versions = cache.get_many(keys)
+    missing = {key: new_version() for key in keys if key not in versions}
+    if missing:
+        cache.set_many(missing, timeout=None)
+        versions.update(missing)
+
+    return versions[COLLECTION_VERSION_KEY], {
+        pk: versions[MOVIE_VERSION_KEY.format(pk)] for pk in movie_ids
+    }
+
+
+def invalidate_movies(movie_ids):
+    """Drop cached responses of given movies and of all movie lists."""
+    def invalidate():
+        versions = {MOVIE_VERSION_KEY.format(pk): new_version() for pk in movie_ids}
+        versions[COLLECTION_VERSION_KEY] = new_version()
+        get_cache().set_many(versions, timeout=None)
+
+    # Invalidate right away and again after commit, so a response built
+    # from data read before the commit isn't kept under the new version.
+    # Entries are built from the primary, replicas may not have the commit yet.
+    invalidate()
+    transaction.on_commit(invalidate)
+
+
+def record(outcome, count=1):
+    """Count cache hits or misses."""
+    if not count:
+        return
+    cache = get_cache()
+    key = STATS_KEYS[outcome]
+    try:
+        cache.incr(key, count)
+    except ValueError:
+        cache.add(key, 0, timeout=None)
+        cache.incr(key, count)
+
+
+def get_stats():
+    """Return number of cache hits and misses and the hit ratio."""
+    values = get_cache().get_many(STATS_KEYS.values())
+    stats = {name: values.get(key, 0) for name, key in STATS_KEYS.items()}
+    total = stats['hits'] + stats['misses']
+    stats['hit_ratio'] = stats['hits'] / total if total else None
+    return stats
+
+
+def response_key(kind, version, request):
+    """Return cache key of a response for the requested URL."""
+    url = hashlib.md5(request.build_absolute_uri().encode()).hexdigest()
+    return f'movies:{kind}:{version}:{url}'
+
+
+def cached_version(key, build):
+    """Return a (token, last modified) version cached under a cache key."""
+    cache = get_cache()
+    version = cache.get(key)
+    if version is None:
+        with use_replicas(False):
+            version = build()
+        cache.set(key, version, timeout=settings.MOVIE_CACHE_TIMEOUT)
+    return version
+
+
+def get_aggregates(movie_ids):
+    """Return rating aggregates of movies by id.
+
+    Cached aggregates are read in one batch and only missing movies are
+    fetched from the database. Unknown ids are left out.
+    """
+    _, versions = get_versions(movie_ids)
+    keys = {pk: f'movies:aggregates:{pk}:{versions[pk]}' for pk in movie_ids}
+    cache = get_cache()
+    cached = cache.get_many(keys.values())
+    aggregates = {pk: cached[key] for pk, key in keys.items() if key in cached}
+    record('hits', len(aggregates))
+
+    missing = [pk for pk in movie_ids if pk not in aggregates]
+    if missing:
+        record('misses', len(missing))
+        with use_replicas(False):
+            movies = list(Movie.objects.filter(pk__in=missing).only('pk', *Movie.AGGREGATE_FIELDS))
+        built = {
+            movie.pk: {
+                'average_rating': movie.average_rating(),
+                'rating_count': movie.rating_count,
+                'rating_histogram': movie.rating_histogram,
+            }
+            for movie in movies
+        }
+        cache.set_many(
+            {keys[pk]: value for pk, value in built.items()},
+            timeout=settings.MOVIE_CACHE_TIMEOUT,
+        )
+        aggregates.update(built)
+
+    return aggregates
+
+
+class CachedResponseMixin:
+    """Serve list and retrieve responses from the cache until movies change."""
+
+    def cached_response(self, key, view, request, *args, **kwargs):
+        """Return cached response data for a key or render the view and cache it."""
+        cache = get_cache()
+        data = cache.get(key)
+        if data is not None:
+            record('hits')
+            return Response(data)
+
+        record('misses')
+        with use_replicas(False):
+            response = view(request, *args, **kwargs)
+        if response.status_code == status.HTTP_200_OK:
+            cache.set(key, response.data, timeout=settings.MOVIE_CACHE_TIMEOUT)
+        return response
+
+    def list(self, request, *args, **kwargs):
+        version, _ = get_versions()
+        key = response_key('list', version, request)
+        return self.cached_response(key, super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        try:
+            pk = int(kwargs[self.lookup_url_kwarg or self.lookup_field])
+        except ValueError:
+            return super().retrieve(request, *args, **kwargs)
+
+        _, versions = get_versions([pk])
+        key = response_key(f'detail:{pk}', versions[pk], request)
+        return self.cached_response(key, super().retrieve, request, *args, **kwargs)
@@ -0,0 +1,69 @@
+import hashlib
+
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+
+
+class ConditionalGetMixin:
+    """Answer list and retrieve requests with 304 when the client copy is current.
+
+    Versions are built from updated_at of rows, so a conditional request
+    costs one small query and nothing is serialized when it matches.
+    Viewsets should cache the collection version, its query reads every row.
+    Lists are validated by ETag only: deleting a row changes the count in
+    their token but doesn't move the latest updated_at forward.
+    """
+
+    def get_collection_version(self):
+        """Return (token, last modified) of all rows of the viewset."""
+        values = self.get_queryset().order_by().aggregate(
+            last_modified=Max('updated_at'),
+            count=Count('pk'),
+        )
+        last_modified = values['last_modified']
+        token = f'{values["count"]}:{last_modified.isoformat() if last_modified else ""}'
+        return token, last_modified
+
+    def get_object_version(self, pk):
+        """Return (token, last modified) of a row or None if it doesn't exist."""
+        last_modified = self.get_queryset().filter(pk=pk).values_list(
+            'updated_at', flat=True,
+        ).first()
+        if last_modified is None:
+            return None
+        return f'{pk}:{last_modified.isoformat()}', last_modified
+
+    def conditional_response(self, version, view, request, *args, **kwargs):
+        """Return 304 for a matching conditional request or the view response."""
+        if version is None:
+            return view(request, *args, **kwargs)
+
+        token, last_modified = version
+        # Different pages, filters and fields of the same version differ.
+        source = f'{token}:{request.get_full_path()}'
+        etag = f'"{hashlib.md5(source.encode()).hexdigest()}"'
+        timestamp = int(last_modified.timestamp()) if last_modified else None
+
+        response = get_conditional_response(request, etag=etag, last_modified=timestamp)
+        if response is None:
+            response = view(request, *args, **kwargs)
+        if response.status_code in (200, 304):
+            response['ETag'] = etag
+            if timestamp is not None:
+                response['Last-Modified'] = http_date(timestamp)
+        return response
+
+    def list(self, request, *args, **kwargs):
+        token, _ = self.get_collection_version()
+        return self.conditional_response(
+            (token, None), super().list, request, *args, **kwargs,
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        pk = kwargs[self.lookup_url_kwarg or self.lookup_field]
+        try:
+            version = self.get_object_version(int(pk))
+        except ValueError:
+            version = None
+        return self.conditional_response(version, super().retrieve, request, *args, **kwargs)
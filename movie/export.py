@@ -0,0 +1,120 @@
+import csv
+from datetime import datetime
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+
+from api.db.streaming import stream_rows
+from api.models import Movie, Rating
+from api.routers import keep_routing
+
+EXPORT_FORMATS = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv',
+}
+
+EXPORT_FIELDS = {
+    'movies': (
+        'id', 'title', 'description', 'poster', 'rating_count', 'rating_sum', 'updated_at',
+    ),
+    'ratings': ('id', 'movie', 'user', 'stars', 'updated_at'),
+}
+
+
+class Echo:
+    """File-like object returning written value instead of buffering it."""
+
+    def write(self, value):
+        return value
+
+
+def parse_since(value):
+    """Parse changed-since filter value from a datetime or date string."""
+    since = parse_datetime(value)
+    if since is None:
+        day = parse_date(value)
+        if day is None:
+            raise ValueError(f'Invalid date or datetime: {value}')
+        since = datetime.combine(day, datetime.min.time())
+    if timezone.is_naive(since):
+        since = timezone.make_aware(since, timezone.utc)
+    return since
+
+
+def export_queryset(kind, movie=None, user=None, since=None):
+    """Return values queryset of movies or ratings to export, ordered by id."""
+    if kind == 'movies':
+        queryset = Movie.objects.all()
+        if movie is not None:
+            queryset = queryset.filter(pk=movie)
+        if user is not None:
+            queryset = queryset.filter(ratings__user=user)
+    else:
+        queryset = Rating.objects.all()
+        if movie is not None:
+            queryset = queryset.filter(movie=movie)
+        if user is not None:
+            queryset = queryset.filter(user=user)
+    if since is not None:
+        queryset = queryset.filter(updated_at__gte=since)
+
+    return queryset.order_by('id').values_list(*EXPORT_FIELDS[kind])
+
+
+def export_rows(queryset, fields, export_format, chunk_size=2000):
+    """Yield exported rows one line at a time, reading them in chunks."""
+    rows = stream_rows(queryset, chunk_size)
+
+    if export_format == 'csv':
+        writer = csv.writer(Echo())
+        yield writer.writerow(fields)
+        for row in rows:
+            yield writer.writerow(row)
+        return
+
+    encoder = DjangoJSONEncoder(ensure_ascii=False)
+    for row in rows:
+        yield encoder.encode(dict(zip(fields, row))) + '\n'
+
+
+class ExportMixin:
+    """Stream all rows of a viewset as NDJSON or CSV."""
+
+    export_kind = None
+
+    @action(methods=['GET'], detail=False, url_path='export')
+    def export(self, request):
+        """Export rows filtered by movie, user and changed-since."""
+        params = request.query_params
+        export_format = params.get('output', 'ndjson')
+        if export_format not in EXPORT_FORMATS:
+            raise ValidationError({'output': f'Choose one of: {", ".join(EXPORT_FORMATS)}.'})
+
+        filters = {}
+        try:
+            for name in ('movie', 'user'):
+                if params.get(name):
+                    filters[name] = int(params[name])
+            if params.get('since'):
+                filters['since'] = parse_since(params['since'])
+        except ValueError as error:
+            raise ValidationError({'detail': str(error)})
+
+        rows = export_rows(
+            export_queryset(self.export_kind, **filters),
+            EXPORT_FIELDS[self.export_kind],
+            export_format,
+            chunk_size=settings.EXPORT_CHUNK_SIZE,
+        )
+        response = StreamingHttpResponse(
+            keep_routing(rows), content_type=EXPORT_FORMATS[export_format],
+        )
+        response['Content-Disposition'] = (
+            f'attachment; filename="{self.export_kind}.{export_format}"'
+        )
+        return response
@@ -0,0 +1,65 @@
+import hashlib
+
+from rest_framework.exceptions import ValidationError
+
+
+def parse_names(value):
+    return [name.strip() for name in value.split(',') if name.strip()]
+
+
+class SparseFieldsetSerializerMixin:
+    """Serializer dropping fields not in fields or in exclude before serializing."""
+
+    def __init__(self, *args, fields=None, exclude=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        unknown = (set(fields or ()) | set(exclude or ())) - set(self.fields)
+        if unknown:
+            raise ValidationError({
+                'fields': [
+                    f'Unknown fields: {", ".join(sorted(unknown))}. '
+                    f'Choose from: {", ".join(self.fields)}.',
+                ],
+            })
+
+        for name in list(self.fields):
+            if (fields is not None and name not in fields) or (exclude and name in exclude):
+                self.fields.pop(name)
+
+
+class SparseFieldsetMixin:
+    """Let clients pick response fields with ?fields= and ?exclude=.
+
+    Views check wants_field() to skip queries and prefetches of dropped fields.
+    """
+
+    fieldset_actions = ('list', 'retrieve')
+
+    def get_fieldset(self):
+        """Return requested (fields, exclude), None for what wasn't requested."""
+        if self.request is None or getattr(self, 'action', None) not in self.fieldset_actions:
+            return None, None
+        params = self.request.query_params
+        fields = parse_names(params['fields']) if 'fields' in params else None
+        if fields == []:
+            raise ValidationError({'fields': ['Choose at least one field.']})
+        return fields, parse_names(params.get('exclude', '')) or None
+
+    def get_fieldset_key(self):
+        """Return a short key of the requested fieldset for cache keys."""
+        fields, exclude = self.get_fieldset()
+        if fields is None and exclude is None:
+            return 'all'
+        fieldset = f'{",".join(fields or ["*"])}-{",".join(exclude or [])}'
+        return hashlib.md5(fieldset.encode()).hexdigest()
+
+    def wants_field(self, name):
+        fields, exclude = self.get_fieldset()
+        return (fields is None or name in fields) and not (exclude and name in exclude)
+
+    def get_serializer(self, *args, **kwargs):
+        fields, exclude = self.get_fieldset()
+        if fields is not None:
+            kwargs.setdefault('fields', fields)
+        if exclude is not None:
+            kwargs.setdefault('exclude', exclude)
+        return super().get_serializer(*args, **kwargs)
@@ -0,0 +1,94 @@
+from rest_framework.exceptions import ValidationError
+from rest_framework.filters import BaseFilterBackend, OrderingFilter
+
+# Ordering name: descending ordering read from a movie index, ascending
+# ordering reads the same index backwards.
+MOVIE_ORDERINGS = {
+    'average': ('-rating_average', 'id'),
+    'count': ('-rating_count', 'id'),
+    'title': ('-title',),
+    'id': ('-id',),
+}
+
+
+def parse_number(params, name, cast):
+    try:
+        return cast(params[name])
+    except ValueError:
+        raise ValidationError({name: ['A valid number is required.']})
+
+
+class MovieFilter(BaseFilterBackend):
+    """Filter movie lists by stored rating aggregates, poster and title prefix.
+
+    Averages and counts are stored on movies and indexed, the title prefix
+    uses the UPPER(title) index of migration 0009 on PostgreSQL.
+    """
+
+    actions = ('list',)
+
+    def filter_queryset(self, request, queryset, view):
+        if getattr(view, 'action', None) not in self.actions:
+            return queryset
+
+        params = request.query_params
+        if params.get('min_average'):
+            queryset = queryset.filter(
+                rating_average__gte=parse_number(params, 'min_average', float),
+            )
+        if params.get('max_average'):
+            queryset = queryset.filter(
+                rating_average__lte=parse_number(params, 'max_average', float),
+            )
+        if params.get('min_count'):
+            queryset = queryset.filter(rating_count__gte=parse_number(params, 'min_count', int))
+        if params.get('has_poster'):
+            has_poster = params['has_poster'].lower()
+            if has_poster not in ('true', 'false'):
+                raise ValidationError({'has_poster': ['Must be true or false.']})
+            queryset = (
+                queryset.exclude(poster='') if has_poster == 'true'
+                else queryset.filter(poster='')
+            )
+        if params.get('title'):
+            queryset = queryset.filter(title__istartswith=params['title'])
+
+        return queryset
+
+
+class MovieOrderingFilter(OrderingFilter):
+    """Order movie lists by average, count, title or id, ties broken by id.
+
+    Movies without ratings have no average, they are left out when ordering
+    by it, so the cursor pagination always has a position.
+    """
+
+    actions = ('list',)
+
+    def get_ordering(self, request, queryset, view):
+        param = request.query_params.get(self.ordering_param, '').strip()
+        if getattr(view, 'action', None) not in self.actions or not param:
+            return self.get_default_ordering(view)
+
+        ordering = MOVIE_ORDERINGS.get(param.lstrip('-'))
+        if ordering is None:
+            raise ValidationError({
+                self.ordering_param: [
+                    f'Choose one of: {", ".join(MOVIE_ORDERINGS)}, prefixed by - for descending.',
+                ],
+            })
+        if param.startswith('-'):
+            return ordering
+        return tuple(field[1:] if field.startswith('-') else f'-{field}' for field in ordering)
+
+    def get_default_ordering(self, view):
+        return ('id',)
+
+    def filter_queryset(self, request, queryset, view):
+        if getattr(view, 'action', None) not in self.actions:
+            return queryset
+
+        ordering = self.get_ordering(request, queryset, view)
+        if ordering[0].lstrip('-') == 'rating_average':
+            queryset = queryset.filter(rating_average__isnull=False)
+        return queryset.order_by(*ordering)
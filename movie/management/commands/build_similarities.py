@@ -0,0 +1,65 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from api.models import Movie, MovieSimilarity
+from movie.export import parse_since
+from movie.similarity import SIMILARITY_METRICS, build_similarities
+
+
+class Command(BaseCommand):
+    """Compute similar movies from the rating matrix."""
+
+    help = 'Store top K similar movies of every movie, or refresh only changed movies.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'movie_ids', nargs='*', type=int,
+            help='Movies to refresh, all movies by default.',
+        )
+        parser.add_argument(
+            '--since',
+            help='Refresh only movies changed since this date or datetime, movies '
+                 'having them as neighbours and movies sharing a rater with them. '
+                 'The whole rating matrix is still loaded. With adjusted-cosine, '
+                 'changed user averages shift other scores slightly, run a full '
+                 'build periodically.',
+        )
+        parser.add_argument('--metric', choices=SIMILARITY_METRICS, default='cosine')
+        parser.add_argument('--top-k', type=int, default=settings.SIMILAR_MOVIES_TOP_K)
+        parser.add_argument(
+            '--chunk-size', type=int, default=100000,
+            help='Number of ratings fetched from the database at once.',
+        )
+        parser.add_argument(
+            '--block-size', type=int, default=256,
+            help='Number of movies compared with all movies at once.',
+        )
+
+    def handle(self, *args, **options):
+        movie_ids = options['movie_ids'] or None
+        if options['since']:
+            try:
+                since = parse_since(options['since'])
+            except ValueError as error:
+                raise CommandError(error)
+            changed = Movie.objects.filter(updated_at__gte=since)
+            if movie_ids:
+                changed = changed.filter(pk__in=movie_ids)
+            changed = set(changed.values_list('pk', flat=True))
+            neighbours = MovieSimilarity.objects.filter(
+                similar_movie__in=changed,
+            ).values_list('movie', flat=True)
+            movie_ids = changed | set(neighbours)
+            if not movie_ids:
+                self.stdout.write(self.style.SUCCESS('No movies changed.'))
+                return
+
+        count = build_similarities(
+            movie_ids=movie_ids,
+            metric=options['metric'],
+            top_k=options['top_k'],
+            chunk_size=options['chunk_size'],
+            block_size=options['block_size'],
+            overlapping=bool(options['since']),
+        )
+        self.stdout.write(self.style.SUCCESS(f'Built similar movies for {count} movies.'))
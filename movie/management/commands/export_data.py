@@ -0,0 +1,40 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from movie.export import EXPORT_FIELDS, EXPORT_FORMATS, export_queryset, export_rows, parse_since
+
+
+class Command(BaseCommand):
+    """Stream movies or ratings into a NDJSON or CSV file."""
+
+    help = 'Export movies or ratings as NDJSON or CSV with flat memory use.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('kind', choices=sorted(EXPORT_FIELDS))
+        parser.add_argument('--output-format', choices=sorted(EXPORT_FORMATS), default='ndjson')
+        parser.add_argument('--output', '-o', help='File to write, stdout by default.')
+        parser.add_argument('--movie', type=int, help='Export only rows of a movie.')
+        parser.add_argument('--user', type=int, help='Export only rows of a user.')
+        parser.add_argument('--since', help='Export only rows changed since a date or datetime.')
+        parser.add_argument('--chunk-size', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        try:
+            since = parse_since(options['since']) if options['since'] else None
+        except ValueError as error:
+            raise CommandError(error)
+
+        kind = options['kind']
+        rows = export_rows(
+            export_queryset(kind, movie=options['movie'], user=options['user'], since=since),
+            EXPORT_FIELDS[kind],
+            options['output_format'],
+            chunk_size=options['chunk_size'],
+        )
+
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8', newline='') as output:
+                output.writelines(rows)
+        else:
+            sys.stdout.writelines(rows)
@@ -0,0 +1,134 @@
+import numpy as np
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from api.models import Movie, Rating
+from movie.cache import invalidate_movies
+from movie.search import invalidate_index
+
+WORDS = (
+    'night', 'city', 'love', 'war', 'star', 'dark', 'last', 'river', 'king', 'dream',
+    'ghost', 'summer', 'winter', 'road', 'secret', 'fire', 'ocean', 'heart', 'storm',
+    'empire', 'shadow', 'garden', 'machine', 'silent', 'wild', 'golden', 'lost', 'island',
+)
+PASSWORD = 'benchmark'
+
+
+def zipf_weights(size, exponent, rng):
+    """Return shuffled probabilities of a Zipf distribution over size items."""
+    weights = 1 / np.arange(1, size + 1) ** exponent
+    rng.shuffle(weights)
+    return weights / weights.sum()
+
+
+def sample_pairs(movies, users, ratings, exponent, rng):
+    """Return unique (movie, user) index pairs, popular movies and active users more often."""
+    ratings = min(ratings, movies * users)
+    movie_weights = zipf_weights(movies, exponent, rng)
+    user_weights = zipf_weights(users, exponent, rng)
+    keys = np.array([], dtype=np.int64)
+    for _ in range(50):
+        missing = ratings - len(keys)
+        if missing <= 0:
+            break
+        size = int(missing * 1.2) + 10
+        sampled = (
+            rng.choice(movies, size=size, p=movie_weights).astype(np.int64) * users
+            + rng.choice(users, size=size, p=user_weights)
+        )
+        keys = np.unique(np.concatenate([keys, sampled]))
+    if len(keys) > ratings:
+        keys = np.sort(rng.choice(keys, size=ratings, replace=False))
+    return keys // users, keys % users
+
+
+class Command(BaseCommand):
+    """Generate a synthetic catalogue of movies, users and ratings."""
+
+    help = (
+        'Bulk insert movies, users and Zipf distributed ratings for benchmarks. '
+        f'Users are named {{prefix}}{{n}}@example.com with password "{PASSWORD}".'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--movies', type=int, default=10000)
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument('--ratings', type=int, default=100000)
+        parser.add_argument(
+            '--zipf', type=float, default=1.0,
+            help='Exponent of movie popularity and user activity distributions.',
+        )
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--prefix', default='bench')
+        parser.add_argument('--batch-size', type=int, default=5000)
+
+    def handle(self, *args, **options):
+        if min(options['movies'], options['users']) < 1:
+            raise CommandError('At least one movie and one user are needed.')
+        if get_user_model().objects.filter(email__startswith=options['prefix']).exists():
+            raise CommandError(f'Users with prefix "{options["prefix"]}" already exist.')
+
+        rng = np.random.default_rng(options['seed'])
+        batch_size = options['batch_size']
+        with transaction.atomic():
+            movie_ids = self.create_movies(options['movies'], rng, batch_size)
+            user_ids = self.create_users(options['users'], options['prefix'], batch_size)
+            count = self.create_ratings(
+                movie_ids, user_ids, options['ratings'], options['zipf'], rng, batch_size,
+            )
+            Movie.objects.rebuild_rating_aggregates(chunk_size=batch_size)
+            invalidate_movies([])
+            invalidate_index()
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Generated {len(movie_ids)} movies, {len(user_ids)} users and {count} ratings.',
+        ))
+
+    def create_movies(self, count, rng, batch_size):
+        last_pk = Movie.objects.order_by('-pk').values_list('pk', flat=True).first() or 0
+        for start in range(0, count, batch_size):
+            size = min(batch_size, count - start)
+            titles = rng.choice(WORDS, size=(size, 2))
+            descriptions = rng.choice(WORDS, size=(size, 8))
+            Movie.objects.bulk_create(
+                Movie(
+                    title=f'{" ".join(title).capitalize()} {last_pk + start + number + 1}',
+                    description=' '.join(description).capitalize(),
+                )
+                for number, (title, description) in enumerate(zip(titles, descriptions))
+            )
+        return np.array(
+            Movie.objects.filter(pk__gt=last_pk).order_by('pk').values_list('pk', flat=True),
+        )
+
+    def create_users(self, count, prefix, batch_size):
+        User = get_user_model()
+        last_pk = User.objects.order_by('-pk').values_list('pk', flat=True).first() or 0
+        password = make_password(PASSWORD)
+        User.objects.bulk_create(
+            (User(email=f'{prefix}{number}@example.com', password=password)
+             for number in range(count)),
+            batch_size=batch_size,
+        )
+        return np.array(
+            User.objects.filter(pk__gt=last_pk).order_by('pk').values_list('pk', flat=True),
+        )
+
+    def create_ratings(self, movie_ids, user_ids, count, exponent, rng, batch_size):
+        movies, users = sample_pairs(len(movie_ids), len(user_ids), count, exponent, rng)
+        quality = rng.uniform(1.5, 4.8, size=len(movie_ids))
+        stars = np.clip(np.rint(rng.normal(quality[movies], 0.9)), 1, 5).astype(np.int64)
+        movies, users = movie_ids[movies], user_ids[users]
+
+        for start in range(0, len(stars), batch_size):
+            end = start + batch_size
+            Rating.objects.bulk_create(
+                Rating(movie_id=movie, user_id=user, stars=value)
+                for movie, user, value in zip(
+                    movies[start:end].tolist(), users[start:end].tolist(),
+                    stars[start:end].tolist(),
+                )
+            )
+        return len(stars)
@@ -0,0 +1,48 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from movie.bulk import import_ratings
+
+
+def read_rows(file):
+    """Yield rows of a JSON array or NDJSON file, NDJSON is read line by line."""
+    start = file.read(1)
+    while start.isspace():
+        start = file.read(1)
+    file.seek(0)
+
+    if start == '[':
+        yield from json.load(file)
+        return
+
+    for line in file:
+        line = line.strip()
+        if line:
+            try:
+                yield json.loads(line)
+            except ValueError:
+                yield line
+
+
+class Command(BaseCommand):
+    """Upsert ratings from a JSON array or NDJSON file."""
+
+    help = 'Import (movie, user, stars) ratings in batched upserts.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='JSON array or NDJSON file with ratings.')
+        parser.add_argument('--chunk-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        try:
+            with open(options['path'], encoding='utf-8') as file:
+                result = import_ratings(read_rows(file), chunk_size=options['chunk_size'])
+        except (OSError, ValueError) as error:
+            raise CommandError(error)
+
+        for error in result['errors']:
+            self.stderr.write(f'Row {error["row"]}: {json.dumps(error["errors"])}')
+        self.stdout.write(self.style.SUCCESS(
+            f'Upserted {result["upserted"]} ratings, {len(result["errors"])} rows failed.'
+        ))
@@ -0,0 +1,38 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from api.db.streaming import stream_rows
+from api.models import Movie
+from movie.posters import process_poster
+
+
+class Command(BaseCommand):
+    """Build poster variants of movies which don't have them."""
+
+    help = 'Process pending and failed posters, or posters of given movies.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('movie_ids', nargs='*', type=int)
+        parser.add_argument(
+            '--queue', action='store_true',
+            help='Queue posters for task workers instead of processing them here.',
+        )
+
+    def handle(self, *args, **options):
+        movies = Movie.objects.exclude(poster='')
+        if options['movie_ids']:
+            movies = movies.filter(pk__in=options['movie_ids'])
+        else:
+            movies = movies.exclude(poster_status=Movie.POSTER_READY)
+
+        count = 0
+        rows = movies.order_by('id').values_list('id', 'poster')
+        for movie_id, poster_name in stream_rows(rows, settings.EXPORT_CHUNK_SIZE):
+            Movie.objects.filter(pk=movie_id).update(poster_status=Movie.POSTER_PENDING)
+            if options['queue']:
+                process_poster.delay(movie_id, poster_name)
+            else:
+                process_poster.run(movie_id, poster_name)
+            count += 1
+
+        self.stdout.write(self.style.SUCCESS(f'Processed {count} posters.'))
@@ -0,0 +1,48 @@
+from rest_framework.pagination import CursorPagination, PageNumberPagination
+
+
+class MoviePageNumberPagination(PageNumberPagination):
+    """Page number pagination with total count, used by admin tools."""
+
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+
+
+class IdCursorPagination(CursorPagination):
+    """Keyset pagination on id, so deep pages cost the same as the first one."""
+
+    ordering = 'id'
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+
+
+class MovieIdCursorPagination(IdCursorPagination):
+    """Keyset pagination of one user's ratings on the (user, movie) index."""
+
+    ordering = 'movie_id'
+
+
+class PaginationModeMixin:
+    """Paginate with page numbers when a page is requested, with cursor otherwise."""
+
+    page_pagination_class = MoviePageNumberPagination
+    # Actions whose results aren't ordered by id can't use the cursor.
+    page_pagination_actions = ()
+
+    def get_pagination_class(self):
+        """Retrieve appropriate pagination class."""
+        if getattr(self, 'action', None) in self.page_pagination_actions:
+            return self.page_pagination_class
+        page_query_param = self.page_pagination_class.page_query_param
+        if self.request is not None and page_query_param in self.request.query_params:
+            return self.page_pagination_class
+
+        return self.pagination_class
+
+    @property
+    def paginator(self):
+        """The paginator instance associated with the view, or None."""
+        if not hasattr(self, '_paginator'):
+            pagination_class = self.get_pagination_class()
+            self._paginator = pagination_class() if pagination_class else None
+        return self._paginator
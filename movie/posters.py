@@ -0,0 +1,119 @@
+import io
+import logging
+import os
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import transaction
+from PIL import Image, features
+
+from api.models import Movie
+from api.tasks import task
+from movie.cache import invalidate_movies
+
+logger = logging.getLogger(__name__)
+
+# Variant name: (maximum size, image format, file extension).
+POSTER_VARIANTS = {
+    'thumbnail': ((150, 225), 'JPEG', 'jpg'),
+    'list': ((300, 450), 'JPEG', 'jpg'),
+    'detail': ((600, 900), 'JPEG', 'jpg'),
+    'webp': ((600, 900), 'WEBP', 'webp'),
+}
+POSTER_QUALITY = 80
+
+
+def render_variant(image, size, image_format):
+    """Return image resized to fit size and recompressed in a format."""
+    variant = image.copy()
+    variant.thumbnail(size, Image.LANCZOS)
+    if variant.mode not in ('RGB', 'L'):
+        variant = variant.convert('RGB')
+
+    output = io.BytesIO()
+    variant.save(output, image_format, quality=POSTER_QUALITY, optimize=True)
+    return output.getvalue()
+
+
+def build_variants(poster_name):
+    """Save resized variants of a poster and return their storage names."""
+    base, _ = os.path.splitext(poster_name)
+    with default_storage.open(poster_name) as poster:
+        image = Image.open(poster)
+        image.load()
+
+    variants = {}
+    for name, (size, image_format, extension) in POSTER_VARIANTS.items():
+        if image_format == 'WEBP' and not features.check('webp'):
+            logger.warning('Pillow is built without WebP support, skipping %s variant', name)
+            continue
+        content = render_variant(image, size, image_format)
+        variants[name] = default_storage.save(f'{base}-{name}.{extension}', ContentFile(content))
+    return variants
+
+
+def mark_failed(error, movie_id, poster_name):
+    """Keep the error of a poster which couldn't be processed."""
+    Movie.objects.filter(pk=movie_id, poster=poster_name).update(
+        poster_status=Movie.POSTER_FAILED,
+        poster_error=f'{type(error).__name__}: {error}',
+    )
+
+
+@task(max_retries=3, on_failure=mark_failed)
+def process_poster(movie_id, poster_name):
+    """Build poster variants of a movie and store their names."""
+    movie = Movie.objects.filter(pk=movie_id, poster=poster_name).only('poster_variants').first()
+    if movie is None:
+        # The movie was deleted or got another poster in the meantime.
+        return
+
+    variants = build_variants(poster_name)
+    updated = Movie.objects.filter(pk=movie_id, poster=poster_name).update(
+        poster_status=Movie.POSTER_READY,
+        poster_variants=variants,
+        poster_error='',
+    )
+    stale = variants.values() if not updated else movie.poster_variants.values()
+    for name in stale:
+        default_storage.delete(name)
+
+    # Variants are updated with a query, so movie caches are dropped here.
+    invalidate_movies([movie_id])
+
+
+def mark_upload_failed(error, movie_id, poster_name):
+    """Keep the error of a poster upload which couldn't be attached to its movie."""
+    Movie.objects.filter(pk=movie_id).update(
+        poster_status=Movie.POSTER_FAILED,
+        poster_error=f'{type(error).__name__}: {error}',
+    )
+
+
+@task(max_retries=3, on_failure=mark_upload_failed)
+def save_poster(movie_id, poster_name):
+    """Set a stored poster upload as poster of a movie and queue building its variants."""
+    updated = Movie.objects.filter(pk=movie_id).update(poster=poster_name)
+    if not updated:
+        # The movie was deleted in the meantime.
+        default_storage.delete(poster_name)
+        return
+
+    invalidate_movies([movie_id])
+    process_poster.delay(movie_id, poster_name)
+
+
+def schedule_poster_upload(movie, poster):
+    """Store a poster upload and mark it pending, tasks pick it up once the movie is committed.
+
+    The upload is streamed to storage in the request, tasks only get its
+    name, so job payloads stay small however big the image is.
+    """
+    field = Movie._meta.get_field('poster')
+    poster_name = default_storage.save(field.generate_filename(movie, poster.name), poster)
+    Movie.objects.filter(pk=movie.pk).update(
+        poster_status=Movie.POSTER_PENDING,
+        poster_error='',
+    )
+    movie.poster_status = Movie.POSTER_PENDING
+    transaction.on_commit(lambda: save_poster.delay(movie.pk, poster_name))
@@ -0,0 +1,152 @@
+import bisect
+import math
+import re
+import threading
+from collections import Counter, defaultdict
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import BooleanField, FloatField
+from django.db.models.expressions import RawSQL
+from django.db.models.functions import Length
+
+from api.db.streaming import stream_rows
+from api.models import Movie
+from api.routers import use_replicas
+from movie.cache import get_cache, new_version
+
+SEARCH_MODES = ('full', 'prefix')
+SEARCH_ORDERINGS = ('relevance', 'rating')
+SEARCH_VERSION_KEY = 'movies:search-version'
+
+# Words of titles count more than words of descriptions, like the 'A' and
+# 'B' weights of the PostgreSQL search vector.
+TITLE_WEIGHT = 2.0
+TOKEN_RE = re.compile(r'\w+')
+RATING_ORDERING = ('-bayesian_score', 'id')
+
+
+def tokenize(text):
+    return TOKEN_RE.findall(text.lower())
+
+
+class InvertedIndex:
+    """In-process full-text and title prefix index of movies.
+
+    Used when the database has no full-text search, e.g. SQLite in tests
+    and development. Documents are scored with TF-IDF.
+    """
+
+    def __init__(self, movies):
+        self.postings = defaultdict(dict)
+        self.titles = []
+        for movie_id, title, description in movies:
+            weights = Counter()
+            for token in tokenize(title):
+                weights[token] += TITLE_WEIGHT
+            for token in tokenize(description):
+                weights[token] += 1
+            length = math.sqrt(sum(weight * weight for weight in weights.values())) or 1
+            for token, weight in weights.items():
+                self.postings[token][movie_id] = weight / length
+            self.titles.append((title.lower(), movie_id))
+        self.titles.sort()
+        self.size = len(self.titles)
+
+    def search(self, query):
+        """Return ids of movies matching all words of a query, best first."""
+        tokens = set(tokenize(query))
+        if not tokens or any(token not in self.postings for token in tokens):
+            return []
+
+        postings = sorted((self.postings[token] for token in tokens), key=len)
+        scores = Counter()
+        for movie_id in set(postings[0]).intersection(*postings[1:]):
+            scores[movie_id] = sum(
+                matches[movie_id] * math.log(1 + self.size / len(matches))
+                for matches in postings
+            )
+        ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))
+        return [movie_id for movie_id, _ in ranked]
+
+    def prefix(self, query):
+        """Return ids of movies whose title starts with a query, shortest first."""
+        query = query.lower()
+        start = bisect.bisect_left(self.titles, (query,))
+        matches = []
+        for title, movie_id in self.titles[start:]:
+            if not title.startswith(query):
+                break
+            matches.append((len(title), title, movie_id))
+        return [movie_id for _, _, movie_id in sorted(matches)]
+
+
+_index = None
+_index_version = None
+_index_lock = threading.Lock()
+
+
+def get_index():
+    """Return the in-process index, rebuilt after movies changed in any process."""
+    global _index, _index_version
+    version = get_cache().get(SEARCH_VERSION_KEY)
+    with _index_lock:
+        if _index is None or version is None or version != _index_version:
+            if version is None:
+                version = new_version()
+                get_cache().set(SEARCH_VERSION_KEY, version, timeout=None)
+            with use_replicas(False):
+                _index = InvertedIndex(stream_rows(
+                    Movie.objects.order_by('id').values_list('id', 'title', 'description'),
+                    settings.EXPORT_CHUNK_SIZE,
+                ))
+            _index_version = version
+        return _index
+
+
+def invalidate_index():
+    """Rebuild the in-process index on the next search."""
+    get_cache().set(SEARCH_VERSION_KEY, new_version(), timeout=None)
+
+
+def order_by_rating(movie_ids):
+    """Return ids ordered by rating instead of relevance."""
+    return list(
+        Movie.objects.filter(pk__in=movie_ids).order_by(*RATING_ORDERING)
+        .values_list('pk', flat=True)
+    )
+
+
+def postgres_search(query, mode, ordering, limit):
+    """Search with the full-text and prefix indexes of migration 0009."""
+    if mode == 'prefix':
+        movies = Movie.objects.filter(title__istartswith=query)
+        relevance = (Length('title'), 'title', 'id')
+    else:
+        tsquery = "websearch_to_tsquery('english', %s)"
+        movies = Movie.objects.filter(
+            RawSQL(f'api_movie.search_vector @@ {tsquery}', [query], output_field=BooleanField()),
+        ).annotate(rank=RawSQL(
+            f'ts_rank_cd(api_movie.search_vector, {tsquery})', [query], output_field=FloatField(),
+        ))
+        relevance = ('-rank', 'id')
+
+    movies = movies.order_by(*(RATING_ORDERING if ordering == 'rating' else relevance))
+    return list(movies.values_list('pk', flat=True)[:limit])
+
+
+def fallback_search(query, mode, ordering, limit):
+    """Search with the in-process inverted index."""
+    index = get_index()
+    movie_ids = index.prefix(query) if mode == 'prefix' else index.search(query)
+    if ordering == 'rating':
+        movie_ids = order_by_rating(movie_ids)
+    return movie_ids[:limit]
+
+
+def search_movies(query, mode='full', ordering='relevance', limit=None):
+    """Return ids of movies matching a query in the requested order."""
+    limit = limit or settings.SEARCH_MAX_RESULTS
+    if connection.vendor == 'postgresql':
+        return postgres_search(query, mode, ordering, limit)
+    return fallback_search(query, mode, ordering, limit)
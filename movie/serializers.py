@@ -1,8 +1,11 @@
+from django.conf import settings
+from django.core.files.storage import default_storage
 from rest_framework import serializers
 from api.models import Movie, Rating
+from movie.fieldsets import SparseFieldsetSerializerMixin
 
 
-class RatingSerializer(serializers.ModelSerializer):
+class RatingSerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
     """Serializer for ratings."""
 
     class Meta:
@@ -11,24 +14,74 @@ class RatingSerializer(serializers.ModelSerializer):
         read_only_field = ('id',)
 
 
-class MovieSerializer(serializers.ModelSerializer):
-    """Serializer for movies."""
+class PosterVariantsField(serializers.Field):
+    """Field exposing poster variant names as URLs."""
 
-    ratings = serializers.PrimaryKeyRelatedField(
-        queryset=Rating.objects.all(),
-        many=True,
-    )
+    def __init__(self, **kwargs):
+        kwargs['read_only'] = True
+        super().__init__(**kwargs)
+
+    def to_representation(self, variants):
+        request = self.context.get('request')
+        urls = {}
+        for name, path in variants.items():
+            url = default_storage.url(path)
+            urls[name] = request.build_absolute_uri(url) if request is not None else url
+        return urls
+
+
+class MovieSerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
+    """Serializer for movies.
+
+    Ratings aren't listed, a movie can have thousands of them, only the
+    latest are embedded into a movie detail.
+    """
+
+    poster_variants = PosterVariantsField()
 
     class Meta:
         model = Movie
-        fields = ('id', 'title', 'description', 'ratings', 'poster', 'average_rating')
-        read_only_fields = ('id',)
+        fields = (
+            'id', 'title', 'description', 'poster', 'poster_status',
+            'poster_variants', 'average_rating', 'rating_count',
+        )
+        read_only_fields = ('id', 'rating_count')
+
+
+class MovieRankingSerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
+    """Serializer for a movie in a ranking."""
+
+    class Meta:
+        model = Movie
+        fields = ('id', 'title', 'poster', 'average_rating', 'rating_count', 'bayesian_score')
+        read_only_fields = fields
+
+
+class SimilarMovieSerializer(MovieRankingSerializer):
+    """Serializer for a movie similar to another one."""
+
+    similarity = serializers.FloatField(read_only=True)
+
+    class Meta(MovieRankingSerializer.Meta):
+        fields = MovieRankingSerializer.Meta.fields + ('similarity',)
+        read_only_fields = fields
 
 
 class MovieDetailSerializer(MovieSerializer):
     """Serializer for a movie detail."""
 
-    ratings = RatingSerializer(many=True, read_only=True)
+    ratings = serializers.SerializerMethodField()
+
+    class Meta(MovieSerializer.Meta):
+        fields = (
+            'id', 'title', 'description', 'ratings', 'poster', 'poster_status',
+            'poster_variants', 'average_rating', 'rating_count',
+        )
+
+    def get_ratings(self, movie):
+        """Return latest ratings of a movie, the rest are paginated separately."""
+        ratings = movie.ratings.order_by('-id')[:settings.MOVIE_DETAIL_RATINGS_LIMIT]
+        return RatingSerializer(ratings, many=True, context=self.context).data
 
 
 class MovieImageSerializer(serializers.ModelSerializer):
@@ -36,7 +89,7 @@ class MovieImageSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Movie
-        fields = ('id', 'poster')
+        fields = ('id', 'poster', 'poster_status')
         read_only_fields = ('id',)
 
 
@@ -0,0 +1,21 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from api.models import Movie, Rating
+from movie.cache import invalidate_movies
+from movie.search import invalidate_index
+
+
+@receiver(post_save, sender=Movie)
+@receiver(post_delete, sender=Movie)
+def invalidate_movie(sender, instance, **kwargs):
+    """Drop cached responses and search index of a changed movie."""
+    invalidate_movies([instance.pk])
+    invalidate_index()
+
+
+@receiver(post_save, sender=Rating)
+@receiver(post_delete, sender=Rating)
+def invalidate_rated_movie(sender, instance, **kwargs):
+    """Drop cached responses of a movie whose ratings changed."""
+    invalidate_movies([instance.movie_id])
@@ -0,0 +1,145 @@
+import numpy as np
+from django.db import transaction
+from scipy import sparse
+
+from api.db.streaming import stream_rows
+from api.models import MovieSimilarity, Rating
+from movie.cache import invalidate_movies
+
+SIMILARITY_METRICS = ('cosine', 'adjusted-cosine')
+
+
+def load_rating_matrix(chunk_size=100000):
+    """Load ratings into a sparse users x movies matrix.
+
+    Ratings are streamed from the database and kept as compact NumPy chunks,
+    so memory grows with the number of ratings, not with Python objects.
+    Return the matrix and the movie id of every column.
+    """
+    users, movies, stars = [], [], []
+    rows = Rating.objects.order_by('id').values_list('id', 'user_id', 'movie_id', 'stars')
+    chunk = []
+    for row in stream_rows(rows, chunk_size):
+        chunk.append(row)
+        if len(chunk) == chunk_size:
+            _append_chunk(chunk, users, movies, stars)
+            chunk = []
+    if chunk:
+        _append_chunk(chunk, users, movies, stars)
+
+    if not users:
+        return sparse.csr_matrix((0, 0), dtype=np.float32), np.array([], dtype=np.int64)
+
+    user_ids, user_index = np.unique(np.concatenate(users), return_inverse=True)
+    movie_ids, movie_index = np.unique(np.concatenate(movies), return_inverse=True)
+    matrix = sparse.csr_matrix(
+        (np.concatenate(stars), (user_index, movie_index)),
+        shape=(len(user_ids), len(movie_ids)),
+        dtype=np.float32,
+    )
+    return matrix, movie_ids
+
+
+def _append_chunk(chunk, users, movies, stars):
+    array = np.array(chunk, dtype=np.int64)
+    users.append(array[:, 1])
+    movies.append(array[:, 2])
+    stars.append(array[:, 3].astype(np.float32))
+
+
+def normalize_columns(matrix, metric='cosine'):
+    """Return movies x users matrix of unit length movie vectors.
+
+    Adjusted cosine subtracts the average rating of each user first, so
+    users who rate everything high don't make all movies look alike.
+    """
+    matrix = matrix.tocsr(copy=True)
+    if metric == 'adjusted-cosine':
+        counts = np.diff(matrix.indptr)
+        means = np.asarray(matrix.sum(axis=1)).ravel() / np.maximum(counts, 1)
+        matrix.data -= np.repeat(means, counts).astype(np.float32)
+
+    items = matrix.T.tocsr()
+    norms = np.sqrt(np.asarray(items.multiply(items).sum(axis=1)).ravel())
+    norms[norms == 0] = 1
+    return sparse.diags(1 / norms).dot(items).astype(np.float32).tocsr()
+
+
+def nearest_neighbours(items, rows, top_k):
+    """Yield row, neighbour columns and scores of most similar movies.
+
+    Similarities of the given rows to all movies are computed at once, so
+    the block size bounds the dense array held in memory.
+    """
+    scores = items[rows].dot(items.T).toarray()
+    scores[np.arange(len(rows)), rows] = -np.inf
+    k = min(top_k, scores.shape[1] - 1)
+    if k <= 0:
+        for row in rows:
+            yield row, np.array([], dtype=np.int64), np.array([], dtype=np.float32)
+        return
+
+    best = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    for position, row in enumerate(rows):
+        columns = best[position]
+        values = scores[position, columns]
+        order = np.argsort(-values, kind='stable')
+        columns, values = columns[order], values[order]
+        positive = values > 0
+        yield row, columns[positive], values[positive]
+
+
+def overlapping_movies(matrix, columns, movie_ids):
+    """Return ids of movies rated by any user who rated one of given movies."""
+    positions = np.flatnonzero(np.isin(columns, list(movie_ids)))
+    raters = np.unique(matrix[:, positions].nonzero()[0])
+    return set(columns[np.unique(matrix[raters].nonzero()[1])].tolist())
+
+
+def build_similarities(movie_ids=None, metric='cosine', top_k=20, chunk_size=100000,
+                       block_size=256, overlapping=False):
+    """Store top K similar movies of all or given movies.
+
+    With overlapping, movies sharing a rater with given movies are refreshed
+    too, only their similarity to given movies can have changed. Return
+    the number of movies whose neighbours were refreshed.
+    """
+    if metric not in SIMILARITY_METRICS:
+        raise ValueError(f'Unknown similarity metric: {metric}')
+
+    matrix, columns = load_rating_matrix(chunk_size=chunk_size)
+    items = normalize_columns(matrix, metric)
+    positions = {movie_id: index for index, movie_id in enumerate(columns.tolist())}
+
+    if movie_ids is None:
+        targets = columns.tolist()
+    else:
+        movie_ids = set(movie_ids)
+        if overlapping:
+            movie_ids |= overlapping_movies(matrix, columns, movie_ids)
+        targets = sorted(movie_ids)
+        unrated = [pk for pk in targets if pk not in positions]
+        MovieSimilarity.objects.filter(movie__in=unrated).delete()
+
+    rows = np.array([positions[pk] for pk in targets if pk in positions], dtype=np.int64)
+    for start in range(0, len(rows), block_size):
+        block = rows[start:start + block_size]
+        block_ids = columns[block].tolist()
+        similarities = [
+            MovieSimilarity(
+                movie_id=int(columns[row]),
+                similar_movie_id=int(columns[column]),
+                score=float(score),
+            )
+            for row, neighbours, scores in nearest_neighbours(items, block, top_k)
+            for column, score in zip(neighbours, scores)
+        ]
+        with transaction.atomic():
+            MovieSimilarity.objects.filter(movie__in=block_ids).delete()
+            MovieSimilarity.objects.bulk_create(similarities)
+
+    if movie_ids is None:
+        MovieSimilarity.objects.filter(movie__rating_count=0).delete()
+    # Dropped once, every call also bumps the version of all movie lists.
+    invalidate_movies(targets)
+    return len(targets)
@@ -0,0 +1,75 @@
+import asyncio
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.test import AsyncClient
+from django.urls import reverse
+from rest_framework import status
+
+from api.models import Movie, Rating
+from movie.async_views import _semaphores, get_semaphore
+
+ASYNC_MOVIES_URL = reverse('movie:async-movie-list')
+
+
+def async_detail_url(movie_id):
+    return reverse('movie:async-movie-detail', args=[movie_id])
+
+
+def async_aggregates_url(movie_id):
+    return reverse('movie:async-movie-aggregates', args=[movie_id])
+
+
+@pytest.fixture
+def movie():
+    movie = Movie.objects.create(title='Movie')
+    user = get_user_model().objects.create_user('rater@gmail.com')
+    Rating.objects.create(stars=4, movie=movie, user=user)
+    return movie
+
+
+@pytest.mark.django_db(transaction=True)
+def test_async_movie_list(client, movie):
+    """Test movies are listed on the async read path."""
+    response = client.get(ASYNC_MOVIES_URL)
+    data = response.json()
+
+    assert response.status_code == status.HTTP_200_OK
+    assert data['results'][0]['title'] == 'Movie'
+    assert data['results'][0]['average_rating'] == 4
+
+
+@pytest.mark.django_db(transaction=True)
+def test_async_movie_detail(client, movie):
+    """Test movie detail and aggregates on the async read path."""
+    response = client.get(async_detail_url(movie.id))
+
+    assert response.json()['ratings'][0]['stars'] == 4
+    assert client.get(async_detail_url(0)).status_code == status.HTTP_404_NOT_FOUND
+    assert client.get(async_aggregates_url(movie.id)).json()['rating_count'] == 1
+    assert client.post(ASYNC_MOVIES_URL).status_code == status.HTTP_405_METHOD_NOT_ALLOWED
+
+
+@pytest.mark.django_db(transaction=True)
+def test_async_concurrent_requests(movie):
+    """Test concurrent requests are served from one event loop."""
+    async def fetch_all():
+        client = AsyncClient()
+        return await asyncio.gather(*[
+            client.get(async_detail_url(movie.id)) for _ in range(5)
+        ])
+
+    responses = asyncio.run(fetch_all())
+
+    assert [response.status_code for response in responses] == [200] * 5
+
+
+def test_semaphores_of_closed_loops_dropped():
+    """Test semaphores don't keep finished event loops alive."""
+    async def use_semaphore():
+        async with get_semaphore():
+            return asyncio.get_running_loop()
+
+    loops = [asyncio.run(use_semaphore()) for _ in range(3)]
+
+    assert sum(loop in _semaphores for loop in loops) <= 1
@@ -0,0 +1,77 @@
+import pytest
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from api.models import Movie, Rating
+from movie.views import BATCH_MAX_IDS
+
+BATCH_URL = reverse('movie:movie-batch')
+
+
+@pytest.fixture
+def client():
+    client = APIClient()
+    yield client
+
+
+@pytest.fixture
+def movies():
+    user = get_user_model().objects.create_user('rater@gmail.com')
+    movies = [Movie.objects.create(title=f'Movie {number}') for number in range(3)]
+    for stars, movie in enumerate(movies, start=3):
+        Rating.objects.create(stars=stars, movie=movie, user=user)
+    return movies
+
+
+def ids(*movie_ids):
+    return {'ids': ','.join(map(str, movie_ids))}
+
+
+@pytest.mark.django_db
+def test_batch_returns_movies_in_requested_order(client: APIClient, movies):
+    """Test movies are returned in the requested order and unknown ids reported."""
+    response = client.get(BATCH_URL, ids(movies[2].pk, 404, movies[0].pk, movies[2].pk))
+
+    assert response.status_code == status.HTTP_200_OK
+    assert [movie['title'] for movie in response.data['results']] == ['Movie 2', 'Movie 0']
+    assert response.data['results'][0]['rating_count'] == 1
+    assert response.data['not_found'] == [404]
+
+
+@pytest.mark.django_db
+def test_batch_query_count(client: APIClient, movies, django_assert_num_queries):
+    """Test movies are read with one query, then cached."""
+    params = ids(*(movie.pk for movie in movies))
+
+    with django_assert_num_queries(1):
+        client.get(BATCH_URL, params)
+    with django_assert_num_queries(0):
+        response = client.get(BATCH_URL, params)
+
+    assert len(response.data['results']) == 3
+
+
+@pytest.mark.django_db
+def test_batch_after_rating(client: APIClient, movies):
+    """Test a cached movie is rebuilt after it is rated."""
+    params = ids(movies[0].pk, movies[1].pk)
+    client.get(BATCH_URL, params)
+    user = get_user_model().objects.create_user('other@gmail.com')
+    Rating.objects.create(stars=5, movie=movies[0], user=user)
+
+    response = client.get(BATCH_URL, params)
+
+    assert [movie['rating_count'] for movie in response.data['results']] == [2, 1]
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('params', [
+    {}, {'ids': 'one,two'}, ids(*range(1, BATCH_MAX_IDS + 2)),
+])
+def test_batch_invalid_ids(client: APIClient, params):
+    """Test missing, invalid and too many ids are rejected."""
+    response = client.get(BATCH_URL, params)
+
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
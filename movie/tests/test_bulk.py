@@ -0,0 +1,124 @@
+import json
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import IntegrityError
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from api.models import Movie, Rating
+from movie import bulk
+from movie.bulk import import_ratings
+
+BULK_URL = reverse('movie:rating-bulk')
+
+
+@pytest.fixture
+def client():
+    client = APIClient()
+    yield client
+
+
+@pytest.fixture
+def staff():
+    return get_user_model().objects.create_superuser('staff@gmail.com', 'password')
+
+
+@pytest.fixture
+def rater():
+    return get_user_model().objects.create_user('rater@gmail.com')
+
+
+@pytest.fixture
+def movie():
+    return Movie.objects.create(title='Movie')
+
+
+@pytest.mark.django_db
+def test_bulk_requires_staff(client: APIClient, rater):
+    """Test common users can't import ratings."""
+    client.force_authenticate(rater)
+    response = client.post(BULK_URL, [], format='json')
+
+    assert response.status_code == status.HTTP_403_FORBIDDEN
+
+
+@pytest.mark.django_db
+def test_bulk_upsert_ratings(client: APIClient, staff, rater, movie):
+    """Test ratings are created and updated, invalid rows are reported."""
+    Rating.objects.create(stars=1, movie=movie, user=rater)
+    client.force_authenticate(staff)
+    payload = [
+        {'movie': movie.id, 'user': rater.id, 'stars': 4},
+        {'movie': movie.id, 'user': staff.id, 'stars': 2},
+        {'movie': movie.id, 'user': staff.id, 'stars': 9},
+        {'movie': 0, 'user': staff.id, 'stars': 3},
+        {'movie': movie.id, 'stars': 3},
+    ]
+    response = client.post(BULK_URL, payload, format='json')
+    movie.refresh_from_db()
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.data['upserted'] == 2
+    assert [error['row'] for error in response.data['errors']] == [2, 3, 4]
+    assert set(response.data['errors'][0]['errors']) == {'stars'}
+    assert set(response.data['errors'][1]['errors']) == {'movie'}
+    assert set(response.data['errors'][2]['errors']) == {'user'}
+    assert Rating.objects.get(movie=movie, user=rater).stars == 4
+    assert movie.rating_count == 2
+    assert movie.rating_sum == 6
+    assert movie.rating_histogram == {1: 0, 2: 1, 3: 0, 4: 1, 5: 0}
+
+
+@pytest.mark.django_db
+def test_bulk_upsert_ndjson(client: APIClient, staff, movie):
+    """Test ratings can be sent as NDJSON."""
+    client.force_authenticate(staff)
+    body = json.dumps({'movie': movie.id, 'user': staff.id, 'stars': 5}) + '\n'
+    response = client.post(BULK_URL, body, content_type='application/x-ndjson')
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.data == {'upserted': 1, 'errors': []}
+
+
+@pytest.mark.django_db
+def test_user_deleted_during_import(staff, rater, movie, monkeypatch):
+    """Test rows of a user deleted between the check and the insert become row errors."""
+    rater_id = rater.id
+    upsert_existing = bulk.upsert_existing
+
+    def delete_user_first(rows):
+        monkeypatch.setattr(bulk, 'upsert_existing', upsert_existing)
+        rater.delete()
+        raise IntegrityError('FOREIGN KEY constraint failed')
+
+    monkeypatch.setattr(bulk, 'upsert_existing', delete_user_first)
+    result = import_ratings([
+        {'movie': movie.id, 'user': rater_id, 'stars': 4},
+        {'movie': movie.id, 'user': staff.id, 'stars': 2},
+    ])
+
+    assert result['upserted'] == 1
+    assert result['errors'] == [
+        {'row': 0, 'errors': {'user': [f'Invalid pk "{rater_id}" - object does not exist.']}},
+    ]
+
+
+@pytest.mark.django_db
+def test_import_ratings_command(rater, movie, tmp_path):
+    """Test import command upserts ratings from a NDJSON file in chunks."""
+    other = Movie.objects.create(title='Other Movie')
+    path = tmp_path / 'ratings.ndjson'
+    path.write_text('\n'.join([
+        json.dumps({'movie': movie.id, 'user': rater.id, 'stars': 3}),
+        'not json',
+        json.dumps({'movie': other.id, 'user': rater.id, 'stars': 5}),
+    ]))
+    call_command('import_ratings', str(path), '--chunk-size', '1')
+    other.refresh_from_db()
+
+    assert Rating.objects.filter(user=rater).count() == 2
+    assert other.average_rating() == 5
+    call_command('rebuild_rating_aggregates', '--check')
@@ -0,0 +1,140 @@
+import pytest
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from api.models import Movie, Rating
+from api.routers import ReplicaRouter
+
+MOVIES_URL = reverse('movie:movie-list')
+RATINGS_URL = reverse('movie:rating-list')
+BATCH_URL = reverse('movie:movie-batch')
+CACHE_STATS_URL = reverse('movie:cache-stats')
+
+
+def detail_url(movie_id):
+    return reverse('movie:movie-detail', args=[movie_id])
+
+
+def aggregates_url(movie_id):
+    return reverse('movie:movie-aggregates', args=[movie_id])
+
+
+@pytest.fixture
+def client():
+    client = APIClient()
+    yield client
+
+
+@pytest.fixture
+def rater():
+    return get_user_model().objects.create_user('rater@gmail.com')
+
+
+@pytest.fixture
+def movie():
+    return Movie.objects.create(title='Movie')
+
+
+@pytest.fixture
+def stale_reads(settings, monkeypatch):
+    """Route replica reads to a 'stale' alias, recorded and then served by the primary."""
+    settings.DATABASE_REPLICAS = ['stale']
+    reads = []
+    db_for_read = ReplicaRouter.db_for_read
+
+    def route(self, model, **hints):
+        database = db_for_read(self, model, **hints)
+        if database == 'stale':
+            reads.append(model._meta.label)
+            return 'default'
+        return database
+
+    monkeypatch.setattr(ReplicaRouter, 'db_for_read', route)
+    return reads
+
+
+@pytest.mark.django_db
+def test_cache_entries_built_from_primary(client: APIClient, movie, rater, stale_reads):
+    """Test cached responses, versions, aggregates and tokens aren't read from replicas."""
+    token = Token.objects.create(user=rater)
+    client.credentials(HTTP_AUTHORIZATION=f'Token {token.key}')
+    Rating.objects.create(stars=4, movie=movie, user=rater)
+
+    responses = [
+        client.get(MOVIES_URL),
+        client.get(detail_url(movie.id)),
+        client.get(aggregates_url(movie.id)),
+        client.get(BATCH_URL, {'ids': movie.id}),
+    ]
+
+    assert all(response.status_code == status.HTTP_200_OK for response in responses)
+    assert stale_reads == []
+
+    client.get(RATINGS_URL)
+
+    assert stale_reads
+
+
+@pytest.mark.django_db
+def test_list_served_from_cache(client: APIClient, movie, django_assert_num_queries):
+    """Test repeated movie list requests don't query the database."""
+    client.get(MOVIES_URL)
+
+    with django_assert_num_queries(0):
+        response = client.get(MOVIES_URL)
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.data['results'][0]['title'] == 'Movie'
+
+
+@pytest.mark.django_db
+def test_detail_invalidated_on_rating(client: APIClient, movie, rater):
+    """Test cached movie detail is dropped when the movie is rated."""
+    client.get(detail_url(movie.id))
+    Rating.objects.create(stars=4, movie=movie, user=rater)
+    response = client.get(detail_url(movie.id))
+
+    assert response.data['average_rating'] == 4
+
+
+@pytest.mark.django_db
+def test_list_invalidated_on_movie_change(client: APIClient, movie):
+    """Test cached movie list is dropped when a movie changes."""
+    client.get(MOVIES_URL)
+    movie.title = 'New Title'
+    movie.save()
+    response = client.get(MOVIES_URL)
+
+    assert response.data['results'][0]['title'] == 'New Title'
+
+
+@pytest.mark.django_db
+def test_aggregates_cached(client: APIClient, movie, rater, django_assert_num_queries):
+    """Test movie aggregates are served from the cache."""
+    Rating.objects.create(stars=2, movie=movie, user=rater)
+    client.get(aggregates_url(movie.id))
+
+    with django_assert_num_queries(0):
+        response = client.get(aggregates_url(movie.id))
+
+    assert response.data['rating_count'] == 1
+    assert response.data['rating_histogram'][2] == 1
+    assert client.get(aggregates_url(0)).status_code == status.HTTP_404_NOT_FOUND
+
+
+@pytest.mark.django_db
+def test_cache_stats(client: APIClient, movie):
+    """Test cache hits and misses are available for staff."""
+    staff = get_user_model().objects.create_superuser('staff@gmail.com', 'password')
+    client.get(MOVIES_URL)
+    client.get(MOVIES_URL)
+
+    assert client.get(CACHE_STATS_URL).status_code == status.HTTP_401_UNAUTHORIZED
+
+    client.force_authenticate(staff)
+    response = client.get(CACHE_STATS_URL)
+
+    assert response.data == {'hits': 1, 'misses': 1, 'hit_ratio': 0.5}
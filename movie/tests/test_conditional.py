@@ -0,0 +1,90 @@
+import pytest
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from api.models import Movie, Rating
+
+MOVIES_URL = reverse('movie:movie-list')
+RATINGS_URL = reverse('movie:rating-list')
+
+
+def detail_url(movie_id):
+    return reverse('movie:movie-detail', args=[movie_id])
+
+
+@pytest.fixture
+def client():
+    client = APIClient()
+    yield client
+
+
+@pytest.fixture
+def movie():
+    return Movie.objects.create(title='Movie')
+
+
+@pytest.mark.django_db
+def test_detail_not_modified(client: APIClient, movie, django_assert_num_queries):
+    """Test movie detail answers 304 for a matching ETag without queries once cached."""
+    response = client.get(detail_url(movie.id))
+    etag = response['ETag']
+
+    with django_assert_num_queries(0):
+        response = client.get(detail_url(movie.id), HTTP_IF_NONE_MATCH=etag)
+
+    assert response.status_code == status.HTTP_304_NOT_MODIFIED
+    assert not response.content
+
+
+@pytest.mark.django_db
+def test_detail_modified_after_rating(client: APIClient, movie):
+    """Test rating a movie changes its ETag."""
+    etag = client.get(detail_url(movie.id))['ETag']
+    user = get_user_model().objects.create_user('rater@gmail.com')
+    Rating.objects.create(stars=3, movie=movie, user=user)
+    response = client.get(detail_url(movie.id), HTTP_IF_NONE_MATCH=etag)
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response['ETag'] != etag
+
+
+@pytest.mark.django_db
+def test_list_validated_by_etag_only(client: APIClient, movie):
+    """Test movie list has no Last-Modified, deletions wouldn't move it forward."""
+    response = client.get(MOVIES_URL)
+    etag = response['ETag']
+
+    assert not response.has_header('Last-Modified')
+    assert client.get(MOVIES_URL, HTTP_IF_NONE_MATCH=etag).status_code == 304
+
+    Movie.objects.create(title='New Movie')
+    response = client.get(MOVIES_URL, HTTP_IF_NONE_MATCH=etag)
+
+    assert response.status_code == status.HTTP_200_OK
+
+
+@pytest.mark.django_db
+def test_ratings_list_etag_changes_on_delete(client: APIClient, movie):
+    """Test rating list ETag changes when a rating is deleted."""
+    users = [get_user_model().objects.create_user(f'rater{n}@gmail.com') for n in range(2)]
+    ratings = [Rating.objects.create(stars=3, movie=movie, user=user) for user in users]
+    etag = client.get(RATINGS_URL)['ETag']
+
+    assert client.get(RATINGS_URL, HTTP_IF_NONE_MATCH=etag).status_code == 304
+
+    ratings[0].delete()
+
+    assert client.get(RATINGS_URL, HTTP_IF_NONE_MATCH=etag).status_code == 200
+
+
+@pytest.mark.django_db
+def test_ratings_list_version_cached(client: APIClient, movie, django_assert_num_queries):
+    """Test rating list version isn't counted again until ratings change."""
+    etag = client.get(RATINGS_URL)['ETag']
+
+    with django_assert_num_queries(0):
+        response = client.get(RATINGS_URL, HTTP_IF_NONE_MATCH=etag)
+
+    assert response.status_code == status.HTTP_304_NOT_MODIFIED
@@ -0,0 +1,103 @@
+import csv
+import io
+import json
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from api.models import Movie, Rating
+
+MOVIES_EXPORT_URL = reverse('movie:movie-export')
+RATINGS_EXPORT_URL = reverse('movie:rating-export')
+
+
+@pytest.fixture
+def client():
+    client = APIClient()
+    yield client
+
+
+@pytest.fixture
+def ratings():
+    user = get_user_model().objects.create_user('rater@gmail.com')
+    other_user = get_user_model().objects.create_user('other@gmail.com')
+    movie = Movie.objects.create(title='Movie')
+    other_movie = Movie.objects.create(title='Other Movie')
+    return [
+        Rating.objects.create(stars=5, movie=movie, user=user),
+        Rating.objects.create(stars=3, movie=movie, user=other_user),
+        Rating.objects.create(stars=1, movie=other_movie, user=user),
+    ]
+
+
+def content(response):
+    return b''.join(response.streaming_content).decode()
+
+
+@pytest.mark.django_db
+def test_export_ratings_ndjson(client: APIClient, ratings):
+    """Test ratings of a movie are streamed as NDJSON."""
+    movie = ratings[0].movie
+    response = client.get(RATINGS_EXPORT_URL, {'movie': movie.id})
+    rows = [json.loads(line) for line in content(response).splitlines()]
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response['Content-Type'] == 'application/x-ndjson'
+    assert [(row['id'], row['stars']) for row in rows] == [(ratings[0].id, 5), (ratings[1].id, 3)]
+
+
+@pytest.mark.django_db
+def test_export_movies_csv_by_user(client: APIClient, ratings):
+    """Test movies rated by a user are streamed as CSV."""
+    response = client.get(MOVIES_EXPORT_URL, {'output': 'csv', 'user': ratings[0].user.id})
+    rows = list(csv.DictReader(io.StringIO(content(response))))
+
+    assert response['Content-Type'] == 'text/csv'
+    assert [row['title'] for row in rows] == ['Movie', 'Other Movie']
+    assert rows[0]['rating_count'] == '2'
+
+
+@pytest.mark.django_db
+def test_export_changed_since(client: APIClient, ratings):
+    """Test only rows changed since a given time are exported."""
+    since = ratings[1].updated_at
+    Rating.objects.filter(pk=ratings[0].pk).update(updated_at=since.replace(year=2000))
+    response = client.get(RATINGS_EXPORT_URL, {'since': since.isoformat()})
+    ids = [json.loads(line)['id'] for line in content(response).splitlines()]
+
+    assert ids == [ratings[1].id, ratings[2].id]
+
+
+@pytest.mark.django_db
+def test_export_invalid_filter(client: APIClient, ratings):
+    """Test invalid filters are rejected."""
+    response = client.get(RATINGS_EXPORT_URL, {'since': 'yesterday'})
+
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+@pytest.mark.django_db
+def test_export_command(ratings, tmp_path):
+    """Test export command writes all ratings into a file."""
+    output = tmp_path / 'ratings.csv'
+    call_command('export_data', 'ratings', '--output-format', 'csv', '-o', str(output))
+    rows = list(csv.DictReader(output.open()))
+
+    assert [int(row['id']) for row in rows] == [rating.id for rating in ratings]
+
+
+@pytest.mark.django_db
+def test_export_without_server_side_cursors(client: APIClient, ratings, settings, monkeypatch):
+    """Test rows are exported by id ranges when an external pooler is used."""
+    monkeypatch.setitem(connection.settings_dict, 'DISABLE_SERVER_SIDE_CURSORS', True)
+    settings.EXPORT_CHUNK_SIZE = 2
+
+    response = client.get(RATINGS_EXPORT_URL)
+    rows = [json.loads(line) for line in content(response).splitlines()]
+
+    assert [row['id'] for row in rows] == [rating.id for rating in ratings]
@@ -0,0 +1,110 @@
+import pytest
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from api.models import Movie, Rating
+
+MOVIES_URL = reverse('movie:movie-list')
+RATINGS_URL = reverse('movie:rating-list')
+BATCH_URL = reverse('movie:movie-batch')
+
+
+def detail_url(movie_id):
+    return reverse('movie:movie-detail', args=[movie_id])
+
+
+@pytest.fixture
+def client():
+    client = APIClient()
+    yield client
+
+
+@pytest.fixture
+def movies():
+    users = [get_user_model().objects.create_user(f'rater{n}@gmail.com') for n in range(2)]
+    movies = []
+    for number in range(3):
+        movie = Movie.objects.create(title=f'Movie {number}', description='A long plot.')
+        for stars, user in enumerate(users, start=3):
+            Rating.objects.create(stars=stars, movie=movie, user=user)
+        movies.append(movie)
+    return movies
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('params, expected', [
+    ({'fields': 'id,title,poster'}, ['id', 'title', 'poster']),
+    ({'fields': 'title, id'}, ['id', 'title']),
+    ({'exclude': 'description,poster_variants'},
+     ['id', 'title', 'poster', 'poster_status', 'average_rating', 'rating_count']),
+    ({'fields': 'id,title,description', 'exclude': 'description'}, ['id', 'title']),
+])
+def test_list_sparse_fieldset(client: APIClient, movies, params, expected):
+    """Test movie list emits only requested fields, in the serializer order."""
+    response = client.get(MOVIES_URL, params)
+
+    assert response.status_code == status.HTTP_200_OK
+    assert list(response.data['results'][0]) == expected
+
+
+@pytest.mark.django_db
+def test_list_defers_left_out_columns(client: APIClient, movies, django_assert_num_queries):
+    """Test the description column isn't read when its field is left out."""
+    with django_assert_num_queries(2) as captured:
+        response = client.get(MOVIES_URL, {'fields': 'id,title'})
+
+    assert response.status_code == status.HTTP_200_OK
+    assert 'description' not in captured.captured_queries[-1]['sql']
+
+
+@pytest.mark.django_db
+def test_detail_without_ratings_skips_query(client: APIClient, movies,
+                                            django_assert_num_queries):
+    """Test movie detail doesn't read latest ratings when they aren't requested."""
+    with django_assert_num_queries(2):
+        response = client.get(detail_url(movies[0].pk), {'exclude': 'ratings'})
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.data['description'] == 'A long plot.'
+    assert 'ratings' not in response.data
+
+
+@pytest.mark.django_db
+def test_unknown_field(client: APIClient, movies):
+    """Test unknown field names are rejected."""
+    response = client.get(MOVIES_URL, {'fields': 'id,plot'})
+
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert 'plot' in response.data['fields'][0]
+
+
+@pytest.mark.django_db
+def test_ratings_sparse_fieldset(client: APIClient, movies):
+    """Test rating endpoints accept fieldsets too."""
+    response = client.get(RATINGS_URL, {'fields': 'id,stars'})
+
+    assert response.status_code == status.HTTP_200_OK
+    assert list(response.data['results'][0]) == ['id', 'stars']
+
+
+@pytest.mark.django_db
+def test_batch_caches_fieldsets_apart(client: APIClient, movies):
+    """Test batch movies cached for one fieldset aren't served for another."""
+    params = {'ids': f'{movies[0].pk},{movies[1].pk}'}
+    sparse = client.get(BATCH_URL, {**params, 'fields': 'title'})
+    full = client.get(BATCH_URL, params)
+
+    assert sparse.data['results'] == [{'title': 'Movie 0'}, {'title': 'Movie 1'}]
+    assert full.data['results'][0]['description'] == 'A long plot.'
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('fields', ['', ' , '])
+def test_empty_fields(client: APIClient, movies, fields):
+    """Test an empty field list is rejected instead of returning empty objects."""
+    response = client.get(MOVIES_URL, {'fields': fields})
+
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert 'fields' in response.data
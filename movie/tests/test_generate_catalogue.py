@@ -0,0 +1,54 @@
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.management import CommandError, call_command
+from django.db.models import Count
+
+from api.models import Movie, Rating
+
+ARGS = ('--movies', 30, '--users', 20, '--ratings', 200, '--batch-size', 50)
+
+
+@pytest.mark.django_db
+def test_generate_catalogue():
+    """Test movies, users and unique ratings are generated with stored aggregates."""
+    call_command('generate_catalogue', *ARGS)
+
+    assert Movie.objects.count() == 30
+    assert get_user_model().objects.filter(email__startswith='bench').count() == 20
+    assert Rating.objects.count() == 200
+    movie = Movie.objects.order_by('-rating_count').first()
+    assert movie.rating_count == movie.ratings.count()
+    call_command('rebuild_rating_aggregates', '--check')
+
+
+@pytest.mark.django_db
+def test_generated_ratings_are_skewed():
+    """Test popular movies get most of the Zipf distributed ratings."""
+    call_command('generate_catalogue', *ARGS, '--users', 1000, '--zipf', 1.5)
+
+    counts = sorted(
+        Movie.objects.annotate(count=Count('ratings')).values_list('count', flat=True),
+        reverse=True,
+    )
+    assert sum(counts[:6]) > sum(counts[6:])
+
+
+@pytest.mark.django_db
+def test_generate_catalogue_is_reproducible():
+    """Test the same seed generates the same ratings."""
+    call_command('generate_catalogue', *ARGS, '--prefix', 'first')
+    first = list(Rating.objects.order_by('id').values_list('stars', flat=True))
+    Rating.objects.all().delete()
+
+    call_command('generate_catalogue', *ARGS, '--prefix', 'second')
+
+    assert list(Rating.objects.order_by('id').values_list('stars', flat=True)) == first
+
+
+@pytest.mark.django_db
+def test_generate_catalogue_twice_with_prefix():
+    """Test generating users with an existing prefix fails."""
+    call_command('generate_catalogue', *ARGS)
+
+    with pytest.raises(CommandError):
+        call_command('generate_catalogue', *ARGS)
@@ -0,0 +1,141 @@
+import pytest
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from api.models import Movie, Rating
+
+MOVIES_URL = reverse('movie:movie-list')
+RATINGS_URL = reverse('movie:rating-list')
+
+
+def detail_url(movie_id):
+    return reverse('movie:movie-detail', args=[movie_id])
+
+
+def movie_ratings_url(movie_id):
+    return reverse('movie:movie-movie-ratings', args=[movie_id])
+
+
+@pytest.fixture
+def client():
+    client = APIClient()
+    yield client
+
+
+@pytest.fixture
+def users():
+    return [
+        get_user_model().objects.create_user(f'user{number}@gmail.com')
+        for number in range(2)
+    ]
+
+
+def create_movies(count, users):
+    """Create rated movies."""
+    movies = []
+    for number in range(count):
+        movie = Movie.objects.create(title=f'Movie {number}')
+        for stars, user in enumerate(users, start=3):
+            Rating.objects.create(stars=stars, movie=movie, user=user)
+        movies.append(movie)
+    return movies
+
+
+class TestMovieApi:
+    """Test movie api."""
+
+    @pytest.mark.django_db
+    @pytest.mark.parametrize('movies_count', [1, 3, 10])
+    def test_list_movies_query_count(self, client: APIClient, users,
+                                     django_assert_num_queries, movies_count):
+        """Test movie list runs the same number of queries for any number of movies.
+
+        One query for the conditional GET version and one for movies.
+        """
+        create_movies(movies_count, users)
+
+        with django_assert_num_queries(2):
+            response = client.get(MOVIES_URL)
+
+        results = response.data['results']
+        assert response.status_code == status.HTTP_200_OK
+        assert len(results) == movies_count
+        assert results[0]['average_rating'] == 3.5
+        assert results[0]['rating_count'] == 2
+        assert 'ratings' not in results[0]
+
+    @pytest.mark.django_db
+    def test_retrieve_movie_query_count(self, client: APIClient, users,
+                                        django_assert_num_queries):
+        """Test movie detail fetches version, movie and ratings in one query each."""
+        movie, = create_movies(1, users)
+
+        with django_assert_num_queries(3):
+            response = client.get(detail_url(movie.id))
+
+        assert response.status_code == status.HTTP_200_OK
+        assert [rating['stars'] for rating in response.data['ratings']] == [4, 3]
+
+    @pytest.mark.django_db
+    def test_retrieve_movie_caps_ratings(self, client: APIClient, users, settings):
+        """Test movie detail embeds only the latest ratings."""
+        settings.MOVIE_DETAIL_RATINGS_LIMIT = 1
+        movie, = create_movies(1, users)
+        response = client.get(detail_url(movie.id))
+
+        assert [rating['stars'] for rating in response.data['ratings']] == [4]
+        assert response.data['rating_count'] == 2
+
+    @pytest.mark.django_db
+    def test_list_movie_ratings_paginated(self, client: APIClient, users):
+        """Test all ratings of a movie are available page by page."""
+        movie, = create_movies(1, users)
+        response = client.get(movie_ratings_url(movie.id), {'page_size': 1})
+
+        assert response.status_code == status.HTTP_200_OK
+        assert [rating['stars'] for rating in response.data['results']] == [3]
+
+        response = client.get(response.data['next'])
+
+        assert [rating['stars'] for rating in response.data['results']] == [4]
+        assert response.data['next'] is None
+
+
+class TestPagination:
+    """Test movie and rating list pagination."""
+
+    @pytest.mark.django_db
+    def test_cursor_pagination_follows_ids(self, client: APIClient, users):
+        """Test cursor pagination walks through all movies in id order."""
+        movies = create_movies(5, users)
+        ids = []
+        url = f'{MOVIES_URL}?page_size=2'
+        while url:
+            response = client.get(url)
+            assert 'count' not in response.data
+            ids.extend(movie['id'] for movie in response.data['results'])
+            url = response.data['next']
+
+        assert ids == [movie.id for movie in movies]
+
+    @pytest.mark.django_db
+    def test_page_number_pagination(self, client: APIClient, users):
+        """Test requesting a page number switches to page number pagination."""
+        movies = create_movies(5, users)
+        response = client.get(MOVIES_URL, {'page': 2, 'page_size': 2})
+
+        assert response.data['count'] == 5
+        assert [movie['id'] for movie in response.data['results']] == [
+            movie.id for movie in movies[2:4]
+        ]
+
+    @pytest.mark.django_db
+    def test_ratings_paginated(self, client: APIClient, users):
+        """Test rating list is paginated."""
+        create_movies(3, users)
+        response = client.get(RATINGS_URL, {'page_size': 4})
+
+        assert len(response.data['results']) == 4
+        assert response.data['next']
@@ -0,0 +1,112 @@
+import io
+
+import pytest
+from django.core.management import call_command
+from django.urls import reverse
+from PIL import Image
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from api.models import Movie
+from movie.posters import save_poster
+
+
+def upload_url(movie_id):
+    return reverse('movie:movie-upload-image', args=[movie_id])
+
+
+def detail_url(movie_id):
+    return reverse('movie:movie-detail', args=[movie_id])
+
+
+@pytest.fixture
+def client():
+    client = APIClient()
+    yield client
+
+
+@pytest.fixture(autouse=True)
+def media(settings, tmp_path):
+    settings.MEDIA_ROOT = str(tmp_path)
+    settings.TASK_BACKEND = 'api.tasks.ImmediateBackend'
+    settings.TASK_RETRY_DELAY = 0
+    yield tmp_path
+
+
+@pytest.fixture
+def movie():
+    return Movie.objects.create(title='Movie')
+
+
+def image_file(size=(1200, 1800)):
+    file = io.BytesIO()
+    Image.new('RGB', size, color='red').save(file, 'PNG')
+    file.name = 'poster.png'
+    file.seek(0)
+    return file
+
+
+@pytest.mark.django_db(transaction=True)
+def test_upload_poster_builds_variants(client: APIClient, movie, media):
+    """Test uploaded poster is accepted and resized variants are exposed."""
+    response = client.post(upload_url(movie.id), {'poster': image_file()}, format='multipart')
+
+    assert response.status_code == status.HTTP_202_ACCEPTED
+    assert response.data['poster_status'] == Movie.POSTER_PENDING
+
+    response = client.get(detail_url(movie.id))
+    variants = response.data['poster_variants']
+
+    assert response.data['poster_status'] == Movie.POSTER_READY
+    assert {'thumbnail', 'list', 'detail'} <= set(variants)
+    assert variants['thumbnail'].startswith('http://testserver/media/')
+
+    movie.refresh_from_db()
+    with Image.open(media / movie.poster_variants['thumbnail']) as thumbnail:
+        assert thumbnail.size == (150, 225)
+        assert thumbnail.format == 'JPEG'
+
+
+@pytest.mark.django_db(transaction=True)
+def test_upload_passed_to_task_by_name(client: APIClient, movie, media, monkeypatch):
+    """Test tasks get the storage name of an upload, not its content."""
+    calls = []
+    monkeypatch.setattr(save_poster, 'delay', lambda *args: calls.append(args))
+    response = client.post(upload_url(movie.id), {'poster': image_file()}, format='multipart')
+    movie.refresh_from_db()
+
+    assert response.status_code == status.HTTP_202_ACCEPTED
+    assert not movie.poster
+    movie_id, poster_name = calls[0]
+    assert movie_id == movie.id
+    assert (media / poster_name).is_file()
+
+    save_poster.run(*calls[0])
+    movie.refresh_from_db()
+
+    assert movie.poster.name == poster_name
+    assert movie.poster_status == Movie.POSTER_READY
+
+
+@pytest.mark.django_db(transaction=True)
+def test_broken_poster_marked_failed(client: APIClient, movie, media, monkeypatch):
+    """Test poster failing all retries is marked failed with the error."""
+    calls = []
+
+    def fail(poster_name):
+        calls.append(poster_name)
+        raise OSError('cannot identify image file')
+
+    monkeypatch.setattr('movie.posters.build_variants', fail)
+    client.post(upload_url(movie.id), {'poster': image_file()}, format='multipart')
+    movie.refresh_from_db()
+
+    assert len(calls) == 4
+    assert movie.poster_status == Movie.POSTER_FAILED
+    assert 'cannot identify image file' in movie.poster_error
+
+    monkeypatch.undo()
+    call_command('process_posters')
+    movie.refresh_from_db()
+
+    assert movie.poster_status == Movie.POSTER_READY
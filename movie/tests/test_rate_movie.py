@@ -0,0 +1,115 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from api.models import Movie, Rating
+
+
+def rate_url(movie_id):
+    return reverse('movie:movie-rate-movie', args=[movie_id])
+
+
+@pytest.fixture
+def client():
+    client = APIClient()
+    yield client
+
+
+@pytest.fixture
+def rater():
+    return get_user_model().objects.create_user('rater@gmail.com', 'password')
+
+
+@pytest.fixture
+def movie():
+    return Movie.objects.create(title='Movie')
+
+
+@pytest.mark.django_db
+def test_first_rating_is_created(client: APIClient, rater, movie):
+    """Test rating a movie for the first time creates the rating."""
+    client.force_authenticate(rater)
+
+    response = client.post(rate_url(movie.pk), {'stars': 4})
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.data['stars'] == 4
+    assert Rating.objects.get(movie=movie, user=rater).pk == response.data['id']
+    movie.refresh_from_db()
+    assert (movie.rating_count, movie.rating_sum, movie.stars_4_count) == (1, 4, 1)
+
+
+@pytest.mark.django_db
+def test_rating_is_updated(client: APIClient, rater, movie):
+    """Test rating a movie again updates the rating and aggregates."""
+    rating = Rating.objects.create(stars=2, movie=movie, user=rater)
+    client.force_authenticate(rater)
+
+    response = client.post(rate_url(movie.pk), {'stars': 5})
+
+    assert response.data['id'] == rating.pk
+    movie.refresh_from_db()
+    assert (movie.rating_count, movie.rating_sum) == (1, 5)
+    assert (movie.stars_2_count, movie.stars_5_count) == (0, 1)
+
+
+@pytest.mark.django_db
+def test_rating_shows_in_cached_detail(client: APIClient, rater, movie):
+    """Test cached movie detail is invalidated after rating."""
+    client.get(reverse('movie:movie-detail', args=[movie.pk]))
+    client.force_authenticate(rater)
+    client.post(rate_url(movie.pk), {'stars': 3})
+
+    response = client.get(reverse('movie:movie-detail', args=[movie.pk]))
+
+    assert response.data['rating_count'] == 1
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('stars', [0, 6, 'many'])
+def test_invalid_rating(client: APIClient, rater, movie, stars):
+    """Test invalid stars are rejected without writing a rating."""
+    client.force_authenticate(rater)
+
+    response = client.post(rate_url(movie.pk), {'stars': stars})
+
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert not Rating.objects.exists()
+
+
+@pytest.mark.django_db
+def test_rating_requires_authentication(client: APIClient, movie):
+    """Test anonymous users can't rate movies."""
+    response = client.post(rate_url(movie.pk), {'stars': 3})
+
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+
+@pytest.mark.skipif(
+    not connection.features.has_select_for_update,
+    reason='Parallel writers need row locks, SQLite locks the whole database.',
+)
+@pytest.mark.django_db(transaction=True)
+def test_concurrent_ratings(rater, movie):
+    """Test parallel ratings of the same movie by one user leave one rating."""
+    def rate(stars):
+        client = APIClient()
+        client.force_authenticate(rater)
+        try:
+            return client.post(rate_url(movie.pk), {'stars': stars}).status_code
+        finally:
+            connection.close()
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        codes = list(executor.map(rate, [1, 2, 3, 4, 5] * 4))
+
+    assert codes == [status.HTTP_200_OK] * 20
+    rating = Rating.objects.get(movie=movie, user=rater)
+    movie.refresh_from_db()
+    assert (movie.rating_count, movie.rating_sum) == (1, rating.stars)
+    assert getattr(movie, f'stars_{rating.stars}_count') == 1
@@ -0,0 +1,97 @@
+import pytest
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from api.models import Movie, Rating
+from movie.search import InvertedIndex
+
+SEARCH_URL = reverse('movie:movie-search')
+
+
+@pytest.fixture
+def client():
+    client = APIClient()
+    yield client
+
+
+@pytest.fixture
+def movies():
+    return [
+        Movie.objects.create(title='The Matrix', description='A hacker learns about reality.'),
+        Movie.objects.create(title='The Matrix Reloaded', description='Neo fights agents.'),
+        Movie.objects.create(title='Hackers', description='Teenage hackers and a virus.'),
+        Movie.objects.create(title='Alien', description='A crew meets a deadly creature.'),
+    ]
+
+
+def titles(response):
+    return [movie['title'] for movie in response.data['results']]
+
+
+def test_inverted_index_ranks_title_matches_first():
+    """Test words in titles rank higher than in descriptions."""
+    index = InvertedIndex([
+        (1, 'Space Story', 'A story about hackers.'),
+        (2, 'Hackers', 'A story.'),
+        (3, 'Cooking', 'Food.'),
+    ])
+
+    assert index.search('hackers') == [2, 1]
+    assert index.search('hackers story') == [2, 1]
+    assert index.search('hackers food') == []
+    assert index.prefix('SPA') == [1]
+
+
+@pytest.mark.django_db
+def test_full_text_search(client: APIClient, movies):
+    """Test full-text search over titles and descriptions."""
+    response = client.get(SEARCH_URL, {'q': 'matrix'})
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.data['count'] == 2
+    assert titles(response) == ['The Matrix', 'The Matrix Reloaded']
+
+
+@pytest.mark.django_db
+def test_prefix_search_paginated(client: APIClient, movies):
+    """Test title autocomplete returns shortest titles first, page by page."""
+    response = client.get(SEARCH_URL, {'q': 'the m', 'mode': 'prefix', 'page_size': 1})
+
+    assert titles(response) == ['The Matrix']
+    assert response.data['next']
+
+    response = client.get(response.data['next'])
+
+    assert titles(response) == ['The Matrix Reloaded']
+
+
+@pytest.mark.django_db
+def test_search_ordered_by_rating(client: APIClient, movies):
+    """Test search results can be sorted by rating."""
+    user = get_user_model().objects.create_user('rater@gmail.com')
+    Rating.objects.create(stars=5, movie=movies[1], user=user)
+    response = client.get(SEARCH_URL, {'q': 'matrix', 'ordering': 'rating'})
+
+    assert titles(response) == ['The Matrix Reloaded', 'The Matrix']
+
+
+@pytest.mark.django_db
+def test_search_index_follows_changes(client: APIClient, movies):
+    """Test new and renamed movies are found."""
+    client.get(SEARCH_URL, {'q': 'alien'})
+    movies[3].title = 'Aliens'
+    movies[3].save()
+    response = client.get(SEARCH_URL, {'q': 'aliens'})
+
+    assert titles(response) == ['Aliens']
+
+
+@pytest.mark.django_db
+def test_search_requires_query(client: APIClient):
+    """Test search without a query is rejected."""
+    response = client.get(SEARCH_URL, {'mode': 'fuzzy'})
+
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert set(response.data) == {'q', 'mode'}
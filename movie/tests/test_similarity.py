@@ -0,0 +1,152 @@
+import numpy as np
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.db.models import QuerySet
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from api.models import Movie, MovieSimilarity, Rating
+from movie.similarity import load_rating_matrix, normalize_columns
+
+
+def similar_url(movie_id):
+    return reverse('movie:movie-similar', args=[movie_id])
+
+
+@pytest.fixture
+def client():
+    client = APIClient()
+    yield client
+
+
+@pytest.fixture
+def movies():
+    """Create movies where Alien and Aliens are rated alike, Amelie differently."""
+    users = [get_user_model().objects.create_user(f'rater{n}@gmail.com') for n in range(4)]
+    ratings = {
+        'Alien': [5, 4, 5, 1],
+        'Aliens': [5, 5, 4, 1],
+        'Amelie': [1, 2, 1, 5],
+        'Unrated': [],
+    }
+    movies = {}
+    for title, stars in ratings.items():
+        movies[title] = Movie.objects.create(title=title)
+        for user, value in zip(users, stars):
+            Rating.objects.create(stars=value, movie=movies[title], user=user)
+    return movies
+
+
+@pytest.mark.django_db
+def test_rating_matrix(movies):
+    """Test ratings are loaded into a users x movies matrix in chunks."""
+    matrix, movie_ids = load_rating_matrix(chunk_size=5)
+
+    assert matrix.shape == (4, 3)
+    assert movie_ids.tolist() == [movies[title].pk for title in ('Alien', 'Aliens', 'Amelie')]
+    assert matrix[:, 0].toarray().ravel().tolist() == [5, 4, 5, 1]
+
+
+@pytest.mark.django_db
+def test_rating_matrix_without_server_side_cursors(movies, monkeypatch):
+    """Test ratings are read by id ranges when an external pooler is used."""
+    expected, _ = load_rating_matrix()
+    monkeypatch.setitem(connection.settings_dict, 'DISABLE_SERVER_SIDE_CURSORS', True)
+    monkeypatch.setattr(QuerySet, 'iterator', None)
+
+    matrix, _ = load_rating_matrix(chunk_size=5)
+
+    assert (matrix != expected).nnz == 0
+
+
+@pytest.mark.django_db
+def test_normalized_movies_have_unit_length(movies):
+    """Test movie vectors are scaled to unit length for cosine similarity."""
+    matrix, _ = load_rating_matrix()
+
+    items = normalize_columns(matrix, 'adjusted-cosine')
+
+    assert np.allclose(np.asarray(items.multiply(items).sum(axis=1)).ravel(), 1)
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('metric', ['cosine', 'adjusted-cosine'])
+def test_build_similarities(movies, metric):
+    """Test the most similar movie is stored first and the movie itself is left out."""
+    call_command('build_similarities', '--metric', metric, '--top-k', 2)
+
+    neighbours = list(
+        MovieSimilarity.objects.filter(movie=movies['Alien'])
+        .order_by('-score').values_list('similar_movie__title', 'score'),
+    )
+    assert neighbours[0][0] == 'Aliens'
+    assert 0 < neighbours[0][1] <= 1
+    assert 'Alien' not in [title for title, _ in neighbours]
+    assert not MovieSimilarity.objects.filter(movie=movies['Unrated']).exists()
+
+
+@pytest.mark.django_db
+def test_build_similarities_invalidates_once(movies, monkeypatch):
+    """Test movie caches are dropped in one call after all blocks are stored."""
+    calls = []
+    monkeypatch.setattr('movie.similarity.invalidate_movies', calls.append)
+    call_command('build_similarities', '--block-size', 1)
+
+    assert len(calls) == 1
+    assert sorted(calls[0]) == sorted(movie.pk for title, movie in movies.items()
+                                      if title != 'Unrated')
+
+
+@pytest.mark.django_db
+def test_build_similarities_since(movies):
+    """Test only movies changed since a date and their neighbours are refreshed."""
+    call_command('build_similarities')
+    Movie.objects.update(updated_at='2000-01-01T00:00:00Z')
+    MovieSimilarity.objects.filter(movie=movies['Amelie']).update(score=0.01)
+    MovieSimilarity.objects.filter(movie=movies['Alien']).update(score=0.01)
+
+    Rating.objects.filter(movie=movies['Aliens']).update(stars=3)
+    Movie.objects.filter(pk=movies['Aliens'].pk).update(updated_at='2020-01-02T00:00:00Z')
+    call_command('build_similarities', '--since', '2020-01-01')
+
+    assert MovieSimilarity.objects.filter(movie=movies['Alien'], score=0.01).count() == 0
+    assert MovieSimilarity.objects.filter(movie=movies['Amelie'], score=0.01).count() == 0
+
+
+@pytest.mark.django_db
+def test_build_similarities_since_finds_new_neighbours(movies):
+    """Test movies sharing raters with a changed movie get it as a new neighbour."""
+    call_command('build_similarities')
+    Movie.objects.update(updated_at='2000-01-01T00:00:00Z')
+
+    rater = Rating.objects.filter(movie=movies['Alien']).first().user
+    Rating.objects.create(stars=5, movie=movies['Unrated'], user=rater)
+    Movie.objects.filter(pk=movies['Unrated'].pk).update(updated_at='2020-01-02T00:00:00Z')
+    call_command('build_similarities', '--since', '2020-01-01')
+
+    assert MovieSimilarity.objects.filter(
+        movie=movies['Alien'], similar_movie=movies['Unrated'],
+    ).exists()
+
+
+@pytest.mark.django_db
+def test_similar_movies(client: APIClient, movies):
+    """Test similar movies are listed by similarity."""
+    call_command('build_similarities')
+
+    response = client.get(similar_url(movies['Alien'].pk), {'limit': 1})
+
+    assert response.status_code == status.HTTP_200_OK
+    assert [movie['title'] for movie in response.data['results']] == ['Aliens']
+    assert response.data['results'][0]['similarity'] > 0.9
+
+
+@pytest.mark.django_db
+def test_similar_movies_not_found(client: APIClient):
+    """Test similar movies of a missing movie are not found."""
+    response = client.get(similar_url(404))
+
+    assert response.status_code == status.HTTP_404_NOT_FOUND
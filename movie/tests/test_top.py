@@ -0,0 +1,80 @@
+import pytest
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from api.models import Movie, Rating
+
+TOP_URL = reverse('movie:movie-top')
+
+
+@pytest.fixture
+def client():
+    client = APIClient()
+    yield client
+
+
+@pytest.fixture
+def movies():
+    """Create movies rated by three users.
+
+    Single is rated 5 once, Popular 4, 4, 5 and Bad 1, 2.
+    """
+    users = [get_user_model().objects.create_user(f'rater{n}@gmail.com') for n in range(3)]
+    ratings = {'Single': [5], 'Popular': [4, 4, 5], 'Bad': [1, 2], 'Unrated': []}
+    movies = {}
+    for title, stars in ratings.items():
+        movies[title] = Movie.objects.create(title=title)
+        for user, value in zip(users, stars):
+            Rating.objects.create(stars=value, movie=movies[title], user=user)
+    return movies
+
+
+def titles(response):
+    return [movie['title'] for movie in response.data['results']]
+
+
+@pytest.mark.django_db
+def test_top_by_average(client: APIClient, movies):
+    """Test movies are ranked by average, unrated movies are left out."""
+    response = client.get(TOP_URL, {'by': 'average'})
+
+    assert response.status_code == status.HTTP_200_OK
+    assert titles(response) == ['Single', 'Popular', 'Bad']
+    assert response.data['results'][1]['average_rating'] == pytest.approx(13 / 3)
+
+
+@pytest.mark.django_db
+def test_top_by_bayesian_score(client: APIClient, movies):
+    """Test bayesian ranking prefers movies with more good ratings."""
+    response = client.get(TOP_URL, {'limit': 2})
+
+    assert titles(response) == ['Popular', 'Single']
+    assert response.data['results'][0]['bayesian_score'] == pytest.approx((30 + 13) / 13)
+
+
+@pytest.mark.django_db
+def test_top_by_count_with_min_votes(client: APIClient, movies):
+    """Test ranking by count keeps only movies with enough ratings."""
+    response = client.get(TOP_URL, {'by': 'count', 'min_votes': 2})
+
+    assert titles(response) == ['Popular', 'Bad']
+
+
+@pytest.mark.django_db
+def test_top_follows_rating_changes(client: APIClient, movies):
+    """Test scores are updated incrementally when ratings change."""
+    client.get(TOP_URL, {'by': 'average'})
+    Rating.objects.filter(movie=movies['Single']).delete()
+    response = client.get(TOP_URL, {'by': 'average'})
+
+    assert titles(response) == ['Popular', 'Bad']
+
+
+@pytest.mark.django_db
+def test_top_invalid_ranking(client: APIClient):
+    """Test unknown ranking is rejected."""
+    response = client.get(TOP_URL, {'by': 'title'})
+
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
@@ -1,7 +1,7 @@
 from django.urls import include, path
 from rest_framework.routers import DefaultRouter
 
-from movie import views
+from movie import async_views, views
 
 router = DefaultRouter()
 router.register('movies', views.MovieViewSet)
@@ -10,5 +10,13 @@ router.register('ratings', views.RatingViewSet)
 app_name = 'movie'
 
 urlpatterns = [
+    path('cache-stats/', views.CacheStatsView.as_view(), name='cache-stats'),
+    path('async/movies/', async_views.movie_list, name='async-movie-list'),
+    path('async/movies/<int:pk>/', async_views.movie_detail, name='async-movie-detail'),
+    path(
+        'async/movies/<int:pk>/aggregates/',
+        async_views.movie_aggregates,
+        name='async-movie-aggregates',
+    ),
     path('', include(router.urls)),
 ]
@@ -1,20 +1,95 @@
-from rest_framework import status, viewsets
-from rest_framework.authentication import TokenAuthentication
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from rest_framework import permissions, status, viewsets
 from rest_framework.decorators import action
 from rest_framework.response import Response
+from rest_framework.views import APIView
 
 from api.models import Movie, Rating
+from api.parsers import FastJSONParser
+from api.routers import use_replicas
+from api.throttling import RatingWriteThrottle
+from movie.bulk import import_ratings
+from movie.cache import (CachedResponseMixin, cached_version, get_aggregates, get_cache,
+                         get_stats, get_versions, invalidate_movies, record, response_key)
+from movie.conditional import ConditionalGetMixin
+from movie.export import ExportMixin
+from movie.fieldsets import SparseFieldsetMixin
+from movie.filters import MovieFilter, MovieOrderingFilter
+from movie.pagination import PaginationModeMixin
+from movie.parsers import NDJSONParser
+from movie.posters import schedule_poster_upload
+from movie.search import SEARCH_MODES, SEARCH_ORDERINGS, search_movies
 from movie.serializers import (MovieDetailSerializer, MovieImageSerializer,
-                               MovieRatingSerializer, MovieSerializer,
-                               RatingSerializer)
+                               MovieRankingSerializer, MovieRatingSerializer,
+                               MovieSerializer, RatingSerializer, SimilarMovieSerializer)
 
 
-class MovieViewSet(viewsets.ModelViewSet):
+# Ranking name: ordering served by a movie index.
+RANKINGS = {
+    'bayesian': ('-bayesian_score', 'id'),
+    'average': ('-rating_average', 'id'),
+    'count': ('-rating_count', 'id'),
+}
+TOP_MOVIES_MAX_LIMIT = 100
+BATCH_MAX_IDS = 200
+# Large movie columns left unread when their fields aren't requested.
+DEFERRABLE_MOVIE_FIELDS = ('description', 'poster_variants')
+
+
+class MovieViewSet(SparseFieldsetMixin, ConditionalGetMixin, CachedResponseMixin, ExportMixin,
+                   PaginationModeMixin, viewsets.ModelViewSet):
     """Manage movies viewset."""
 
-    queryset = Movie.objects.all()
+    queryset = Movie.objects.order_by('id')
     serializer_class = MovieSerializer
-    authentication_classes = (TokenAuthentication, )
+    filter_backends = (MovieFilter, MovieOrderingFilter)
+    export_kind = 'movies'
+    page_pagination_actions = ('search',)
+    fieldset_actions = ('list', 'retrieve', 'search', 'batch', 'top', 'similar', 'movie_ratings')
+
+    def get_queryset(self):
+        """Leave out columns of fields left out by ?fields= or ?exclude=."""
+        queryset = super().get_queryset()
+        if self.action in ('list', 'retrieve', 'search', 'batch'):
+            deferred = [name for name in DEFERRABLE_MOVIE_FIELDS if not self.wants_field(name)]
+            if deferred:
+                queryset = queryset.defer(*deferred)
+
+        return queryset
+
+    def get_collection_version(self):
+        """Cache conditional GET version of the movie list until movies change."""
+        version, _ = get_versions()
+        return cached_version(
+            f'movies:list-version:{version}', super().get_collection_version,
+        )
+
+    def get_object_version(self, pk):
+        """Cache conditional GET version of a movie until it changes."""
+        _, versions = get_versions([pk])
+        return cached_version(
+            f'movies:detail-version:{pk}:{versions[pk]}',
+            lambda: super(MovieViewSet, self).get_object_version(pk),
+        )
+
+    def save_with_poster(self, serializer):
+        """Save a movie, leaving a new poster to be stored in the background."""
+        poster = serializer.validated_data.get('poster')
+        if poster:
+            del serializer.validated_data['poster']
+        movie = serializer.save()
+        if poster:
+            schedule_poster_upload(movie, poster)
+
+    def perform_create(self, serializer):
+        """Create a movie and store and process its poster in the background."""
+        self.save_with_poster(serializer)
+
+    def perform_update(self, serializer):
+        """Update a movie and store and process a new poster in the background."""
+        self.save_with_poster(serializer)
 
     def get_serializer_class(self):
         """Retrieve appropriate serializer class."""
@@ -24,12 +99,18 @@ class MovieViewSet(viewsets.ModelViewSet):
             return MovieImageSerializer
         elif self.action == 'rate_movie':
             return MovieRatingSerializer
+        elif self.action == 'movie_ratings':
+            return RatingSerializer
+        elif self.action == 'top':
+            return MovieRankingSerializer
+        elif self.action == 'similar':
+            return SimilarMovieSerializer
 
         return self.serializer_class
 
     @action(methods=['POST'], detail=True, url_path='upload-image')
     def upload_image(self, request, pk=None):
-        """Upload cover for a movie."""
+        """Upload cover for a movie, variants are made in the background."""
         movie = self.get_object()
         serializer = self.get_serializer(
             movie,
@@ -37,43 +118,272 @@ class MovieViewSet(viewsets.ModelViewSet):
         )
 
         if serializer.is_valid():
-            serializer.save()
+            self.perform_update(serializer)
             return Response(
                 serializer.data,
-                status=status.HTTP_200_OK,
+                status=status.HTTP_202_ACCEPTED,
             )
         return Response(
             serializer.errors,
             status=status.HTTP_400_BAD_REQUEST,
         )
 
-    @action(methods=['POST'], detail=True, url_path='rate-movie')
-    def rate_movie(self, request, pk=None):
-        """Rate a movie."""
+    @action(methods=['GET'], detail=True, url_path='ratings')
+    def movie_ratings(self, request, pk=None):
+        """List all ratings of a movie page by page."""
         movie = self.get_object()
-        user = request.user
-        rating = Rating.objects.get(movie=movie.id, user=user.id)
+        page = self.paginate_queryset(Rating.objects.filter(movie=movie))
+        serializer = self.get_serializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
 
-        serializer = self.get_serializer(
-            rating,
-            data=request.data,
+    @action(methods=['GET'], detail=True, url_path='aggregates')
+    def aggregates(self, request, pk=None):
+        """Return cached rating aggregates of a movie."""
+        try:
+            aggregates = get_aggregates([int(pk)])
+        except ValueError:
+            aggregates = {}
+        if not aggregates:
+            return Response(status=status.HTTP_404_NOT_FOUND)
+
+        return Response(aggregates[int(pk)], status=status.HTTP_200_OK)
+
+    @action(methods=['GET'], detail=False, url_path='batch')
+    def batch(self, request):
+        """Return many movies by ids at once, reporting ids which don't exist.
+
+        Movies are cached one by one, so cached movies are read with one
+        cache call and the rest with one query.
+        """
+        try:
+            movie_ids = [
+                int(value)
+                for param in request.query_params.getlist('ids')
+                for value in param.split(',') if value.strip()
+            ]
+        except ValueError:
+            return Response(
+                {'ids': ['Provide comma separated movie ids.']},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        movie_ids = list(dict.fromkeys(movie_ids))
+        if not movie_ids or len(movie_ids) > BATCH_MAX_IDS:
+            return Response(
+                {'ids': [f'Provide from 1 to {BATCH_MAX_IDS} movie ids.']},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        _, versions = get_versions(movie_ids)
+        host = request.get_host()
+        fieldset = self.get_fieldset_key()
+        keys = {pk: f'movies:item:{pk}:{versions[pk]}:{host}:{fieldset}' for pk in movie_ids}
+        cache = get_cache()
+        cached = cache.get_many(keys.values())
+        movies = {pk: cached[key] for pk, key in keys.items() if key in cached}
+        record('hits', len(movies))
+
+        missing = [pk for pk in movie_ids if pk not in movies]
+        if missing:
+            record('misses', len(missing))
+            with use_replicas(False):
+                found = self.get_queryset().in_bulk(missing)
+                serializer = self.get_serializer(list(found.values()), many=True)
+                built = dict(zip(found, serializer.data))
+            cache.set_many(
+                {keys[pk]: movie for pk, movie in built.items()},
+                timeout=settings.MOVIE_CACHE_TIMEOUT,
+            )
+            movies.update(built)
+
+        return Response(
+            {
+                'results': [movies[pk] for pk in movie_ids if pk in movies],
+                'not_found': [pk for pk in movie_ids if pk not in movies],
+            },
+            status=status.HTTP_200_OK,
         )
-        if serializer.is_valid():
-            serializer.save()
+
+    @action(methods=['GET'], detail=False, url_path='top')
+    def top(self, request):
+        """List best movies by average, bayesian score or number of ratings.
+
+        Scores are stored on movies and indexed, so the ranking is read from
+        an index instead of sorting all movies.
+        """
+        params = request.query_params
+        by = params.get('by', 'bayesian')
+        if by not in RANKINGS:
             return Response(
-                serializer.data,
-                status=status.HTTP_200_OK,
+                {'by': [f'Choose one of: {", ".join(RANKINGS)}.']},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        try:
+            limit = min(max(int(params.get('limit', 10)), 1), TOP_MOVIES_MAX_LIMIT)
+            min_votes = max(int(params.get('min_votes', 0)), 0)
+        except ValueError:
+            return Response(
+                {'detail': 'limit and min_votes must be integers.'},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        def ranking(request):
+            movies = Movie.objects.filter(rating_count__gte=min_votes)
+            if by == 'average':
+                movies = movies.filter(rating_average__isnull=False)
+            movies = movies.order_by(*RANKINGS[by]).only(
+                'id', 'title', 'poster', 'rating_count', 'rating_sum', 'bayesian_score',
+            )[:limit]
+            serializer = self.get_serializer(movies, many=True)
+            return Response({'by': by, 'results': serializer.data}, status=status.HTTP_200_OK)
+
+        version, _ = get_versions()
+        return self.cached_response(response_key('top', version, request), ranking, request)
+
+    @action(methods=['GET'], detail=True, url_path='similar')
+    def similar(self, request, pk=None):
+        """List movies rated alike by the same users.
+
+        Neighbours are precomputed by the build_similarities command.
+        """
+        try:
+            limit = min(
+                max(int(request.query_params.get('limit', 10)), 1),
+                settings.SIMILAR_MOVIES_TOP_K,
+            )
+        except ValueError:
+            return Response(
+                {'limit': ['A valid integer is required.']},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        def neighbours(request):
+            movie = self.get_object()
+            movies = Movie.objects.filter(similar_to__movie=movie).annotate(
+                similarity=F('similar_to__score'),
+            ).order_by('-similarity', 'id').only(
+                'id', 'title', 'poster', 'rating_count', 'rating_sum', 'bayesian_score',
+            )[:limit]
+            serializer = self.get_serializer(movies, many=True)
+            return Response({'results': serializer.data}, status=status.HTTP_200_OK)
+
+        try:
+            _, versions = get_versions([int(pk)])
+        except ValueError:
+            return Response(status=status.HTTP_404_NOT_FOUND)
+        return self.cached_response(
+            response_key('similar', versions[int(pk)], request), neighbours, request,
+        )
+
+    @action(methods=['GET'], detail=False, url_path='search')
+    def search(self, request):
+        """Search movies by title prefix or full text of title and description."""
+        params = request.query_params
+        query = params.get('q', '').strip()
+        mode = params.get('mode', 'full')
+        ordering = params.get('ordering', 'relevance')
+        errors = {}
+        if not query:
+            errors['q'] = ['This field is required.']
+        if mode not in SEARCH_MODES:
+            errors['mode'] = [f'Choose one of: {", ".join(SEARCH_MODES)}.']
+        if ordering not in SEARCH_ORDERINGS:
+            errors['ordering'] = [f'Choose one of: {", ".join(SEARCH_ORDERINGS)}.']
+        if errors:
+            return Response(errors, status=status.HTTP_400_BAD_REQUEST)
+
+        def results(request):
+            movie_ids = self.paginate_queryset(search_movies(query, mode, ordering))
+            movies = self.get_queryset().in_bulk(movie_ids)
+            serializer = self.get_serializer(
+                [movies[pk] for pk in movie_ids if pk in movies],
+                many=True,
+            )
+            return self.get_paginated_response(serializer.data)
+
+        version, _ = get_versions()
+        return self.cached_response(response_key('search', version, request), results, request)
+
+    @action(
+        methods=['POST'],
+        detail=True,
+        url_path='rate-movie',
+        permission_classes=(permissions.IsAuthenticated,),
+        throttle_classes=(RatingWriteThrottle,),
+    )
+    def rate_movie(self, request, pk=None):
+        """Rate a movie, creating or updating the rating of the user.
+
+        The rating is written with one upsert against the (movie, user)
+        unique constraint, in the same transaction as movie aggregates.
+        """
+        movie = self.get_object()
+        serializer = self.get_serializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(
+                serializer.errors,
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        with transaction.atomic():
+            Rating.objects.upsert(
+                [(movie.pk, request.user.pk, serializer.validated_data['stars'])],
             )
+            rating = Rating.objects.only('id', 'stars').get(movie=movie, user=request.user)
+        invalidate_movies([movie.pk])
 
         return Response(
-            serializer.errors,
-            status=status.HTTP_400_BAD_REQUEST,
+            self.get_serializer(rating).data,
+            status=status.HTTP_200_OK,
         )
 
 
-class RatingViewSet(viewsets.ModelViewSet):
+class CacheStatsView(APIView):
+    """Show movie cache hits and misses to size the cache."""
+
+    permission_classes = (permissions.IsAdminUser,)
+
+    def get(self, request):
+        return Response(get_stats(), status=status.HTTP_200_OK)
+
+
+class RatingViewSet(SparseFieldsetMixin, ConditionalGetMixin, ExportMixin, PaginationModeMixin,
+                    viewsets.ModelViewSet):
     """Manage ratings in database."""
 
-    queryset = Rating.objects.all()
+    queryset = Rating.objects.order_by('id')
     serializer_class = RatingSerializer
-    authentication_classes = (TokenAuthentication, )
+    export_kind = 'ratings'
+
+    def get_collection_version(self):
+        """Cache conditional GET version of the rating list until ratings change.
+
+        Every rating write invalidates movies, which bumps the movie list version.
+        """
+        version, _ = get_versions()
+        return cached_version(
+            f'ratings:list-version:{version}', super().get_collection_version,
+        )
+
+    def get_throttles(self):
+        """Throttle writes of ratings, reads aren't limited."""
+        if self.action in ('create', 'update', 'partial_update', 'destroy', 'bulk'):
+            return [RatingWriteThrottle()]
+        return super().get_throttles()
+
+    @action(
+        methods=['POST'],
+        detail=False,
+        url_path='bulk',
+        parser_classes=(FastJSONParser, NDJSONParser),
+        permission_classes=(permissions.IsAdminUser,),
+    )
+    def bulk(self, request):
+        """Create or update many ratings from a JSON array or NDJSON body."""
+        if not isinstance(request.data, list):
+            return Response(
+                {'detail': 'Expected a list of ratings.'},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        result = import_ratings(request.data, chunk_size=settings.BULK_RATINGS_CHUNK_SIZE)
+        return Response(result, status=status.HTTP_200_OK)
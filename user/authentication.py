@@ -0,0 +1,97 @@
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.authtoken.models import Token
+
+from api.routers import use_replicas
+
+
+def snapshot(instance):
+    """Return database values of a model instance to build copies of it from."""
+    return instance._state.db, tuple(
+        getattr(instance, field.attname) for field in instance._meta.concrete_fields
+    )
+
+
+def restore(model, values):
+    """Return a new model instance built from a snapshot."""
+    db, values = values
+    return model.from_db(db, [field.attname for field in model._meta.concrete_fields], values)
+
+
+class TokenCache:
+    """Thread safe LRU cache of authenticated tokens with a time to live.
+
+    Values of users and tokens are cached rather than instances, every
+    request gets its own copies to change and save. The cache lives in the
+    process memory, so it's invalidated by signals only in the process
+    where a change happens. Other processes keep a stale entry for at most
+    TOKEN_AUTH_CACHE_TTL seconds.
+    """
+
+    def __init__(self):
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        """Return new (user, token) built from the cached values of a key or None."""
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            if entry[3] <= time.monotonic():
+                del self.entries[key]
+                return None
+            self.entries.move_to_end(key)
+
+        user = restore(get_user_model(), entry[1])
+        token = restore(Token, entry[2])
+        token.user = user
+        return user, token
+
+    def set(self, key, user, token):
+        entry = (
+            user.pk, snapshot(user), snapshot(token),
+            time.monotonic() + settings.TOKEN_AUTH_CACHE_TTL,
+        )
+        with self.lock:
+            self.entries[key] = entry
+            self.entries.move_to_end(key)
+            while len(self.entries) > settings.TOKEN_AUTH_CACHE_SIZE:
+                self.entries.popitem(last=False)
+
+    def delete(self, key):
+        with self.lock:
+            self.entries.pop(key, None)
+
+    def delete_user(self, user_id):
+        """Drop all tokens of a user."""
+        with self.lock:
+            for key in [key for key, entry in self.entries.items() if entry[0] == user_id]:
+                del self.entries[key]
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+
+token_cache = TokenCache()
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """Token authentication remembering valid tokens instead of querying them every time."""
+
+    def authenticate_credentials(self, key):
+        cached = token_cache.get(key)
+        if cached is not None:
+            return cached
+
+        # A lagging replica could still return a deleted token.
+        with use_replicas(False):
+            user, token = super().authenticate_credentials(key)
+        token_cache.set(key, user, token)
+        return user, token
@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from user.recommendations import train_factors
+
+
+class Command(BaseCommand):
+    """Train movie factors used for personal recommendations."""
+
+    help = 'Factorize the rating matrix with PureSVD and save movie factors for the API.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--factors', type=int, default=50,
+            help='Number of latent factors of every movie.',
+        )
+        parser.add_argument(
+            '--chunk-size', type=int, default=100000,
+            help='Number of ratings fetched from the database at once.',
+        )
+
+    def handle(self, *args, **options):
+        try:
+            movies, factors = train_factors(
+                factors=options['factors'],
+                chunk_size=options['chunk_size'],
+            )
+        except ValueError as error:
+            raise CommandError(error)
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Trained {factors} factors for {movies} movies.',
+        ))
@@ -0,0 +1,133 @@
+import os
+import shutil
+import threading
+import time
+
+import numpy as np
+from django.conf import settings
+from scipy.sparse.linalg import svds
+
+from api.models import Rating
+from movie.similarity import load_rating_matrix
+
+FACTORS_FILE = 'item_factors.npy'
+MOVIE_IDS_FILE = 'movie_ids.npy'
+# Symlink to the version directory of the model in use.
+CURRENT_LINK = 'current'
+# Versions kept on disk, servers may still be loading the previous one.
+KEPT_VERSIONS = 2
+
+
+def model_path(*names):
+    return os.path.join(settings.RECOMMENDER_MODEL_DIR, *names)
+
+
+def remove_old_versions():
+    """Delete version directories older than the kept ones."""
+    versions = sorted(
+        name for name in os.listdir(settings.RECOMMENDER_MODEL_DIR)
+        if name.startswith('v') and os.path.isdir(model_path(name))
+    )
+    for name in versions[:-KEPT_VERSIONS]:
+        shutil.rmtree(model_path(name), ignore_errors=True)
+
+
+def train_factors(factors=50, chunk_size=100000):
+    """Train movie latent factors with PureSVD and save them to the model directory.
+
+    Both files are written to a new version directory, then the current
+    link is swapped to it at once. Running servers never read a half
+    written model or files of different versions. Return the number of
+    movies and factors.
+    """
+    matrix, movie_ids = load_rating_matrix(chunk_size=chunk_size)
+    factors = min(factors, min(matrix.shape) - 1)
+    if factors < 1:
+        raise ValueError('Not enough ratings to train the recommender.')
+
+    _, singular_values, item_vectors = svds(matrix.astype(np.float64), k=factors)
+    item_factors = np.ascontiguousarray(item_vectors.T, dtype=np.float32)
+
+    version = f'v{time.time_ns()}'
+    os.makedirs(model_path(version))
+    np.save(model_path(version, MOVIE_IDS_FILE), movie_ids.astype(np.int64))
+    np.save(model_path(version, FACTORS_FILE), item_factors)
+
+    link = model_path(f'.{version}.link')
+    os.symlink(version, link)
+    os.replace(link, model_path(CURRENT_LINK))
+    remove_old_versions()
+    return item_factors.shape
+
+
+class FactorModel:
+    """Memory-mapped movie factors used to score movies for a user."""
+
+    def __init__(self, movie_ids, item_factors):
+        self.movie_ids = movie_ids
+        self.item_factors = item_factors
+
+    @classmethod
+    def load(cls, version):
+        return cls(
+            np.load(model_path(version, MOVIE_IDS_FILE)),
+            np.load(model_path(version, FACTORS_FILE), mmap_mode='r'),
+        )
+
+    def recommend(self, ratings, limit):
+        """Return ids and scores of best unrated movies for movie id to stars pairs.
+
+        The user is folded into the factor space from their own ratings, so
+        new ratings count without retraining.
+        """
+        rated_ids = np.fromiter(ratings.keys(), dtype=np.int64, count=len(ratings))
+        stars = np.fromiter(ratings.values(), dtype=np.float32, count=len(ratings))
+        positions = np.searchsorted(self.movie_ids, rated_ids)
+        positions = np.minimum(positions, len(self.movie_ids) - 1)
+        known = self.movie_ids[positions] == rated_ids
+        positions, stars = positions[known], stars[known]
+        if not len(positions):
+            return []
+
+        user_factors = stars @ self.item_factors[positions]
+        scores = self.item_factors @ user_factors
+        scores[positions] = -np.inf
+        limit = min(limit, len(scores) - len(positions))
+        if limit <= 0:
+            return []
+
+        best = np.argpartition(-scores, limit - 1)[:limit]
+        best = best[np.argsort(-scores[best], kind='stable')]
+        return [(int(self.movie_ids[index]), float(scores[index])) for index in best]
+
+
+_model = None
+_model_version = None
+_lock = threading.Lock()
+
+
+def get_model():
+    """Return factor model, reloaded when a new version is trained."""
+    global _model, _model_version
+    try:
+        version = os.readlink(model_path(CURRENT_LINK))
+    except FileNotFoundError:
+        return None
+
+    with _lock:
+        if version != _model_version:
+            _model = FactorModel.load(version)
+            _model_version = version
+        return _model
+
+
+def recommend_movies(user, limit):
+    """Return ids and scores of recommended movies for a user, best first."""
+    model = get_model()
+    if model is None:
+        return []
+
+    ratings = dict(Rating.objects.filter(user=user).values_list('movie_id', 'stars'))
+    if not ratings:
+        return []
+    return model.recommend(ratings, limit)
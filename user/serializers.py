@@ -1,6 +1,9 @@
 from django.contrib.auth import authenticate, get_user_model
 from rest_framework import serializers
 
+from api.models import Rating
+from movie.serializers import MovieRankingSerializer
+
 
 class AuthTokenSerializer(serializers.Serializer):
     """Serializer for the user authentication."""
@@ -51,3 +54,22 @@ class UserSerializer(serializers.ModelSerializer):
             user.save()
 
         return user
+
+
+class UserRatingSerializer(serializers.ModelSerializer):
+    """Serializer for a rating in the user's history."""
+
+    class Meta:
+        model = Rating
+        fields = ('id', 'movie', 'stars', 'updated_at')
+        read_only_fields = fields
+
+
+class RecommendedMovieSerializer(MovieRankingSerializer):
+    """Serializer for a movie recommended to the user."""
+
+    score = serializers.FloatField(read_only=True, allow_null=True)
+
+    class Meta(MovieRankingSerializer.Meta):
+        fields = MovieRankingSerializer.Meta.fields + ('score',)
+        read_only_fields = fields
@@ -0,0 +1,88 @@
+import pytest
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from user.authentication import CachedTokenAuthentication
+
+USER_URL = reverse('user:update')
+
+
+@pytest.fixture
+def user():
+    user = get_user_model().objects.create_user(
+        email='test@gmail.com',
+        password='password',
+        name='Name',
+    )
+    yield user
+    user.delete()
+
+
+@pytest.fixture
+def token(user):
+    return Token.objects.create(user=user)
+
+
+@pytest.fixture
+def client(token):
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f'Token {token.key}')
+    yield client
+
+
+class TestCachedTokenAuthentication:
+    """Test tokens are cached and forgotten on changes."""
+
+    @pytest.mark.django_db
+    def test_token_checked_once(self, client: APIClient, django_assert_num_queries):
+        """Test only the first request with a token queries it."""
+        with django_assert_num_queries(1):
+            assert client.get(USER_URL).status_code == status.HTTP_200_OK
+
+        with django_assert_num_queries(0):
+            response = client.get(USER_URL)
+
+        assert response.data['email'] == 'test@gmail.com'
+
+    @pytest.mark.django_db
+    def test_requests_get_own_user(self, client: APIClient, token):
+        """Test cached tokens give every request a new user instance to change."""
+        client.get(USER_URL)
+        first, _ = CachedTokenAuthentication().authenticate_credentials(token.key)
+        first.name = 'Unsaved'
+        second, cached_token = CachedTokenAuthentication().authenticate_credentials(token.key)
+
+        assert second is not first
+        assert second.name == 'Name'
+        assert cached_token.user is second
+        assert cached_token.key == token.key
+
+    @pytest.mark.django_db
+    def test_deleted_token_rejected(self, client: APIClient, token):
+        """Test a deleted token stops working right away."""
+        client.get(USER_URL)
+        token.delete()
+
+        assert client.get(USER_URL).status_code == status.HTTP_401_UNAUTHORIZED
+
+    @pytest.mark.django_db
+    def test_deactivated_user_rejected(self, client: APIClient, user):
+        """Test a deactivated user can't authenticate with a cached token."""
+        client.get(USER_URL)
+        user.is_active = False
+        user.save()
+
+        assert client.get(USER_URL).status_code == status.HTTP_401_UNAUTHORIZED
+
+    @pytest.mark.django_db
+    def test_expired_token_checked_again(self, client: APIClient, settings,
+                                         django_assert_num_queries):
+        """Test cached tokens expire after the time to live."""
+        settings.TOKEN_AUTH_CACHE_TTL = 0
+        client.get(USER_URL)
+
+        with django_assert_num_queries(1):
+            client.get(USER_URL)
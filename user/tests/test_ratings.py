@@ -0,0 +1,72 @@
+import pytest
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from api.models import Movie, Rating
+
+USER_RATINGS_URL = reverse('user:ratings')
+
+
+@pytest.fixture
+def client():
+    client = APIClient()
+    yield client
+
+
+@pytest.fixture
+def rater():
+    return get_user_model().objects.create_user('rater@gmail.com', 'password')
+
+
+@pytest.fixture
+def ratings(rater):
+    """Create five ratings of the rater and one of another user."""
+    other = get_user_model().objects.create_user('other@gmail.com', 'password')
+    movies = [Movie.objects.create(title=f'Movie {number}') for number in range(5)]
+    Rating.objects.create(stars=1, movie=movies[0], user=other)
+    return [
+        Rating.objects.create(stars=stars, movie=movie, user=rater)
+        for stars, movie in zip([5, 4, 3, 2, 1], reversed(movies))
+    ]
+
+
+@pytest.mark.django_db
+def test_user_ratings_require_authentication(client: APIClient):
+    """Test rating history is only for authenticated users."""
+    response = client.get(USER_RATINGS_URL)
+
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+
+@pytest.mark.django_db
+def test_user_ratings_are_paginated_by_movie(client: APIClient, rater, ratings):
+    """Test only the user's ratings are listed, page by page in movie order."""
+    client.force_authenticate(rater)
+
+    response = client.get(USER_RATINGS_URL, {'page_size': 3})
+    next_page = client.get(response.data['next'])
+
+    assert response.status_code == status.HTTP_200_OK
+    listed = response.data['results'] + next_page.data['results']
+    assert [rating['id'] for rating in listed] == [rating.id for rating in reversed(ratings)]
+    assert next_page.data['next'] is None
+
+
+@pytest.mark.django_db
+def test_user_ratings_use_user_movie_index(rater, ratings):
+    """Test a history page is read in order from the (user, movie) index without sorting."""
+    if connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            cursor.execute('SET LOCAL enable_seqscan = off')
+            cursor.execute('SET LOCAL enable_bitmapscan = off')
+    plan = Rating.objects.filter(user=rater).order_by('movie_id')[:50].explain()
+
+    assert 'rating_user_movie_idx' in plan
+    if connection.vendor == 'postgresql':
+        assert 'Index Scan' in plan
+        assert 'Sort' not in plan
+    else:
+        assert 'TEMP B-TREE' not in plan
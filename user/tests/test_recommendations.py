@@ -0,0 +1,114 @@
+import numpy as np
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from api.models import Movie, Rating
+from user.recommendations import FactorModel, get_model
+
+RECOMMENDATIONS_URL = reverse('user:recommendations')
+
+
+@pytest.fixture
+def client():
+    client = APIClient()
+    yield client
+
+
+@pytest.fixture(autouse=True)
+def model_dir(settings, tmp_path):
+    settings.RECOMMENDER_MODEL_DIR = str(tmp_path)
+
+
+@pytest.fixture
+def movies():
+    """Create sci-fi and romance movies, fans rate movies of their genre high."""
+    users = [get_user_model().objects.create_user(f'rater{n}@gmail.com') for n in range(4)]
+    ratings = {
+        'Alien': [5, 5, 1, 1],
+        'Aliens': [5, 4, 1, 2],
+        'Predator': [4, 5, 2, None],
+        'Amelie': [1, 2, 5, 5],
+        'Notebook': [2, 1, 5, 4],
+    }
+    movies = {}
+    for title, stars in ratings.items():
+        movies[title] = Movie.objects.create(title=title)
+        for user, value in zip(users, stars):
+            if value is not None:
+                Rating.objects.create(stars=value, movie=movies[title], user=user)
+    return movies
+
+
+@pytest.fixture
+def fan():
+    user = get_user_model().objects.create_user('fan@gmail.com', 'password')
+    yield user
+
+
+def titles(response):
+    return [movie['title'] for movie in response.data['results']]
+
+
+def test_factor_model_skips_rated_movies():
+    """Test rated movies are not recommended and the rest is ranked by score."""
+    model = FactorModel(
+        np.array([1, 2, 3, 4]),
+        np.array([[1, 0], [0.9, 0.1], [0.1, 0.9], [0.8, 0]], dtype=np.float32),
+    )
+
+    assert [pk for pk, _ in model.recommend({1: 5, 99: 4}, limit=2)] == [2, 4]
+
+
+@pytest.mark.django_db
+def test_recommendations_require_authentication(client: APIClient):
+    """Test recommendations are only for authenticated users."""
+    response = client.get(RECOMMENDATIONS_URL)
+
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+
+@pytest.mark.django_db
+def test_recommendations_from_trained_factors(client: APIClient, movies, fan):
+    """Test a sci-fi fan is recommended sci-fi movies they haven't rated."""
+    call_command('train_recommender', '--factors', 2)
+    Rating.objects.create(stars=5, movie=movies['Alien'], user=fan)
+    client.force_authenticate(fan)
+
+    response = client.get(RECOMMENDATIONS_URL, {'limit': 2})
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.data['source'] == 'personal'
+    assert sorted(titles(response)) == ['Aliens', 'Predator']
+
+
+@pytest.mark.django_db
+def test_trained_model_swapped_in(movies, fan, tmp_path):
+    """Test a new model is loaded after training and only recent versions are kept."""
+    call_command('train_recommender', '--factors', 2)
+    model = get_model()
+    movie = Movie.objects.create(title='Prometheus')
+    Rating.objects.create(stars=5, movie=movie, user=fan)
+    Rating.objects.create(stars=5, movie=movies['Alien'], user=fan)
+    call_command('train_recommender', '--factors', 2)
+    call_command('train_recommender', '--factors', 2)
+
+    assert movie.pk not in model.movie_ids
+    assert movie.pk in get_model().movie_ids
+    assert len(get_model().movie_ids) == len(get_model().item_factors)
+    assert len([path for path in tmp_path.iterdir() if path.name.startswith('v')]) == 2
+
+
+@pytest.mark.django_db
+def test_recommendations_fall_back_to_popular(client: APIClient, movies, fan):
+    """Test users without ratings get popular movies when nothing is trained."""
+    client.force_authenticate(fan)
+
+    response = client.get(RECOMMENDATIONS_URL, {'limit': 1})
+
+    assert response.data['source'] == 'popular'
+    assert len(titles(response)) == 1
+    assert response.data['results'][0]['score'] is None
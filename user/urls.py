@@ -7,4 +7,6 @@ urlpatterns = [
     path('token/', views.CreateTokenView.as_view(), name='token'),
     path('create/', views.CreateUserView.as_view(), name='create'),
     path('update/', views.ManageUserView.as_view(), name='update'),
+    path('ratings/', views.UserRatingsView.as_view(), name='ratings'),
+    path('recommendations/', views.RecommendationsView.as_view(), name='recommendations'),
 ]
@@ -1,8 +1,16 @@
-from rest_framework import generics, authentication, permissions
+from rest_framework import generics, permissions, status
 from rest_framework.authtoken.views import ObtainAuthToken
+from rest_framework.response import Response
 from rest_framework.settings import api_settings
 
-from user.serializers import AuthTokenSerializer, UserSerializer
+from api.models import Movie, Rating
+from api.throttling import LoginThrottle, UserCreateThrottle
+from movie.pagination import MovieIdCursorPagination
+from user.recommendations import recommend_movies
+from user.serializers import (AuthTokenSerializer, RecommendedMovieSerializer,
+                              UserRatingSerializer, UserSerializer)
+
+RECOMMENDATIONS_MAX_LIMIT = 100
 
 
 class CreateTokenView(ObtainAuthToken):
@@ -10,21 +18,73 @@ class CreateTokenView(ObtainAuthToken):
 
     serializer_class = AuthTokenSerializer
     renderer_classes = api_settings.DEFAULT_RENDERER_CLASSES
+    throttle_classes = (LoginThrottle,)
 
 
 class CreateUserView(generics.CreateAPIView):
     """Create a new user with email."""
 
     serializer_class = UserSerializer
+    throttle_classes = (UserCreateThrottle,)
 
 
 class ManageUserView(generics.RetrieveUpdateAPIView):
     """Manage the authenticated user data."""
 
     serializer_class = UserSerializer
-    authentication_classes = (authentication.TokenAuthentication,)
     permission_classes = (permissions.IsAuthenticated,)
 
     def get_object(self):
         """Return current user."""
         return self.request.user
+
+
+class UserRatingsView(generics.ListAPIView):
+    """List ratings of the authenticated user page by page."""
+
+    serializer_class = UserRatingSerializer
+    permission_classes = (permissions.IsAuthenticated,)
+    pagination_class = MovieIdCursorPagination
+
+    def get_queryset(self):
+        """Return ratings of the user, read from the (user, movie) index."""
+        return Rating.objects.filter(user=self.request.user)
+
+
+class RecommendationsView(generics.GenericAPIView):
+    """Recommend unrated movies to the authenticated user."""
+
+    serializer_class = RecommendedMovieSerializer
+    permission_classes = (permissions.IsAuthenticated,)
+
+    def get(self, request):
+        """List movies scored with trained factors, or popular movies as a fallback."""
+        try:
+            limit = min(max(int(request.query_params.get('limit', 10)), 1),
+                        RECOMMENDATIONS_MAX_LIMIT)
+        except ValueError:
+            return Response(
+                {'limit': ['A valid integer is required.']},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        fields = ('id', 'title', 'poster', 'rating_count', 'rating_sum', 'bayesian_score')
+        recommended = recommend_movies(request.user, limit)
+        if recommended:
+            source = 'personal'
+            found = Movie.objects.only(*fields).in_bulk([pk for pk, _ in recommended])
+            movies = []
+            for pk, score in recommended:
+                if pk in found:
+                    found[pk].score = score
+                    movies.append(found[pk])
+        else:
+            source = 'popular'
+            movies = list(Movie.objects.exclude(ratings__user=request.user).order_by(
+                '-bayesian_score', 'id',
+            ).only(*fields)[:limit])
+            for movie in movies:
+                movie.score = None
+
+        serializer = self.get_serializer(movies, many=True)
+        return Response({'source': source, 'results': serializer.data}, status=status.HTTP_200_OK)